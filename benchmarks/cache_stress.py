@@ -0,0 +1,179 @@
+"""Test obciążeniowy cache współdzielonego przez wiele procesów.
+
+Procesy jednocześnie zapisują i odczytują te same klucze, a jeden z nich
+co pewien czas usuwa wpisy ponad limit rozmiaru (blokada wyłączna). Każda
+odpowiedź zawiera sumę kontrolną treści, więc wpis częściowy, pomieszany
+z innym zapisem lub przypisany do złego klucza jest wykrywany.
+
+Skrypt kończy się kodem 1, gdy którykolwiek odczyt zwrócił uszkodzony
+wpis, operacja cache zgłosiła błąd lub ostrzeżenie, w katalogu zostały
+pliki tymczasowe albo liczniki trafień nie zgadzają się z liczbą odczytów.
+
+    python benchmarks/cache_stress.py                       # 16 procesów, 10 s
+    python benchmarks/cache_stress.py --processes 32 --keys 4 --duration 30
+"""
+import os
+import sys
+import time
+import pickle
+import hashlib
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cache import ResponseCache
+
+# Co ile sekund proces porządkujący usuwa wpisy ponad limit rozmiaru
+PRUNE_INTERVAL = 0.1
+
+
+class _Problems(logging.Handler):
+    """Zbiera ostrzeżenia i błędy cache (ResponseCache nie zgłasza wyjątków przy odczycie)."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def prompt_for(key: int) -> str:
+    return f"Tekst testowy numer {key} " * 20
+
+
+def make_response(key: int, worker_id: int, iteration: int, payload_size: int) -> str:
+    body = (f"<p>klucz {key}, proces {worker_id}, zapis {iteration}</p>" * payload_size)[:payload_size]
+    return f"{key}:{hashlib.sha256(body.encode()).hexdigest()}\n{body}"
+
+
+def check_entry(key: int, entry: Dict[str, Any]) -> str:
+    """Zwraca opis uszkodzenia wpisu lub pusty napis."""
+    if entry.get("prompt") != prompt_for(key):
+        return f"klucz {key}: wpis innego promptu"
+    header, _, body = entry.get("response", "").partition("\n")
+    entry_key, _, digest = header.partition(":")
+    if entry_key != str(key):
+        return f"klucz {key}: odpowiedź dla klucza {entry_key}"
+    if hashlib.sha256(body.encode()).hexdigest() != digest:
+        return f"klucz {key}: niezgodna suma kontrolna ({len(body)} znaków treści)"
+    return ""
+
+
+def worker(cache_dir: str, worker_id: int, keys: int, payload_size: int,
+           start_at: float, duration: float) -> Dict[str, Any]:
+    """Zapisuje i odczytuje wspólne klucze do upływu czasu; zwraca liczniki i problemy."""
+    problems = _Problems()
+    logging.getLogger("src.cache").addHandler(problems)
+    cache = ResponseCache(cache_dir)
+    stats = {"set": 0, "get": 0, "hit": 0, "prune": 0, "prune_time": 0.0, "problems": []}
+
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = start_at + duration
+    next_prune = start_at + PRUNE_INTERVAL
+    iteration = 0
+    try:
+        while time.time() < deadline:
+            iteration += 1
+            key = (worker_id + iteration) % keys
+            if iteration % 3 == 0:
+                cache.set(prompt_for(key), make_response(key, worker_id, iteration, payload_size))
+                stats["set"] += 1
+            else:
+                entry = cache.get_entry(cache.key_for(prompt_for(key)))
+                stats["get"] += 1
+                cache.record_lookup(entry is not None)
+                if entry is not None:
+                    stats["hit"] += 1
+                    problem = check_entry(key, entry)
+                    if problem:
+                        stats["problems"].append(problem)
+            if worker_id == 0 and time.time() >= next_prune:
+                # Połowa wpisów ponad limit - usuwanie równolegle z zapisami innych procesów
+                prune_start = time.perf_counter()
+                cache.prune(max_bytes=keys * payload_size // 2)
+                # Obejmuje oczekiwanie na blokadę wyłączną, o którą konkurują zapisy
+                stats["prune_time"] = max(stats["prune_time"], time.perf_counter() - prune_start)
+                stats["prune"] += 1
+                next_prune += PRUNE_INTERVAL
+        cache.flush_stats()
+    except Exception as e:
+        stats["problems"].append(f"proces {worker_id}: {type(e).__name__}: {e}")
+    stats["problems"].extend(f"proces {worker_id}: {message}" for message in problems.messages)
+    return stats
+
+
+def verify_directory(cache: ResponseCache, keys: int) -> List[str]:
+    """Sprawdza wszystkie wpisy pozostałe w katalogu cache."""
+    problems = []
+    for cache_file in cache.cache_dir.glob("*.pkl"):
+        try:
+            with cache_file.open("rb") as f:
+                entry = pickle.load(f)
+        except Exception as e:
+            problems.append(f"{cache_file.name}: nie można wczytać wpisu ({e})")
+            continue
+        key = next((key for key in range(keys) if cache.key_for(prompt_for(key)) == cache_file.stem), None)
+        if key is None:
+            problems.append(f"{cache_file.name}: nieznany klucz")
+        elif check_entry(key, entry):
+            problems.append(f"{cache_file.name}: {check_entry(key, entry)}")
+    for temp_file in cache.cache_dir.glob(".*.tmp"):
+        problems.append(f"{temp_file.name}: pozostawiony plik tymczasowy")
+    return problems
+
+
+def run(processes: int, keys: int, payload_size: int, duration: float, cache_dir: str) -> Dict[str, Any]:
+    """Uruchamia procesy na wspólnym katalogu cache i zwraca zsumowane wyniki."""
+    start_at = time.time() + 1.0
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(worker, [
+            (cache_dir, worker_id, keys, payload_size, start_at, duration)
+            for worker_id in range(processes)
+        ])
+
+    totals = {name: sum(result[name] for result in results) for name in ("set", "get", "hit", "prune")}
+    totals["prune_time"] = max(result["prune_time"] for result in results)
+    problems = [problem for result in results for problem in result["problems"]]
+    cache = ResponseCache(cache_dir)
+    problems += verify_directory(cache, keys)
+    stats = cache.load_stats()
+    if stats["hits"] != totals["hit"] or stats["hits"] + stats["misses"] != totals["get"]:
+        problems.append(
+            f"Liczniki cache: {stats['hits']} trafień / {stats['misses']} chybień, "
+            f"oczekiwano {totals['hit']} / {totals['get'] - totals['hit']}"
+        )
+    return {**totals, "problems": problems}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test obciążeniowy cache wielu procesów")
+    parser.add_argument("--processes", type=int, default=16)
+    parser.add_argument("--keys", type=int, default=8, help="Liczba wspólnych kluczy")
+    parser.add_argument("--payload", type=int, default=64 * 1024, help="Rozmiar odpowiedzi (znaki)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Czas obciążenia (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="oxido-cache-stress-") as directory:
+        result = run(args.processes, args.keys, args.payload, args.duration,
+                     os.path.join(directory, "cache"))
+
+    print(f"Procesy: {args.processes}, klucze: {args.keys}, czas: {args.duration:.0f} s")
+    print(f"Zapisy: {result['set']} ({result['set'] / args.duration:.0f}/s), "
+          f"odczyty: {result['get']} ({result['get'] / args.duration:.0f}/s), "
+          f"trafienia: {result['hit']}, porządkowania: {result['prune']} "
+          f"(najdłuższe {result['prune_time']:.2f} s)")
+    if result["problems"]:
+        print(f"\nProblemy ({len(result['problems'])}):")
+        for problem in result["problems"][:20]:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("Brak uszkodzonych wpisów i błędów")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark puli połączeń HTTP klienta modelu.
+
+Uruchamia lokalny serwer udający API Groq (z opóźnieniem nawiązania
+połączenia symulującym uzgodnienie TLS) i porównuje zapytania bez
+utrzymywania połączeń, z pulą oraz z pulą rozgrzaną przed pierwszym
+zapytaniem.
+
+    python benchmarks/http_pool.py --requests 96 --workers 8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import HumanMessage
+
+from src.article_processor import ArticleProcessor
+from src.http_client import HTTPPoolConfig
+
+RESPONSE = {
+    "id": "benchmark",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "llama3-70b-8192",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "<article><h1>T</h1><p>x</p></article>"},
+        "finish_reason": "stop",
+    }],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Odpowiada jak endpoint chat/completions; liczy nowe połączenia."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        # Koszt nowego połączenia (uzgodnienie TCP + TLS z dalekim serwerem)
+        time.sleep(self.server.connect_delay)
+
+    def _reply(self, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self._reply(b"")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+        self.wfile.write(self._reply(json.dumps(RESPONSE).encode()))
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(latency: float, connect_delay: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.connect_delay = connect_delay
+    server.connections = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_scenario(server, name: str, config: HTTPPoolConfig, args) -> dict:
+    server.connections = 0
+    processor = ArticleProcessor(max_workers=args.workers, max_concurrency=args.workers,
+                                 http_config=config)
+    if config.warmup:
+        processor.warm_up_connections()
+    warm_connections = server.connections
+
+    def request(i):
+        start = time.perf_counter()
+        processor._invoke_llm([HumanMessage(content=f"zapytanie {i}")])
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        latencies = list(executor.map(request, range(args.requests)))
+    wall = time.perf_counter() - start
+    processor.http_client.close()
+
+    first = latencies[:args.workers]
+    return {
+        "scenario": name,
+        "wall": wall,
+        "p50": statistics.median(latencies),
+        "first_p50": statistics.median(first),
+        "connections": server.connections - warm_connections,
+        "warm_connections": warm_connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark puli połączeń HTTP")
+    parser.add_argument("--requests", type=int, default=96)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="Czas odpowiedzi serwera (s)")
+    parser.add_argument("--connect-delay", type=float, default=0.05,
+                        help="Koszt nawiązania połączenia (s)")
+    args = parser.parse_args()
+
+    server = start_server(args.latency, args.connect_delay)
+    os.environ["GROQ_API_BASE"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+    scenarios = [
+        ("bez keep-alive", HTTPPoolConfig(keepalive_expiry=0)),
+        ("pula", HTTPPoolConfig()),
+        ("pula + rozgrzewka", HTTPPoolConfig(warmup=True)),
+    ]
+    print(f"{'Scenariusz':<20}{'Czas [s]':>10}{'p50 [ms]':>10}{'p50 pierwszych [ms]':>22}"
+          f"{'Nowe połączenia':>17}")
+    for name, config in scenarios:
+        result = run_scenario(server, name, config, args)
+        print(f"{result['scenario']:<20}{result['wall']:>10.2f}{result['p50'] * 1000:>10.1f}"
+              f"{result['first_p50'] * 1000:>22.1f}{result['connections']:>17}"
+              + (f" (+{result['warm_connections']} przy rozgrzewce)" if result['warm_connections'] else ""))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
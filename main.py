@@ -1,24 +1,307 @@
+import argparse
+import glob
 import logging
 import os
+from contextlib import nullcontext
 from src.article_processor import ArticleProcessor
+from src.config import FAST_MODEL_MAX_TOKENS
+from src.dashboard import LiveDashboard
+from src.deadline import Deadline
+from src.file_handler import FileHandler
+from src.image_manifest import ImageManifest
 from src.logger import setup_logger
+from src.output_optimizer import OutputOptimizer
+from src.pipeline import BatchPipeline
+from src.planner import BatchPlanner
+from src.profiler import profiler
+from src.scheduler import POLICIES, ChunkScheduler, parse_priorities
+from src.site_builder import SiteBuilder
+from src.traffic import ReplayLLM, TrafficRecorder
+from src.watcher import DirectoryWatcher
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def parse_args():
+    """Parsuje argumenty wiersza poleceń."""
+    parser = argparse.ArgumentParser(description="Generator artykułów HTML")
+    parser.add_argument(
+        "files", nargs="*",
+        help="Pliki lub katalogi wejściowe do przetworzenia (domyślnie ai.txt)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=3,
+        help="Początkowa liczba równoległych zapytań do API"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Nie korzystaj z cache odpowiedzi API (nadpisuje CACHE_ENABLED)"
+    )
+    parser.add_argument(
+        "--cpu-workers", type=int, metavar="N",
+        help="Przetwarzaj pliki potokiem z N procesami dla etapów CPU (wynik: <nazwa>.html)"
+    )
+    parser.add_argument(
+        "--schedule", choices=POLICIES, default="lpt",
+        help="Kolejność części wielu plików: lpt - najpierw duże (najkrótszy czas wsadu), "
+             "sjf - najpierw krótkie (wyniki interaktywne), fifo - kolejność plików"
+    )
+    parser.add_argument(
+        "--priority", metavar="WZORZEC=N", action="append", default=[],
+        help="Priorytet plików pasujących do wzorca (np. pilne*.txt=10; wyższy wcześniej, domyślnie 0)"
+    )
+    parser.add_argument(
+        "--request-timeout", type=float, metavar="SEKUNDY",
+        help="Limit czasu pojedynczego zapytania do API (nadpisuje REQUEST_TIMEOUT)"
+    )
+    parser.add_argument(
+        "--article-timeout", type=float, metavar="SEKUNDY",
+        help="Limit czasu przetwarzania jednego artykułu (nadpisuje ARTICLE_TIMEOUT)"
+    )
+    parser.add_argument(
+        "--batch-timeout", type=float, metavar="SEKUNDY",
+        help="Limit czasu przetwarzania wszystkich plików"
+    )
+    parser.add_argument(
+        "--warm-up", action="store_true",
+        help="Otwórz połączenia z API przed pierwszym zapytaniem (nadpisuje HTTP_WARMUP)"
+    )
+    parser.add_argument(
+        "--near-duplicates", metavar="PRÓG", type=float, nargs="?", const=0.9,
+        help="Używaj odpowiedzi z cache dla prawie identycznych fragmentów (domyślny próg 0.9)"
+    )
+    parser.add_argument(
+        "--near-duplicate-mode", choices=["reuse", "patch"], default="reuse",
+        help="reuse - użyj odpowiedzi bez zmian, patch - nanieś różnice tekstu na odpowiedź"
+    )
+    parser.add_argument(
+        "--fast-model", metavar="TOKENY", type=int, nargs="?", const=FAST_MODEL_MAX_TOKENS,
+        help="Krótkie artykuły (do TOKENY szacowanych tokenów) generuj szybkim modelem, z eskalacją "
+             f"do dużego przy błędach walidacji (domyślnie {FAST_MODEL_MAX_TOKENS}; nadpisuje FAST_MODEL_MAX_TOKENS)"
+    )
+    parser.add_argument(
+        "--autotune-chunks", action="store_true",
+        help="Dobieraj rozmiar części artykułu do zmierzonych opóźnień modelu, równoległości "
+             "i limitów API (nadpisuje CHUNK_AUTOTUNE)"
+    )
+    parser.add_argument(
+        "--record", metavar="PLIK",
+        help="Zapisz ruch do API (prompt, odpowiedź, tokeny, opóźnienie, błąd) do pliku .jsonl.gz"
+    )
+    parser.add_argument(
+        "--replay", metavar="PLIK",
+        help="Zamiast API odtwarzaj ruch zapisany przez --record"
+    )
+    parser.add_argument(
+        "--replay-speed", type=float, default=1.0,
+        help="Mnożnik szybkości odtwarzania (0 - bez opóźnień)"
+    )
+    parser.add_argument(
+        "--plan", action="store_true",
+        help="Oszacuj liczbę zapytań, tokenów, trafień cache i czas bez wywołań API"
+    )
+    parser.add_argument(
+        "--plan-format", choices=["table", "json"], default="table",
+        help="Format wyniku trybu --plan"
+    )
+    parser.add_argument(
+        "--watch", metavar="KATALOG",
+        help="Obserwuj katalog i generuj artykuły po każdej zmianie plików tekstowych"
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=1.0,
+        help="Czas ciszy (s) po zapisie zanim plik zostanie przetworzony w trybie --watch"
+    )
+    parser.add_argument(
+        "--output", metavar="KATALOG",
+        help="Katalog wynikowy dla trybów --watch (domyślnie obserwowany katalog), --build i --cpu-workers"
+    )
+    parser.add_argument(
+        "--build", metavar="KATALOG",
+        help="Zbuduj kompletne strony z artykułów HTML z katalogu (bez wywołań API)"
+    )
+    parser.add_argument(
+        "--template", metavar="PLIK", default=os.path.join(SCRIPT_DIR, "szablon.html"),
+        help="Szablon strony dla trybu --build"
+    )
+    parser.add_argument(
+        "--pattern", default="artykul*.html",
+        help="Wzorzec nazw artykułów dla trybu --build"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Przebuduj wszystkie strony w trybie --build"
+    )
+    parser.add_argument(
+        "--optimize", action="store_true",
+        help="Minifikuj pliki wynikowe i zapisz obok nich kopie .gz oraz .br (jeśli dostępne brotli)"
+    )
+    parser.add_argument(
+        "--image-manifest", metavar="PLIK",
+        help="Zapisz prompty grafik: <artykuł>.images.json obok artykułów i zbiorczo do PLIK"
+    )
+    parser.add_argument(
+        "--dashboard", action="store_true",
+        help="Pokazuj na żywo postęp, tempo zapytań i tokenów, trafienia cache, błędy API i szacowany "
+             "czas do końca (wsad i --watch; bez pakietu rich lub terminala - okresowo w logu)"
+    )
+    parser.add_argument(
+        "--profile", metavar="RAPORT", nargs="?", const="profile_report.json",
+        help="Mierz czas i CPU etapów przetwarzania i zapisz raport (domyślnie profile_report.json)"
+    )
+    parser.add_argument(
+        "--profile-cprofile", action="store_true",
+        help="Dołącz do raportu profilowania statystyki funkcji z cProfile"
+    )
+    parser.add_argument(
+        "--profile-memory", action="store_true",
+        help="Mierz szczytowe zużycie pamięci etapów (tracemalloc)"
+    )
+    return parser.parse_args()
+
+def collect_input_files(paths):
+    """Rozwija katalogi na listę plików tekstowych."""
+    input_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            input_files.extend(sorted(FileHandler.find_text_files(path)))
+        else:
+            input_files.append(path)
+    return input_files
+
+def plan_batch(processor, input_files, args):
+    """Wypisuje plan przetwarzania wsadowego."""
+    planner = BatchPlanner(processor)
+    plan = planner.plan(input_files)
+    if args.plan_format == "json":
+        print(planner.format_json(plan))
+    else:
+        print(planner.format_table(plan))
+
+def build_site(args):
+    """Renderuje wszystkie artykuły do szablonu strony."""
+    output_dir = args.output or os.path.join(args.build, "site")
+    builder = SiteBuilder(args.template, output_dir)
+    builder.build(args.build, pattern=args.pattern, force=args.force)
+    if args.optimize:
+        OutputOptimizer().optimize(glob.glob(os.path.join(output_dir, "*.html")))
+
+def dashboard_for(processor, args):
+    """Zwraca panel postępu (--dashboard) lub pusty kontekst."""
+    return LiveDashboard(processor.metrics) if args.dashboard else nullcontext()
+
+def watch_directory(processor, args):
+    """Uruchamia tryb obserwowania katalogu."""
+    output_dir = args.output or args.watch
+    optimizer = OutputOptimizer() if args.optimize else None
+
+    def handle_change(input_file):
+        # Każdy plik wejściowy ma stały plik wynikowy, nadpisywany przy kolejnych zmianach
+        name = os.path.splitext(os.path.basename(input_file))[0]
+        output_file = processor.process_file(input_file, os.path.join(output_dir, f"{name}.html"))
+        if optimizer is not None:
+            optimizer.optimize([output_file])
+        if args.image_manifest:
+            processor.image_manifest.save(args.image_manifest)
+
+    watcher = DirectoryWatcher(
+        args.watch,
+        handle_change,
+        debounce=args.debounce,
+        max_workers=processor.max_workers
+    )
+    with dashboard_for(processor, args):
+        watcher.watch()
 
 def main():
     # Konfiguracja loggera
     setup_logger()
     logger = logging.getLogger(__name__)
-    
+    args = parse_args()
+
+    if args.profile:
+        profiler.enable(use_cprofile=args.profile_cprofile, trace_memory=args.profile_memory)
+
     try:
-        # Użyj konkretnego pliku ai.txt
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        input_file = os.path.join(script_dir, 'ai.txt')
-        
-        # Przetwórz artykuł - walidacja jest teraz w ArticleProcessor
-        processor = ArticleProcessor()
-        processor.process_file(input_file)
-        
+        if args.build:
+            build_site(args)
+            return
+
+        processor = ArticleProcessor(max_workers=args.workers)
+        if args.no_cache:
+            processor.use_cache = False
+        if args.request_timeout:
+            processor.request_timeout = args.request_timeout
+        if args.article_timeout:
+            processor.article_timeout = args.article_timeout
+        if args.near_duplicates:
+            processor.enable_near_duplicates(args.near_duplicates, args.near_duplicate_mode)
+        if args.fast_model is not None:
+            processor.router.fast_max_tokens = args.fast_model
+        if args.autotune_chunks:
+            processor.autotune_chunks = True
+        if args.image_manifest:
+            processor.image_manifest = ImageManifest()
+        if args.replay:
+            # Osobne zapisy dużego i szybkiego modelu - odtwarzanie zachowuje wybór modelu
+            replay = ReplayLLM(args.replay, speed=args.replay_speed)
+            processor.llm = replay.for_model(processor.router.large_model)
+            processor.fast_llm = (
+                replay.for_model(processor.router.fast_model) if processor.router.enabled else None
+            )
+            # Przerwy między ponowieniami skalowane jak zapisane opóźnienia
+            processor.retry_delay_scale = 1 / args.replay_speed if args.replay_speed > 0 else 0.0
+        elif args.record:
+            recorder = TrafficRecorder(processor.llm, args.record)
+            if processor.fast_llm is not None:
+                processor.fast_llm = recorder.for_model(processor.fast_llm)
+            processor.llm = recorder
+
+        if (args.warm_up or processor.http_config.warmup) and not (args.plan or args.replay):
+            processor.warm_up_connections()
+
+        if args.watch:
+            watch_directory(processor, args)
+            return
+
+        # Domyślnie użyj pliku ai.txt
+        input_files = collect_input_files(args.files) or [os.path.join(SCRIPT_DIR, 'ai.txt')]
+
+        if args.plan:
+            plan_batch(processor, input_files, args)
+            return
+
+        # Przetwórz artykuły - walidacja jest teraz w ArticleProcessor
+        batch_deadline = Deadline(args.batch_timeout)
+        processor.metrics.set_gauge("files_total", len(input_files))
+        with dashboard_for(processor, args):
+            if args.cpu_workers:
+                pipeline = BatchPipeline(processor, cpu_workers=args.cpu_workers)
+                output_files = pipeline.run(input_files, args.output, batch_deadline)["outputs"]
+            elif len(input_files) > 1:
+                scheduler = ChunkScheduler(processor, policy=args.schedule)
+                output_files = scheduler.process_files(
+                    input_files, parse_priorities(args.priority), batch_deadline
+                )
+            else:
+                output_files = [
+                    processor.process_file(input_file, deadline=batch_deadline)
+                    for input_file in input_files
+                ]
+        if args.optimize:
+            OutputOptimizer().optimize(output_files)
+        if args.image_manifest:
+            processor.image_manifest.save(args.image_manifest)
+
+        if processor.near_duplicates is not None:
+            logger.info(processor.near_duplicates.format_report())
+        if processor.router.enabled:
+            logger.info(processor.router.format_report())
+
     except Exception as e:
         logger.error(f"Wystąpił błąd: {str(e)}")
+    finally:
+        if args.profile:
+            profiler.write_report(args.profile)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
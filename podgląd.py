@@ -1,8 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+import queue
+import threading
 import webbrowser
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from src.template import ArticleTemplate
+from src.preview_server import PreviewServer
+
+# Opóźnienie (ms) odświeżenia podglądu po ostatniej zmianie w edytorze
+PREVIEW_DEBOUNCE_MS = 400
+# Liczba znaków wstawianych do edytora w jednym kroku pętli zdarzeń
+INSERT_BATCH_CHARS = 64 * 1024
+# Rozmiar bloku odczytu pliku w wątku roboczym
+READ_BLOCK_CHARS = 1024 * 1024
 
 class HTMLPreviewApp:
     def __init__(self, root):
@@ -30,7 +42,20 @@ class HTMLPreviewApp:
         # Inicjalizacja zmiennych
         self.current_file = None
         self.template_file = os.path.join(os.path.dirname(__file__), "szablon.html")
-        self.preview_file = os.path.join(tempfile.gettempdir(), "preview.html")
+        self.template = ArticleTemplate(self.template_file)
+        self._pending_update = None
+
+        # Wczytywanie plików i renderowanie podglądu poza wątkiem Tk
+        self._ui_queue = queue.Queue()
+        self._preview_executor = ThreadPoolExecutor(max_workers=1)
+        self._load_cancel = None
+        self._loading = False
+        self.root.after(50, self._process_ui_queue)
+
+        # Lokalny serwer podglądu z automatycznym odświeżaniem
+        self.server = PreviewServer()
+        self.server.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Wczytanie domyślnego pliku
         self.load_default_file()
@@ -67,6 +92,14 @@ class HTMLPreviewApp:
         self.file_label = ttk.Label(toolbar, text="Brak wybranego pliku")
         self.file_label.pack(side=tk.LEFT, padx=20)
 
+        # Postęp wczytywania dużych plików (widoczny tylko podczas wczytywania)
+        self.cancel_btn = ttk.Button(
+            toolbar,
+            text="Anuluj",
+            command=self.cancel_loading
+        )
+        self.progress = ttk.Progressbar(toolbar, length=150, mode="determinate")
+
     def create_main_area(self):
         # Edytor tekstu
         self.text_editor = tk.Text(
@@ -78,6 +111,7 @@ class HTMLPreviewApp:
             insertbackground="white"
         )
         self.text_editor.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
+        self.text_editor.bind("<<Modified>>", self.on_text_modified)
         
         # Przycisk podglądu
         preview_btn = ttk.Button(
@@ -87,40 +121,69 @@ class HTMLPreviewApp:
         )
         preview_btn.grid(row=2, column=0, pady=5)
 
-    def load_template(self):
-        """Wczytuje szablon HTML"""
+    def insert_content_into_template(self, content):
+        """Wstawia treść artykułu do szablonu"""
         try:
-            with open(self.template_file, "r", encoding="utf-8") as file:
-                return file.read()
+            # Szablon jest wczytywany ponownie tylko po zmianie pliku
+            return self.template.render(content)
         except Exception as e:
             messagebox.showerror("Błąd", f"Nie można wczytać szablonu: {str(e)}")
-            return None
-
-    def insert_content_into_template(self, content):
-        """Wstawia treść artykułu do szablonu"""
-        template = self.load_template()
-        if template:
-            # Wstawiamy treść w miejsce komentarza w szablonie
-            return template.replace("<!-- Tutaj zostanie wklejony artykuł -->", content)
-        return content
+            return content
 
     def update_preview(self):
-        """Aktualizuje plik podglądu i otwiera go w przeglądarce"""
+        """Aktualizuje stronę udostępnianą przez serwer podglądu"""
         content = self.text_editor.get("1.0", tk.END)
-        formatted_content = self.insert_content_into_template(content)
-        
+        self._preview_executor.submit(self._publish_preview, content)
+        return True
+
+    def _publish_preview(self, content):
+        """Renderuje stronę podglądu w wątku roboczym"""
         try:
-            with open(self.preview_file, "w", encoding="utf-8") as file:
-                file.write(formatted_content)
-            return True
+            formatted_content = self.template.render(content)
         except Exception as e:
-            messagebox.showerror("Błąd", f"Nie można zapisać podglądu: {str(e)}")
-            return False
+            self._ui_queue.put((messagebox.showerror, ("Błąd", f"Nie można wczytać szablonu: {str(e)}")))
+            formatted_content = content
+        # Otwarte karty przeglądarki odświeżą się same
+        self.server.update(formatted_content)
+
+    def _process_ui_queue(self):
+        """Wykonuje w wątku Tk zadania zlecone przez wątki robocze"""
+        try:
+            while True:
+                callback, args = self._ui_queue.get_nowait()
+                callback(*args)
+        except queue.Empty:
+            pass
+        self.root.after(50, self._process_ui_queue)
 
     def open_preview(self):
         """Otwiera podgląd w domyślnej przeglądarce"""
-        if self.update_preview():
-            webbrowser.open(f"file://{self.preview_file}")
+        if self.update_preview() and not self.server.has_clients:
+            # Nowa karta tylko gdy żadna nie nasłuchuje zmian
+            webbrowser.open(self.server.url)
+
+    def on_text_modified(self, event=None):
+        """Planuje odświeżenie podglądu po zakończeniu serii zmian w edytorze"""
+        if not self.text_editor.edit_modified():
+            return
+        self.text_editor.edit_modified(False)
+        if self._loading:
+            # Podgląd wczytywanego pliku jest renderowany przez wątek roboczy
+            return
+        if self._pending_update is not None:
+            self.root.after_cancel(self._pending_update)
+        self._pending_update = self.root.after(PREVIEW_DEBOUNCE_MS, self._debounced_update)
+
+    def _debounced_update(self):
+        self._pending_update = None
+        self.update_preview()
+
+    def on_close(self):
+        """Zatrzymuje serwer podglądu i zamyka aplikację"""
+        self._stop_loading()
+        self._preview_executor.shutdown(wait=False)
+        self.server.stop()
+        self.root.destroy()
 
     def choose_file(self):
         file_path = filedialog.askopenfilename(
@@ -141,21 +204,90 @@ class HTMLPreviewApp:
             self.load_html_file(default_file)
 
     def load_html_file(self, file_path):
-        """Wczytuje zawartość pliku HTML"""
+        """Wczytuje zawartość pliku HTML w tle, przerywając poprzednie wczytywanie"""
+        self._stop_loading()
+        cancel = threading.Event()
+        self._load_cancel = cancel
+        self._loading = True
+
+        self.text_editor.delete("1.0", tk.END)
+        self.progress.configure(value=0)
+        self.progress.pack(side=tk.LEFT, padx=5)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+
+        threading.Thread(
+            target=self._read_file_worker,
+            args=(file_path, cancel),
+            daemon=True
+        ).start()
+
+    def _read_file_worker(self, file_path, cancel):
+        """Odczytuje plik i aktualizuje podgląd w wątku roboczym"""
         try:
+            blocks = []
             with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read()
-                # Aktualizuj edytor
-                self.text_editor.delete("1.0", tk.END)
-                self.text_editor.insert("1.0", content)
-                # Aktualizuj podgląd
-                self.update_preview()
+                while not cancel.is_set():
+                    block = file.read(READ_BLOCK_CHARS)
+                    if not block:
+                        break
+                    blocks.append(block)
+            if cancel.is_set():
+                return
+            content = "".join(blocks)
+            self._ui_queue.put((self._insert_batch, (content, 0, cancel)))
+            # Podgląd nie czeka na wypełnienie edytora
+            self._preview_executor.submit(self._publish_preview, content)
         except Exception as e:
-            messagebox.showerror("Błąd", f"Nie można wczytać pliku: {str(e)}")
+            if not cancel.is_set():
+                self._ui_queue.put((self._loading_failed, (str(e), cancel)))
+
+    def _insert_batch(self, content, offset, cancel):
+        """Wstawia kolejną porcję tekstu do edytora i planuje następną"""
+        if cancel.is_set():
+            return
+        end = offset + INSERT_BATCH_CHARS
+        self.text_editor.insert(tk.END, content[offset:end])
+
+        if end < len(content):
+            self.progress.configure(value=100 * end / len(content))
+            self.root.after(1, self._insert_batch, content, end, cancel)
+        else:
+            self._finish_loading(cancel)
+
+    def _loading_failed(self, message, cancel):
+        self._finish_loading(cancel)
+        messagebox.showerror("Błąd", f"Nie można wczytać pliku: {message}")
+
+    def _finish_loading(self, cancel):
+        if cancel is not self._load_cancel:
+            return
+        self._load_cancel = None
+        self._loading = False
+        self.text_editor.edit_modified(False)
+        self.progress.pack_forget()
+        self.cancel_btn.pack_forget()
+
+    def _stop_loading(self):
+        """Przerywa trwające wczytywanie pliku; zwraca True jeśli jakieś trwało"""
+        cancel = self._load_cancel
+        if cancel is None:
+            return False
+        cancel.set()
+        self._finish_loading(cancel)
+        return True
+
+    def cancel_loading(self):
+        """Anuluje wczytywanie na żądanie użytkownika"""
+        if not self._stop_loading():
+            return
+        # Nie zostawiaj w edytorze częściowo wczytanej treści
+        self.text_editor.delete("1.0", tk.END)
+        self.text_editor.edit_modified(False)
+        self.file_label.configure(text="Anulowano wczytywanie")
 
     def refresh_preview(self):
         """Odświeża podgląd"""
-        self.update_preview()
+        # open_preview renderuje stronę - osobne update_preview renderowałoby ją drugi raz
         self.open_preview()
 
     def save_preview(self):
@@ -182,7 +314,6 @@ class HTMLPreviewApp:
                 
                 # Jeśli zapisano jako podglad.html, odśwież widok w przeglądarce
                 if os.path.basename(save_path) == "podglad.html":
-                    self.preview_file = save_path
                     self.open_preview()
             except Exception as e:
                 messagebox.showerror("Błąd", f"Nie można zapisać pliku: {str(e)}")
@@ -3,29 +3,215 @@ import logging
 import tkinter as tk
 from tkinter import filedialog
 import glob
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple, Union
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
 import time
 import random
 from enum import Enum
 from dataclasses import dataclass
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from functools import lru_cache
-import hashlib
 import json
-from pathlib import Path
-import pickle
+import re
+from email.utils import parsedate_to_datetime
 
+import httpx
+
+try:
+    import groq
+except ImportError:
+    groq = None
+
+from .cache import ResponseCache
+from .chunk_tuner import ChunkSizeTuner, chunk_tokens_for_text
+from .concurrency import AdaptiveConcurrencyLimiter
+from .deadline import Cancelled, Deadline, DeadlineExceeded
 from .file_handler import FileHandler
 from .html_validator import HTMLValidator
+from .http_client import DEFAULT_API_BASE, HTTPPoolConfig, create_http_client, warm_up_pool
+from .image_manifest import FIGURES_VERSION, ImageManifest, extract_figures
+from .metrics import Metrics
+from .model_router import FAST_TIER, LARGE_TIER, ModelRouter
+from .profiler import profiler
+from .resilience import CircuitBreaker, CircuitOpenError, RetryBudget
+from .similarity import NearDuplicateIndex, apply_text_changes, word_changes
 from .validator import Validator
-from .config import MAX_TOKENS, PROMPT
+from .config import (
+    CONTINUATION_PROMPT, MAX_CONTINUATIONS, MAX_TOKENS, NEAR_DUPLICATE_PATCH_PROMPT, PROMPT,
+    TOKENS_PER_CHAR
+)
 
 logger = logging.getLogger(__name__)
 
+# Maksymalna liczba tokenów na część (llama3-70b-8192 ma limit 8192, zostawiamy miejsce na prompt)
+MAX_CHUNK_TOKENS = 6000
+
+# Co ile sekund oczekujący na miejsce w limicie zapytań sprawdza anulowanie
+SLOT_POLL_INTERVAL = 0.5
+
+# Minimalna długość wspólnego fragmentu uznawanego za powtórzenie przy sklejaniu
+MIN_STITCH_OVERLAP = 10
+# Maksymalna długość sprawdzanego powtórzenia na styku części odpowiedzi
+MAX_STITCH_OVERLAP = 2000
+# Ile końcowych znaków uciętej odpowiedzi trafia do zapytania o kontynuację -
+# cała odpowiedź razem z promptem przekroczyłaby okno kontekstu modelu
+CONTINUATION_TAIL_CHARS = 2000
+
+# Wzorce usuwane z wygenerowanego HTML
+UNSAFE_HTML_PATTERNS = [
+    '<script', 'javascript:', 'data:',
+    'onclick=', 'onload=', 'onerror=',
+    'onmouseover=', 'onmouseout=', 'onsubmit='
+]
+# Wzorce, przy których tekst wejściowy jest odrzucany
+SUSPICIOUS_TEXT_PATTERNS = ['<script', 'javascript:', 'data:']
+# Wyszukiwanie bez względu na wielkość liter bez kopii tekstu z lower() -
+# dla tekstu z polskimi znakami lower() alokuje kilkanaście razy więcej pamięci niż sam tekst
+_PATTERN_REGEXES = {
+    pattern: re.compile(re.escape(pattern), re.IGNORECASE) for pattern in UNSAFE_HTML_PATTERNS
+}
+
+def stitch_continuation(partial: str, continuation: str) -> str:
+    """
+    Skleja uciętą odpowiedź z jej kontynuacją, usuwając powtórzony fragment.
+    
+    Args:
+        partial: Ucięta odpowiedź modelu
+        continuation: Dalszy ciąg zwrócony przez model
+        
+    Returns:
+        str: Sklejona odpowiedź
+    """
+    # Model zaczął artykuł od nowa - kontynuacja zastępuje uciętą część
+    if continuation.lstrip().startswith("<article"):
+        return continuation
+    
+    # Najdłuższy koniec uciętej odpowiedzi powtórzony na początku kontynuacji
+    longest = min(len(partial), len(continuation), MAX_STITCH_OVERLAP)
+    for overlap in range(longest, MIN_STITCH_OVERLAP - 1, -1):
+        if partial.endswith(continuation[:overlap]):
+            return partial + continuation[overlap:]
+    
+    # Bez powtórzenia - porównaj też bez wiodących białych znaków
+    stripped = continuation.lstrip()
+    longest = min(len(partial), len(stripped), MAX_STITCH_OVERLAP)
+    for overlap in range(longest, MIN_STITCH_OVERLAP - 1, -1):
+        if partial.rstrip().endswith(stripped[:overlap]):
+            return partial.rstrip() + stripped[overlap:]
+    
+    return partial + continuation
+
+def continuation_tail(partial: str, max_chars: int = CONTINUATION_TAIL_CHARS) -> str:
+    """
+    Zwraca koniec uciętej odpowiedzi przekazywany w zapytaniu o kontynuację.
+    
+    Skrócony fragment zaczyna się od pierwszego tagu, aby model nie widział
+    urwanego tekstu lub atrybutu.
+    
+    Args:
+        partial: Ucięta odpowiedź modelu
+        max_chars: Maksymalna długość fragmentu
+        
+    Returns:
+        str: Końcowy fragment odpowiedzi
+    """
+    if len(partial) <= max_chars:
+        return partial
+    tail = partial[-max_chars:]
+    tag_start = tail.find("<")
+    return tail[tag_start:] if tag_start > 0 else tail
+
+def split_content_offsets(content: str, max_tokens_per_chunk: int = MAX_CHUNK_TOKENS) -> List[Tuple[int, int]]:
+    """
+    Wyznacza podział tekstu na części wzdłuż granic akapitów.
+    
+    Każda część jest ciągłym fragmentem tekstu, więc wystarczy przekazać
+    jej położenie zamiast samego tekstu (np. między procesami).
+    
+    Args:
+        content: Tekst do podziału
+        max_tokens_per_chunk: Maksymalna szacowana liczba tokenów części
+        
+    Returns:
+        List[Tuple[int, int]]: Położenia (początek, koniec) kolejnych części
+    """
+    if len(content) * TOKENS_PER_CHAR <= max_tokens_per_chunk:
+        return [(0, len(content))]
+        
+    # Podziel na akapity (oddzielone pustą linią)
+    offsets = []
+    chunk_start = 0
+    current_length = 0
+    position = 0
+    for paragraph in content.split('\n\n'):
+        paragraph_tokens = len(paragraph) * TOKENS_PER_CHAR
+        
+        if current_length + paragraph_tokens > max_tokens_per_chunk and position > chunk_start:
+            # Zapisz aktualną część (bez separatora) i zacznij nową
+            offsets.append((chunk_start, position - 2))
+            chunk_start = position
+            current_length = paragraph_tokens
+        else:
+            current_length += paragraph_tokens
+        position += len(paragraph) + 2
+        
+    # Dodaj ostatnią część
+    offsets.append((chunk_start, len(content)))
+    return offsets
+
+def validate_html(html_content: str, figures: Optional[List[Dict[str, Any]]] = None,
+                  strict: bool = False, required_tags: bool = True) -> str:
+    """
+    Waliduje wygenerowany kod HTML.
+    
+    Funkcja nie korzysta ze stanu procesora, więc może działać w osobnych procesach.
+    
+    Args:
+        html_content: Kod HTML do sprawdzenia
+        figures: Lista uzupełniana grafikami zebranymi przez parser walidacji
+        strict: Odrzucaj HTML z niezamkniętymi tagami lub bez wymaganych tagów
+            (w trybie zwykłym tylko ostrzeżenie - części artykułu nie mają np. <h1>)
+        required_tags: Czy sprawdzać wymagane tagi (False dla części dłuższego artykułu)
+        
+    Returns:
+        str: Zwalidowany kod HTML
+        
+    Raises:
+        ValueError: Gdy HTML jest niepoprawny lub niebezpieczny
+    """
+    # Podstawowa walidacja HTML - osobny parser dla każdego wywołania (wątki)
+    with profiler.stage("html_parse"):
+        html_validator = HTMLValidator()
+        html_validator.feed(html_content)
+        validation_results = html_validator.validate()
+
+    if required_tags and not validation_results["has_required_tags"]:
+        missing_tags = html_validator.required_tags - html_validator.found_tags
+        message = f"Brakuje wymaganych tagów: {', '.join(sorted(missing_tags))}"
+        if strict:
+            raise ValueError(message)
+        logger.warning(message)
+    if not validation_results["is_balanced"]:
+        message = f"Niezamknięte tagi: {', '.join(html_validator.tags)}"
+        if strict:
+            raise ValueError(message)
+        logger.warning(message)
+
+    if figures is not None:
+        figures.extend(html_validator.figures)
+
+    # Proste sprawdzenie bezpieczeństwa
+    with profiler.stage("sanitize"):
+        for pattern in UNSAFE_HTML_PATTERNS:
+            if _PATTERN_REGEXES[pattern].search(html_content):
+                html_content = html_content.replace(pattern, '')
+                logger.warning(f"Usunięto niebezpieczny wzorzec: {pattern}")
+
+    return html_content
+
 class APIErrorType(Enum):
     RATE_LIMIT = "rate_limit"
     CONTEXT_LENGTH = "context_length"
@@ -33,6 +219,8 @@ class APIErrorType(Enum):
     AUTH_ERROR = "auth_error"
     SERVER_ERROR = "server_error"
     TIMEOUT = "timeout"
+    CONNECTION_ERROR = "connection_error"
+    CIRCUIT_OPEN = "circuit_open"
     UNKNOWN = "unknown"
 
 @dataclass
@@ -40,12 +228,24 @@ class APIError:
     type: APIErrorType
     message: str
     retryable: bool
-    retry_after: Optional[int] = None
+    retry_after: Optional[float] = None
     details: Optional[Dict[str, Any]] = None
 
 class APIErrorHandler:
     """Klasa obsługująca błędy API."""
     
+    # Typy błędów, po których warto ponowić zapytanie
+    RETRYABLE = {
+        APIErrorType.RATE_LIMIT,
+        APIErrorType.SERVER_ERROR,
+        APIErrorType.TIMEOUT,
+        APIErrorType.CONNECTION_ERROR
+    }
+    
+    # Domyślne opóźnienie dla rate limit bez wskazówki dostawcy (s)
+    DEFAULT_RATE_LIMIT_DELAY = 60
+    
+    # Dopasowanie tekstu - tylko gdy wyjątek nie niesie typu ani statusu HTTP
     ERROR_PATTERNS = {
         "rate limit": APIErrorType.RATE_LIMIT,
         "too many requests": APIErrorType.RATE_LIMIT,
@@ -57,137 +257,276 @@ class APIErrorHandler:
         "internal server error": APIErrorType.SERVER_ERROR,
         "service unavailable": APIErrorType.SERVER_ERROR,
         "timeout": APIErrorType.TIMEOUT,
-        "deadline exceeded": APIErrorType.TIMEOUT
+        "timed out": APIErrorType.TIMEOUT,
+        "deadline exceeded": APIErrorType.TIMEOUT,
+        "connection error": APIErrorType.CONNECTION_ERROR
     }
+    _PATTERN = re.compile("|".join(re.escape(pattern) for pattern in ERROR_PATTERNS), re.IGNORECASE)
+    # Groq zwraca 413 także po przekroczeniu limitu tokenów na minutę (TPM) - to limit
+    # przepustowości, a nie rozmiaru kontekstu
+    _THROUGHPUT_PATTERN = re.compile(r"tokens per minute|\btpm\b|rate[ _]limit", re.IGNORECASE)
+    # "retry after 20", "Please try again in 7.66s", "try again in 450ms"
+    _RETRY_AFTER_PATTERN = re.compile(
+        r"(?:retry after|try again in)\s+(\d+(?:\.\d+)?)\s*(ms|s)?", re.IGNORECASE
+    )
+    # Czas w nagłówkach x-ratelimit-reset-* (np. "2m59.56s", "7.66s", "450ms")
+    _DURATION_PATTERN = re.compile(r"(?:(\d+)h)?(?:(\d+)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+)ms)?$")
+    
+    @staticmethod
+    def _status_type(status_code: int, message: str) -> APIErrorType:
+        """Typ błędu na podstawie statusu HTTP."""
+        if status_code == 429:
+            return APIErrorType.RATE_LIMIT
+        if status_code in (401, 403):
+            return APIErrorType.AUTH_ERROR
+        if status_code in (408, 504):
+            return APIErrorType.TIMEOUT
+        if status_code >= 500:
+            return APIErrorType.SERVER_ERROR
+        if status_code == 413 and APIErrorHandler._THROUGHPUT_PATTERN.search(message):
+            return APIErrorType.RATE_LIMIT
+        if status_code == 413 or "context_length" in message or "context length" in message:
+            return APIErrorType.CONTEXT_LENGTH
+        return APIErrorType.INVALID_REQUEST
     
     @classmethod
-    def classify_error(cls, error: Exception) -> APIError:
-        """Klasyfikuje błąd API na podstawie komunikatu."""
-        error_message = str(error).lower()
-        
-        # Sprawdź znane wzorce błędów
-        for pattern, error_type in cls.ERROR_PATTERNS.items():
-            if pattern in error_message:
-                retryable = error_type in [
-                    APIErrorType.RATE_LIMIT,
-                    APIErrorType.SERVER_ERROR,
-                    APIErrorType.TIMEOUT
-                ]
-                
-                # Próba wydobycia czasu oczekiwania dla rate limit
-                retry_after = None
-                if error_type == APIErrorType.RATE_LIMIT:
-                    import re
-                    retry_match = re.search(r"retry after (\d+)", error_message)
-                    if retry_match:
-                        retry_after = int(retry_match.group(1))
-                    else:
-                        retry_after = 60  # domyślne opóźnienie dla rate limit
-                
-                return APIError(
-                    type=error_type,
-                    message=str(error),
-                    retryable=retryable,
-                    retry_after=retry_after
-                )
-        
-        # Nieznany błąd
-        return APIError(
-            type=APIErrorType.UNKNOWN,
-            message=str(error),
-            retryable=False
-        )
-
-class ResponseCache:
-    """Klasa obsługująca buforowanie odpowiedzi API."""
+    def _parse_duration(cls, value: str) -> Optional[float]:
+        match = cls._DURATION_PATTERN.match(value.strip())
+        if not match or not any(match.groups()):
+            return None
+        hours, minutes, seconds, milliseconds = match.groups()
+        return (int(hours or 0) * 3600 + int(minutes or 0) * 60
+                + float(seconds or 0) + int(milliseconds or 0) / 1000)
     
-    def __init__(self, cache_dir: str = None):
-        if cache_dir is None:
-            # Użyj katalogu .cache w katalogu projektu
-            project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            cache_dir = os.path.join(project_dir, '.cache')
-        
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
-        self._lock = threading.Lock()
-        
-        # Wyczyść cache przy starcie
-        self.clear()
-        
-    def clear(self):
-        """Czyści cache."""
-        if self.cache_dir.exists():
-            for cache_file in self.cache_dir.glob('*.pkl'):
+    @classmethod
+    def _retry_after_from_headers(cls, headers) -> Optional[float]:
+        """Czas oczekiwania z nagłówków retry-after lub x-ratelimit-reset-*."""
+        if not headers:
+            return None
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                # Format daty HTTP
                 try:
-                    cache_file.unlink()
-                except Exception as e:
-                    logger.warning(f"Nie można usunąć pliku cache {cache_file}: {e}")
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        resets = [
+            cls._parse_duration(headers[name])
+            for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+            if headers.get(name)
+        ]
+        resets = [reset for reset in resets if reset is not None]
+        return max(resets) if resets else None
+    
+    @classmethod
+    def _retry_after_from_message(cls, message: str) -> Optional[float]:
+        match = cls._RETRY_AFTER_PATTERN.search(message)
+        if not match:
+            return None
+        value = float(match.group(1))
+        return value / 1000 if match.group(2) and match.group(2).lower() == "ms" else value
+    
+    @classmethod
+    def classify_error(cls, error: Exception) -> APIError:
+        """
+        Klasyfikuje błąd API.
         
-    def _get_cache_key(self, prompt: str) -> str:
-        """Generuje klucz cache na podstawie promptu."""
-        return hashlib.md5(prompt.encode()).hexdigest()
+        Kolejność: typ wyjątku klienta Groq, status HTTP i nagłówki odpowiedzi,
+        a dopiero na końcu treść komunikatu.
+        """
+        message = str(error)
+        error_type = None
         
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """Zwraca ścieżkę do pliku cache."""
-        return self.cache_dir / f"{cache_key}.pkl"
+        if isinstance(error, CircuitOpenError):
+            return APIError(type=APIErrorType.CIRCUIT_OPEN, message=message, retryable=False)
+        if groq is not None and isinstance(error, groq.APITimeoutError):
+            error_type = APIErrorType.TIMEOUT
+        elif groq is not None and isinstance(error, groq.APIConnectionError):
+            error_type = APIErrorType.CONNECTION_ERROR
+        elif isinstance(error, (httpx.TimeoutException, TimeoutError)):
+            error_type = APIErrorType.TIMEOUT
+        elif isinstance(error, (httpx.TransportError, ConnectionError)):
+            error_type = APIErrorType.CONNECTION_ERROR
         
-    def get(self, prompt: str) -> Optional[str]:
-        """Pobiera odpowiedź z cache."""
-        cache_key = self._get_cache_key(prompt)
-        cache_path = self._get_cache_path(cache_key)
+        response = getattr(error, "response", None)
+        status_code = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+        if error_type is None and isinstance(status_code, int):
+            error_type = cls._status_type(status_code, message.lower())
         
-        if cache_path.exists():
-            with self._lock:
-                try:
-                    with cache_path.open('rb') as f:
-                        cached_data = pickle.load(f)
-                        logger.debug(f"Znaleziono w cache: {cache_key}")
-                        return cached_data['response']
-                except Exception as e:
-                    logger.warning(f"Błąd odczytu cache: {str(e)}")
-                    return None
-        return None
+        if error_type is None:
+            match = cls._PATTERN.search(message)
+            error_type = cls.ERROR_PATTERNS[match.group(0).lower()] if match else APIErrorType.UNKNOWN
         
-    def set(self, prompt: str, response: str) -> None:
-        """Zapisuje odpowiedź do cache."""
-        cache_key = self._get_cache_key(prompt)
-        cache_path = self._get_cache_path(cache_key)
+        retry_after = None
+        if error_type == APIErrorType.RATE_LIMIT:
+            # Wartość 0 ("ponów od razu") jest prawidłową wskazówką - zastępujemy tylko jej brak
+            retry_after = cls._retry_after_from_headers(getattr(response, "headers", None))
+            if retry_after is None:
+                retry_after = cls._retry_after_from_message(message)
+            if retry_after is None:
+                retry_after = cls.DEFAULT_RATE_LIMIT_DELAY
+        elif error_type in cls.RETRYABLE:
+            retry_after = cls._retry_after_from_headers(getattr(response, "headers", None))
         
-        with self._lock:
-            try:
-                cached_data = {
-                    'prompt': prompt,
-                    'response': response,
-                    'timestamp': time.time()
-                }
-                with cache_path.open('wb') as f:
-                    pickle.dump(cached_data, f)
-                logger.debug(f"Zapisano w cache: {cache_key}")
-            except Exception as e:
-                logger.warning(f"Błąd zapisu cache: {str(e)}")
+        return APIError(
+            type=error_type,
+            message=message,
+            retryable=error_type in cls.RETRYABLE,
+            retry_after=retry_after,
+            details={"status_code": status_code} if status_code else None
+        )
 
 # Klasa odpowiedzialna za przetwarzanie artykułów
 # Funkcjonalności:
 # - Komunikacja z API Groq
+# - Wybór szybkiego lub dużego modelu według rozmiaru artykułu, z eskalacją
 # - Buforowanie odpowiedzi
+# - Opcjonalne ponowne użycie odpowiedzi dla prawie identycznych fragmentów
 # - Wielowątkowe przetwarzanie dużych plików
+# - Opcjonalny dobór rozmiaru części do zmierzonych opóźnień modelu i równoległości
+# - Adaptacyjny limit równoległych zapytań do API
+# - Współdzielona pula połączeń HTTP z utrzymywaniem połączeń
 # - Walidacja HTML
-# - Obsługa błędów API
+# - Obsługa błędów API: wspólny budżet ponowień i wyłącznik obwodu
+# - Limity czasu zapytań, artykułów i przetwarzania wsadowego z anulowaniem
 class ArticleProcessor:
     """Główna klasa przetwarzająca artykuły."""
     
-    def __init__(self, max_workers: int = 3):
+    def __init__(self, max_workers: int = 3, min_workers: Optional[int] = None,
+                 max_concurrency: Optional[int] = None, llm=None,
+                 http_config: Optional[HTTPPoolConfig] = None, fast_llm=None):
         """Inicjalizuje obiekt ArticleProcessor.
         
+        Połączenie z API jest tworzone dopiero przy pierwszym zapytaniu, więc
+        operacje bez wywołań modelu (np. planowanie) nie wymagają klucza API.
+        
         Args:
-            max_workers: Maksymalna liczba wątków do przetwarzania plików
+            max_workers: Początkowa liczba równoległych zapytań do API
+            min_workers: Dolna granica limitu (domyślnie MIN_CONCURRENT_REQUESTS lub 1)
+            max_concurrency: Górna granica limitu (domyślnie MAX_CONCURRENT_REQUESTS lub 16)
+            llm: Gotowy klient modelu (domyślnie ChatGroq tworzony z GROQ_API_KEY)
+            http_config: Ustawienia puli połączeń HTTP (domyślnie ze zmiennych HTTP_*)
+            fast_llm: Gotowy klient szybkiego modelu (domyślnie tworzony, gdy włączony
+                jest wybór modelu - FAST_MODEL_MAX_TOKENS)
         """
-        self._initialize_api()
+        load_dotenv()
+        self._llm = llm
+        self._fast_llm = fast_llm
+        self._lock = threading.Lock()
         self.file_handler = FileHandler()
-        self.html_validator = HTMLValidator()
         self.cache = ResponseCache()
+        self.use_cache = os.getenv('CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
         self.max_workers = max_workers
-        self._lock = threading.Lock()
+        self.metrics = Metrics()
+        self.router = ModelRouter.from_env(metrics=self.metrics)
+        self.http_config = http_config or HTTPPoolConfig.from_env()
+        self.http_client = None
+        
+        # Limity czasu: pojedynczego zapytania i całego artykułu (None - bez limitu)
+        self.request_timeout = float(os.getenv('REQUEST_TIMEOUT', self.http_config.read_timeout))
+        # Mnożnik przerw między ponowieniami (np. 0.25 przy odtwarzaniu ruchu z --replay-speed 4)
+        self.retry_delay_scale = 1.0
+        self.article_timeout = (
+            float(os.getenv('ARTICLE_TIMEOUT')) if os.getenv('ARTICLE_TIMEOUT') else None
+        )
+        
+        if min_workers is None:
+            min_workers = int(os.getenv('MIN_CONCURRENT_REQUESTS', 1))
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('MAX_CONCURRENT_REQUESTS', 16))
+        self.limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=max_workers,
+            min_limit=min_workers,
+            max_limit=max(max_concurrency, min_workers),
+            metrics=self.metrics
+        )
+        # Ponowienia wszystkich wątków ograniczone wspólnie; awaria dostawcy przerywa zapytania
+        self.retry_budget = RetryBudget.from_env(metrics=self.metrics)
+        self.circuit_breaker = CircuitBreaker.from_env(metrics=self.metrics)
+        
+        # Dobór rozmiaru części - obserwacje opóźnień zbierane zawsze, dobór domyślnie wyłączony
+        self.chunk_tuner = ChunkSizeTuner(
+            self.cache.cache_dir,
+            requests_per_minute=float(os.getenv('RATE_LIMIT_RPM')) if os.getenv('RATE_LIMIT_RPM') else None,
+            tokens_per_minute=float(os.getenv('RATE_LIMIT_TPM')) if os.getenv('RATE_LIMIT_TPM') else None
+        )
+        self.autotune_chunks = os.getenv('CHUNK_AUTOTUNE', 'false').lower() in ('1', 'true', 'yes')
+        
+        # Indeks prawie identycznych fragmentów - domyślnie wyłączony
+        self.near_duplicates: Optional[NearDuplicateIndex] = None
+        self.near_duplicate_mode = os.getenv('NEAR_DUPLICATE_MODE', 'reuse')
+        if os.getenv('NEAR_DUPLICATE_THRESHOLD'):
+            self.enable_near_duplicates(float(os.getenv('NEAR_DUPLICATE_THRESHOLD')),
+                                        self.near_duplicate_mode)
+        
+        # Manifest promptów grafik - domyślnie wyłączony
+        self.image_manifest: Optional[ImageManifest] = None
+        
+    def set_cache_dir(self, cache_dir: str) -> None:
+        """
+        Przenosi cache odpowiedzi razem ze stanem doboru części i indeksem podobieństwa.
+        
+        Args:
+            cache_dir: Nowy katalog cache
+        """
+        self.cache = ResponseCache(cache_dir)
+        self.chunk_tuner = ChunkSizeTuner(
+            self.cache.cache_dir,
+            requests_per_minute=self.chunk_tuner.requests_per_minute,
+            tokens_per_minute=self.chunk_tuner.tokens_per_minute
+        )
+        if self.near_duplicates is not None:
+            self.near_duplicates = NearDuplicateIndex(
+                self.cache, self.near_duplicates.threshold, metrics=self.metrics
+            )
+        
+    def enable_near_duplicates(self, threshold: float = 0.9, mode: str = 'reuse') -> None:
+        """
+        Włącza ponowne użycie odpowiedzi dla prawie identycznych fragmentów.
+        
+        Args:
+            threshold: Minimalne szacowane podobieństwo fragmentów (0-1)
+            mode: 'reuse' - użyj odpowiedzi bez zmian, 'patch' - nanieś zmiany tekstu
+                lokalnie lub poproś model o krótką łatkę
+                
+        Raises:
+            ValueError: Gdy próg lub tryb są nieprawidłowe
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"Próg podobieństwa musi być z przedziału (0, 1]: {threshold}")
+        if mode not in ('reuse', 'patch'):
+            raise ValueError(f"Nieznany tryb ponownego użycia: {mode}")
+        self.near_duplicates = NearDuplicateIndex(self.cache, threshold, metrics=self.metrics)
+        self.near_duplicate_mode = mode
+        
+    @property
+    def llm(self):
+        """Klient modelu, inicjalizowany przy pierwszym użyciu."""
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    self._initialize_api()
+        return self._llm
+        
+    @llm.setter
+    def llm(self, value) -> None:
+        # Szybki model podmienia się osobno (fast_llm), więc wybór modelu działa dalej
+        self._llm = value
+        
+    @property
+    def fast_llm(self):
+        """Klient szybkiego modelu lub None, gdy wszystkie fragmenty trafiają do dużego modelu."""
+        if self._llm is None:
+            # Oba klienty powstają razem przy pierwszym użyciu
+            self.llm
+        return self._fast_llm
+        
+    @fast_llm.setter
+    def fast_llm(self, value) -> None:
+        self._fast_llm = value
         
     def _initialize_api(self) -> None:
         """Inicjalizuje połączenie z API."""
@@ -196,13 +535,38 @@ class ArticleProcessor:
         if not api_key:
             raise ValueError("Nie znaleziono GROQ_API_KEY w zmiennych środowiskowych")
             
-        self.llm = ChatGroq(
-            temperature=0,
-            groq_api_key=api_key,
-            model_name="llama3-70b-8192"
-        )
+        # Wspólna pula połączeń dla wszystkich wątków - bez nowych uzgodnień TLS przy każdym zapytaniu
+        self.http_client = create_http_client(self.http_config, self.limiter.max_limit)
+        
+        def create_model(model_name: str) -> ChatGroq:
+            return ChatGroq(
+                temperature=0,
+                groq_api_key=api_key,
+                model_name=model_name,
+                http_client=self.http_client,
+                request_timeout=self.http_config.timeout
+            )
+            
+        self._llm = create_model(self.router.large_model)
+        if self.router.enabled and self._fast_llm is None:
+            self._fast_llm = create_model(self.router.fast_model)
+        
+    def warm_up_connections(self) -> int:
+        """
+        Otwiera połączenia z API przed pierwszym zapytaniem.
+        
+        Returns:
+            int: Liczba otwartych połączeń (0, gdy klient modelu nie używa puli procesora)
+        """
+        llm = self.llm
+        if self.http_client is None:
+            return 0
+        base_url = getattr(llm, 'groq_api_base', None) or DEFAULT_API_BASE
+        connections = min(self.limiter.limit, self.http_config.size_for(self.limiter.max_limit))
+        return warm_up_pool(self.http_client, base_url, connections)
         
-    def _validate_content_size(self, content: str) -> None:
+    @staticmethod
+    def _validate_content_size(content: str) -> None:
         """
         Sprawdza czy zawartość nie przekracza limitów.
         
@@ -217,11 +581,16 @@ class ArticleProcessor:
             
         # Sprawdź maksymalny rozmiar pliku z konfiguracji
         max_size = int(os.getenv('MAX_FILE_SIZE_MB', 10)) * 1024 * 1024  # MB na bajty
-        if len(content.encode('utf-8')) > max_size:
+        # Znak zajmuje w UTF-8 od 1 do 4 bajtów - tekst jest kodowany (kopiowany)
+        # tylko wtedy, gdy sama liczba znaków nie rozstrzyga
+        if len(content) > max_size or (
+            not content.isascii() and len(content) * 4 > max_size
+            and len(content.encode('utf-8')) > max_size
+        ):
             raise ValueError(f"Tekst przekracza maksymalny rozmiar {max_size/1024/1024}MB")
             
         # Dodatkowa walidacja bezpieczeństwa
-        if any(suspicious in content.lower() for suspicious in ['<script', 'javascript:', 'data:']):
+        if any(_PATTERN_REGEXES[suspicious].search(content) for suspicious in SUSPICIOUS_TEXT_PATTERNS):
             raise ValueError("Wykryto potencjalnie niebezpieczną zawartość")
             
     def _split_large_content(self, content: str) -> List[str]:
@@ -234,59 +603,211 @@ class ArticleProcessor:
         Returns:
             List[str]: Lista mniejszych fragmentów tekstu
         """
-        # Maksymalna liczba tokenów na część (z marginesem bezpieczeństwa)
-        max_tokens_per_chunk = 6000  # llama3-70b-8192 ma limit 8192, zostawiamy miejsce na prompt
+        max_tokens = chunk_tokens_for_text(content, self.chunk_policy(), MAX_CHUNK_TOKENS)
+        offsets = split_content_offsets(content, max_tokens)
+        if len(offsets) > 1:
+            logger.info(f"Podzielono tekst na {len(offsets)} części (do {max_tokens} tokenów)")
+        return [content[start:end] for start, end in offsets]
         
-        # Przybliżona liczba tokenów (zakładamy średnio 4 znaki na token)
-        tokens_per_char = 0.25
-        estimated_tokens = len(content) * tokens_per_char
+    def chunk_policy(self) -> Optional[Dict[str, Any]]:
+        """
+        Zwraca parametry doboru rozmiaru części (zob. optimal_chunk_tokens).
         
-        if estimated_tokens <= max_tokens_per_chunk:
-            return [content]
-            
-        # Podziel na akapity
-        paragraphs = content.split('\n\n')
-        chunks = []
-        current_chunk = []
-        current_length = 0
+        Części dzielonych artykułów generuje duży model, a liczba równoległych
+        części to górny limit zapytań - bieżący limit zmienia się w trakcie
+        wsadu, a od rozmiaru części zależą klucze cache i plan (--plan).
         
-        for paragraph in paragraphs:
-            paragraph_tokens = len(paragraph) * tokens_per_char
-            
-            if current_length + paragraph_tokens > max_tokens_per_chunk and current_chunk:
-                # Zapisz aktualny chunk i zacznij nowy
-                chunks.append('\n\n'.join(current_chunk))
-                current_chunk = [paragraph]
-                current_length = paragraph_tokens
-            else:
-                current_chunk.append(paragraph)
-                current_length += paragraph_tokens
+        Returns:
+            Optional[Dict[str, Any]]: Parametry lub None, gdy dobór jest wyłączony
+        """
+        if not self.autotune_chunks:
+            return None
+        return self.chunk_tuner.policy(self.router.large_model, self.limiter.max_limit, MAX_CHUNK_TOKENS)
         
-        # Dodaj ostatni chunk
-        if current_chunk:
-            chunks.append('\n\n'.join(current_chunk))
-            
-        logger.info(f"Podzielono tekst na {len(chunks)} części")
-        return chunks
+    def record_cache_lookup(self, hit: bool, count: int = 1) -> None:
+        """Zlicza trafienia lub chybienia cache (statystyki cache i metryki bieżącego uruchomienia)."""
+        self.cache.record_lookup(hit, count)
+        self.metrics.increment("cache_hits" if hit else "cache_misses", count)
+        
+    def record_planned_chunks(self, count: int) -> None:
+        """Zlicza podzielony artykuł i jego części (postęp i szacowany czas w panelu)."""
+        self.metrics.increment("articles_planned")
+        self.metrics.increment("chunks_planned", count)
+        
+    @staticmethod
+    def build_chunk_prompt(chunk: str, chunk_index: int, total_chunks: int) -> str:
+        """Tworzy prompt (i zarazem klucz cache) dla fragmentu tekstu."""
+        return f"{PROMPT}\n\nCzęść {chunk_index + 1}/{total_chunks}:\n\n{chunk}"
         
-    def _process_chunk(self, chunk: str, chunk_index: int, total_chunks: int) -> str:
-        """Przetwarza pojedynczy fragment tekstu."""
-        prompt = f"{PROMPT}\n\nCzęść {chunk_index + 1}/{total_chunks}:\n\n{chunk}"
+    def _process_chunk(self, chunk: str, chunk_index: int, total_chunks: int,
+                       figures: Optional[List[Dict[str, Any]]] = None,
+                       deadline: Optional[Deadline] = None) -> str:
+        """
+        Przetwarza pojedynczy fragment tekstu.
+        
+        Args:
+            chunk: Tekst fragmentu
+            chunk_index: Numer fragmentu
+            total_chunks: Liczba fragmentów
+            figures: Lista uzupełniana grafikami fragmentu (dla manifestu grafik)
+            deadline: Termin przetwarzania artykułu
+            
+        Returns:
+            str: Kod HTML fragmentu
+        """
+        if deadline is not None:
+            deadline.check()
+        prompt = self.build_chunk_prompt(chunk, chunk_index, total_chunks)
         
         # Sprawdź cache
-        cached_response = self.cache.get(prompt)
-        if cached_response:
-            logger.info(f"Użyto cache dla części {chunk_index + 1}/{total_chunks}")
-            return cached_response
+        if self.use_cache:
+            entry = self.cache.get_entry(self.cache.key_for(prompt))
+            self.record_cache_lookup(bool(entry and entry['response']))
+            if entry and entry['response']:
+                logger.info(f"Użyto cache dla części {chunk_index + 1}/{total_chunks}")
+                if figures is not None:
+                    if entry.get('figures_version') != FIGURES_VERSION:
+                        # Wpis sprzed manifestu grafik lub zmiany pól promptu - przeanalizuj raz i zapamiętaj
+                        entry['figures'] = extract_figures(entry['response'])
+                        self.cache.set(prompt, entry['response'], figures=entry['figures'],
+                                       figures_version=FIGURES_VERSION, tier=entry.get('tier'))
+                    figures.extend(entry['figures'])
+                self.metrics.increment("chunks_done")
+                return entry['response']
+            
+        html_content = None
+        collected: List[Dict[str, Any]] = []
+        if self.use_cache and self.near_duplicates is not None:
+            html_content = self._reuse_near_duplicate(chunk, deadline)
+            if html_content:
+                logger.info(f"Użyto odpowiedzi dla podobnego fragmentu w części "
+                            f"{chunk_index + 1}/{total_chunks}")
+                collected = extract_figures(html_content)
             
-        # Generuj nową odpowiedź
-        html_content = self.generate_html(prompt)
+        # Generuj nową odpowiedź - grafiki zbiera walidacja
+        tier = None
+        if not html_content:
+            html_content, tier = self._generate_routed(prompt, chunk, total_chunks, collected, deadline)
+        
+        if figures is not None:
+            figures.extend(collected)
         
         # Zapisz do cache
-        self.cache.set(prompt, html_content)
+        if self.use_cache:
+            self.cache.set(prompt, html_content, figures=collected, figures_version=FIGURES_VERSION,
+                           tier=tier)
+            if self.near_duplicates is not None:
+                self.near_duplicates.add(self.cache.key_for(prompt), chunk)
         
+        self.metrics.increment("chunks_done")
         return html_content
         
+    def _generate_routed(self, prompt: str, chunk: str, total_chunks: int,
+                         figures: List[Dict[str, Any]],
+                         deadline: Optional[Deadline] = None) -> Tuple[str, str]:
+        """
+        Generuje HTML modelem wybranym dla fragmentu.
+        
+        Odpowiedź szybkiego modelu przechodzi ścisłą walidację; gdy jej nie
+        przejdzie (lub zapytanie się nie powiedzie), fragment trafia do dużego modelu.
+        
+        Returns:
+            Tuple[str, str]: Kod HTML i poziom modelu, który go wygenerował
+        """
+        tier = self.router.tier_for(chunk, total_chunks) if self.fast_llm is not None else LARGE_TIER
+        if tier == FAST_TIER:
+            start = time.monotonic()
+            fast_figures: List[Dict[str, Any]] = []
+            try:
+                html_content = self.generate_html(prompt, fast_figures, deadline, tier=FAST_TIER)
+                self.router.record(FAST_TIER, time.monotonic() - start)
+                figures.extend(fast_figures)
+                return html_content, FAST_TIER
+            except (Cancelled, DeadlineExceeded):
+                raise
+            except Exception as e:
+                self.router.record(FAST_TIER, time.monotonic() - start, escalated=True)
+                logger.warning(f"Odpowiedź szybkiego modelu odrzucona ({e}) - używam dużego modelu")
+        
+        start = time.monotonic()
+        html_content = self.generate_html(prompt, figures, deadline)
+        self.router.record(LARGE_TIER, time.monotonic() - start)
+        return html_content, LARGE_TIER
+        
+    def _reuse_near_duplicate(self, chunk: str, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """
+        Szuka w cache odpowiedzi dla prawie identycznego fragmentu.
+        
+        Args:
+            chunk: Tekst fragmentu
+            deadline: Termin dla zapytania o łatkę
+            
+        Returns:
+            Optional[str]: Odpowiedź do użycia lub None, gdy trzeba wygenerować nową
+        """
+        with profiler.stage("near_duplicate_lookup"):
+            match = self.near_duplicates.query(chunk)
+        if match is None:
+            return None
+        cache_key, similarity = match
+        entry = self.cache.get_entry(cache_key)
+        if entry is None:
+            return None
+        logger.debug(f"Podobny fragment w cache: {cache_key} (podobieństwo {similarity:.2f})")
+        
+        if self.near_duplicate_mode == 'reuse':
+            return entry['response']
+        
+        # Tekst fragmentu następuje po instrukcjach i nagłówku "Część i/n:"
+        old_chunk = entry['prompt'][len(PROMPT):].split(":\n\n", 1)[-1]
+        changes = word_changes(old_chunk, chunk)
+        if changes is None:
+            self.metrics.increment("near_duplicate_patch_failures")
+            return None
+        if not changes:
+            return entry['response']
+        
+        patched = apply_text_changes(entry['response'], changes)
+        if patched is not None:
+            self.metrics.increment("near_duplicate_local_patches")
+            return patched
+        
+        patched = self._request_patch(entry['response'], changes, deadline)
+        if patched is None:
+            self.metrics.increment("near_duplicate_patch_failures")
+            return None
+        self.metrics.increment("near_duplicate_model_patches")
+        return patched
+        
+    def _request_patch(self, html_content: str, changes: List[tuple],
+                       deadline: Optional[Deadline] = None) -> Optional[str]:
+        """
+        Prosi model o listę zamian w HTML zamiast generowania całego fragmentu.
+        
+        Returns:
+            Optional[str]: Poprawiony HTML lub None, gdy łatki nie da się nanieść
+        """
+        prompt = NEAR_DUPLICATE_PATCH_PROMPT.format(
+            changes="\n".join(f"- {old} => {new}" for old, new in changes),
+            html=html_content
+        )
+        try:
+            response = self._invoke_llm([HumanMessage(content=prompt)], deadline)
+            content = response.content.strip()
+            if content.startswith("```"):
+                content = content.strip("`").split("\n", 1)[-1]
+            replacements = json.loads(content)
+            
+            for replacement in replacements:
+                old, new = replacement["stare"], replacement["nowe"]
+                if html_content.count(old) != 1:
+                    return None
+                html_content = html_content.replace(old, new)
+            return self._validate_html(html_content)
+        except Exception as e:
+            logger.warning(f"Nie udało się nanieść łatki dla podobnego fragmentu: {str(e)}")
+            return None
+        
     def get_input_file(self) -> str:
         """
         Pobiera ścieżkę do pliku wejściowego.
@@ -337,12 +858,145 @@ class ArticleProcessor:
         
         return message
         
-    def generate_html(self, prompt: str) -> str:
+    def _invoke_llm(self, messages: List[HumanMessage], deadline: Optional[Deadline] = None,
+                    llm=None):
+        """
+        Wywołuje model w ramach adaptacyjnego limitu równoległości.
+        
+        Args:
+            messages: Wiadomości do wysłania
+            deadline: Termin, którego nie może przekroczyć zapytanie
+            llm: Klient modelu (domyślnie duży model)
+            
+        Returns:
+            Odpowiedź modelu
+            
+        Raises:
+            Cancelled: Gdy praca została anulowana przed wysłaniem zapytania
+            DeadlineExceeded: Gdy minął termin (także w trakcie zapytania skróconego terminem)
+            CircuitOpenError: Gdy wyłącznik obwodu wstrzymał zapytania do API
+        """
+        deadline = deadline or Deadline()
+        deadline.check()
+        while not self.limiter.acquire(timeout=deadline.timeout_for(SLOT_POLL_INTERVAL)):
+            deadline.check()
+        llm = llm or self.llm
+            
+        try:
+            self.circuit_breaker.before_request()
+            with profiler.stage("api_wait", network=True):
+                timeout = deadline.timeout_for(self.request_timeout)
+                start = time.monotonic()
+                try:
+                    response = llm.invoke(messages, timeout=timeout)
+                except Exception as e:
+                    latency = time.monotonic() - start
+                    error_type = APIErrorHandler.classify_error(e).type.value
+                    if error_type == APIErrorType.TIMEOUT.value and self._deadline_bound(timeout):
+                        # Limit skrócony terminem - to nie awaria dostawcy, więc bez wpływu
+                        # na limit równoległości i wyłącznik obwodu
+                        self.metrics.increment("deadline_timeouts")
+                        raise DeadlineExceeded(
+                            f"Przekroczono termin podczas zapytania do API ({latency:.1f} s)"
+                        ) from e
+                    self.metrics.increment(f"api_errors_{error_type}")
+                    self.limiter.record_failure(error_type, latency)
+                    self.circuit_breaker.record_failure(error_type)
+                    raise
+                latency = time.monotonic() - start
+                self.limiter.record_success(latency)
+                self.circuit_breaker.record_success()
+                self.retry_budget.record_success()
+                self.metrics.observe("api_latency", latency)
+                self._record_usage(messages, response)
+                self._record_latency(llm, messages, response, latency)
+                return response
+        finally:
+            self.limiter.release()
+        
+    def _deadline_bound(self, timeout: Optional[float]) -> bool:
+        """Sprawdza, czy limit czasu zapytania został skrócony przez termin."""
+        return timeout is not None and (self.request_timeout is None or timeout < self.request_timeout)
+        
+    def _record_usage(self, messages: List[HumanMessage], response) -> None:
+        """Zlicza zapytania i tokeny (z odpowiedzi API lub szacowane z długości tekstu)."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens") or sum(
+            len(message.content) for message in messages
+        ) * TOKENS_PER_CHAR
+        output_tokens = usage.get("output_tokens") or len(response.content) * TOKENS_PER_CHAR
+        self.metrics.increment("api_requests")
+        self.metrics.increment("input_tokens", int(input_tokens))
+        self.metrics.increment("output_tokens", int(output_tokens))
+        
+    def _record_latency(self, llm, messages: List[HumanMessage], response, latency: float) -> None:
+        """Zapisuje opóźnienie zapytania o fragment lub kontynuację dla doboru rozmiaru części."""
+        if not messages[0].content.startswith(PROMPT):
+            # Zapytania o łatki mają inny kształt - nie opisują krzywej generowania fragmentów
+            return
+        # Kontynuacja nie wnosi nowego tekstu, tylko dalszy ciąg odpowiedzi
+        input_chars = len(messages[0].content) - len(PROMPT) if len(messages) == 1 else 0
+        self.chunk_tuner.record(
+            getattr(llm, 'model_name', None) or self.router.large_model,
+            int(input_chars * TOKENS_PER_CHAR),
+            int(len(response.content) * TOKENS_PER_CHAR),
+            latency
+        )
+        
+    @staticmethod
+    def _is_truncated(content: str, finish_reason: Optional[str]) -> bool:
+        """Sprawdza czy odpowiedź została ucięta przez limit długości."""
+        if "</article>" in content:
+            return False
+        return finish_reason == "length" or "<article" in content
+        
+    def _complete_truncated(self, messages: List[HumanMessage], response,
+                            deadline: Optional[Deadline] = None, llm=None) -> str:
+        """
+        Dokańcza uciętą odpowiedź kolejnymi zapytaniami o kontynuację.
+        
+        Args:
+            messages: Wiadomości pierwotnego zapytania (prompt z tekstem części)
+            response: Odpowiedź modelu na pierwotne zapytanie
+            deadline: Termin, którego nie mogą przekroczyć zapytania
+            llm: Klient modelu, który zwrócił odpowiedź (domyślnie duży model)
+            
+        Returns:
+            str: Pełna (lub najdłuższa uzyskana) odpowiedź modelu
+        """
+        content = response.content
+        finish_reason = (getattr(response, "response_metadata", None) or {}).get("finish_reason")
+        
+        for round_number in range(1, MAX_CONTINUATIONS + 1):
+            if not self._is_truncated(content, finish_reason):
+                break
+                
+            logger.warning(
+                f"Odpowiedź API została ucięta ({len(content)} znaków) - "
+                f"prośba o kontynuację {round_number}/{MAX_CONTINUATIONS}"
+            )
+            self.metrics.increment("continuations")
+            # Tylko koniec dotychczasowej odpowiedzi - zapytanie mieści się w oknie kontekstu
+            continuation_messages = messages + [
+                AIMessage(content=continuation_tail(content)),
+                HumanMessage(content=CONTINUATION_PROMPT)
+            ]
+            response = self._invoke_llm(continuation_messages, deadline, llm)
+            content = stitch_continuation(content, response.content)
+            finish_reason = (getattr(response, "response_metadata", None) or {}).get("finish_reason")
+            
+        return content
+        
+    def generate_html(self, prompt: str, figures: Optional[List[Dict[str, Any]]] = None,
+                      deadline: Optional[Deadline] = None, tier: str = LARGE_TIER) -> str:
         """
         Generuje kod HTML używając API.
         
         Args:
             prompt: Prompt do wysłania do API
+            figures: Lista uzupełniana grafikami znalezionymi podczas walidacji
+            deadline: Termin zakończenia; oczekiwanie między próbami nie wykracza poza niego
+            tier: Poziom modelu; odpowiedź szybkiego modelu jest walidowana ściśle
             
         Returns:
             str: Wygenerowany kod HTML
@@ -354,13 +1008,17 @@ class ArticleProcessor:
         base_delay = 5  # sekundy
         
         last_error = None
+        attempts = 0
+        deadline = deadline or Deadline()
+        llm = self.fast_llm if tier == FAST_TIER else self.llm
         
         for attempt in range(max_retries):
+            attempts = attempt + 1
             try:
                 # Wywołaj API z odpowiednim promptem
                 messages = [HumanMessage(content=prompt)]
-                response = self.llm.invoke(messages)
-                html_content = response.content.strip()
+                response = self._invoke_llm(messages, deadline, llm)
+                html_content = self._complete_truncated(messages, response, deadline, llm).strip()
                 
                 # Debug - pokaż fragment odpowiedzi
                 logger.info("Odpowiedź z API (fragment):")
@@ -384,10 +1042,12 @@ class ArticleProcessor:
                 html_content = html_content[article_start:article_end + len("</article>")]
                 
                 # Waliduj wygenerowany HTML
-                html_content = self._validate_html(html_content)
+                html_content = self._validate_html(html_content, figures, strict=tier == FAST_TIER)
                 
                 return html_content
                 
+            except (Cancelled, DeadlineExceeded):
+                raise
             except Exception as e:
                 # Klasyfikuj błąd
                 api_error = APIErrorHandler.classify_error(e)
@@ -400,8 +1060,13 @@ class ArticleProcessor:
                 if not api_error.retryable or attempt >= max_retries - 1:
                     break
                 
-                # Oblicz czas oczekiwania
-                if api_error.retry_after:
+                # Wspólny budżet - podczas awarii ponowienia nie mnożą obciążenia dostawcy
+                if not self.retry_budget.try_acquire():
+                    logger.warning("Wyczerpany budżet ponowień zapytań do API - rezygnuję z ponowienia")
+                    break
+                
+                # Oblicz czas oczekiwania (wskazówka dostawcy, także 0, ma pierwszeństwo)
+                if api_error.retry_after is not None:
                     wait_time = api_error.retry_after
                 else:
                     # Exponential backoff z jitterem
@@ -412,11 +1077,12 @@ class ArticleProcessor:
                     f"Kolejna próba za {wait_time:.1f} sekund..."
                 )
                 
-                time.sleep(wait_time)
+                # Przerywane anulowaniem; bez ponowienia, gdy nie zdążyłoby przed terminem
+                deadline.sleep(wait_time * self.retry_delay_scale)
         
         # Jeśli dotarliśmy tutaj, wszystkie próby nie powiodły się
         if last_error:
-            error_message = f"Błąd API po {max_retries} próbach: {last_error.type.value} - {last_error.message}"
+            error_message = f"Błąd API po {attempts} próbach: {last_error.type.value} - {last_error.message}"
             if last_error.type == APIErrorType.CONTEXT_LENGTH:
                 error_message += "\nTekst jest zbyt długi dla modelu. Spróbuj podzielić go na mniejsze części."
             elif last_error.type == APIErrorType.AUTH_ERROR:
@@ -425,80 +1091,157 @@ class ArticleProcessor:
         
         raise ValueError(f"Nieznany błąd po {max_retries} próbach")
 
-    def _validate_html(self, html_content: str) -> str:
+    def _validate_html(self, html_content: str,
+                       figures: Optional[List[Dict[str, Any]]] = None, strict: bool = False) -> str:
+        """Waliduje wygenerowany kod HTML (zob. validate_html)."""
+        return validate_html(html_content, figures, strict)
+        
+    def process_text(self, text: str, deadline: Optional[Deadline] = None,
+                     chunk_figures: Optional[List[List[Dict[str, Any]]]] = None) -> str:
         """
-        Waliduje wygenerowany kod HTML.
+        Przetwarza tekst artykułu w pamięci, bez odczytu i zapisu plików wynikowych.
+        
+        Trwały błąd jednej części anuluje pozostałe, a całość kończy się
+        najpóźniej w terminie artykułu (ARTICLE_TIMEOUT) i terminie nadrzędnym.
         
         Args:
-            html_content: Kod HTML do sprawdzenia
+            text: Tekst artykułu
+            deadline: Termin nadrzędny (np. całego przetwarzania wsadowego)
+            chunk_figures: Lista uzupełniana grafikami kolejnych części
             
         Returns:
-            str: Zwalidowany kod HTML
+            str: Kod HTML artykułu
             
         Raises:
-            ValueError: Gdy HTML jest niepoprawny lub niebezpieczny
+            ValueError: Gdy tekst jest za krótki, za długi lub API zwróci błąd
+            Cancelled: Gdy przetwarzanie zostało anulowane
+            DeadlineExceeded: Gdy minął termin
         """
-        # Podstawowa walidacja HTML
-        self.html_validator.feed(html_content)
-        validation_results = self.html_validator.validate()
+        self._validate_content_size(text)
         
-        if not validation_results:
-            missing_tags = self.html_validator.required_tags - self.html_validator.found_tags
-            raise ValueError(f"Brakuje wymaganych tagów: {', '.join(missing_tags)}")
-            
-        # Proste sprawdzenie bezpieczeństwa
-        unsafe_patterns = [
-            '<script', 'javascript:', 'data:',
-            'onclick=', 'onload=', 'onerror=',
-            'onmouseover=', 'onmouseout=', 'onsubmit='
-        ]
+        # Podziel na mniejsze części jeśli potrzeba
+        with profiler.stage("split"):
+            chunks = self._split_large_content(text)
+        self.record_planned_chunks(len(chunks))
         
-        for pattern in unsafe_patterns:
-            if pattern in html_content.lower():
-                html_content = html_content.replace(pattern, '')
-                logger.warning(f"Usunięto niebezpieczny wzorzec: {pattern}")
+        # Przetwórz części równolegle - liczbę zapytań ogranicza self.limiter
+        workers = min(len(chunks), self.limiter.max_limit)
+        figures = [[] if chunk_figures is not None else None for _ in chunks]
+        article_deadline = Deadline(self.article_timeout, parent=deadline)
+        results = [None] * len(chunks)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._process_chunk, chunk, i, len(chunks),
+                                figures[i], article_deadline): i
+                for i, chunk in enumerate(chunks)
+            }
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+            except BaseException as e:
+                # Nie zużywaj limitu API na części artykułu, który i tak się nie powiedzie
+                article_deadline.cancel(f"Anulowano po błędzie części artykułu: {e}")
+                for pending in futures:
+                    pending.cancel()
+                raise
         
-        return html_content
+        if chunk_figures is not None:
+            chunk_figures.extend(figures)
+        return "\n".join(results)
+        
+    def process_many(self, items: Iterable[Union[str, Tuple[Any, str]]],
+                     max_in_flight: Optional[int] = None,
+                     deadline: Optional[Deadline] = None) -> Iterator[Tuple[Any, Union[str, Exception]]]:
+        """
+        Przetwarza wiele tekstów, zwracając wyniki w kolejności ukończenia.
+        
+        Teksty są pobierane z `items` dopiero, gdy zwolni się miejsce, więc
+        w pamięci jest najwyżej `max_in_flight` artykułów naraz.
+        
+        Args:
+            items: Teksty lub pary (identyfikator, tekst); dla samych tekstów
+                identyfikatorem jest numer kolejny
+            max_in_flight: Maksymalna liczba artykułów przetwarzanych jednocześnie
+                (domyślnie górny limit równoległych zapytań)
+            deadline: Termin całego przetwarzania
+            
+        Yields:
+            Tuple[Any, Union[str, Exception]]: (identyfikator, kod HTML lub błąd)
+        """
+        max_in_flight = max_in_flight or self.limiter.max_limit
+        batch_deadline = Deadline(parent=deadline)
+        executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        pending: Dict[Any, Any] = {}
+        iterator = iter(enumerate(items))
+        exhausted = False
         
-    def process_file(self, input_file: str) -> None:
+        try:
+            while True:
+                while not exhausted and len(pending) < max_in_flight:
+                    try:
+                        index, item = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    item_id, text = item if isinstance(item, tuple) else (index, item)
+                    pending[executor.submit(self.process_text, text, batch_deadline)] = item_id
+                    
+                if not pending:
+                    return
+                    
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item_id = pending.pop(future)
+                    try:
+                        yield item_id, future.result()
+                    except Exception as e:
+                        yield item_id, e
+        finally:
+            # Przerwanie iteracji przez wywołującego anuluje pozostałą pracę
+            batch_deadline.cancel("Przerwano przetwarzanie wielu tekstów")
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+    def process_file(self, input_file: str, output_file: Optional[str] = None,
+                     deadline: Optional[Deadline] = None) -> str:
         """
         Przetwarza konkretny plik wejściowy.
         
         Args:
             input_file: Ścieżka do pliku wejściowego
+            output_file: Ścieżka pliku wynikowego (domyślnie kolejny wolny artykul*.html)
+            deadline: Termin nadrzędny (np. całego przetwarzania wsadowego)
+            
+        Returns:
+            str: Ścieżka zapisanego pliku wynikowego
         """
+        self.metrics.increment("files_started")
         try:
-            # Walidacja pliku wejściowego
-            Validator.validate_input_file(input_file)
-            
-            # Walidacja środowiska przed przetwarzaniem
-            Validator.validate_environment()
-            
-            # Wczytaj zawartość pliku
-            content = self.file_handler.read_file(input_file)
-            self._validate_content_size(content)
-            
-            # Podziel na mniejsze części jeśli potrzeba
-            chunks = self._split_large_content(content)
-            logger.info(f"Podzielono tekst na {len(chunks)} części")
-            
-            # Przetwórz każdą część
-            results = []
-            for i, chunk in enumerate(chunks, 1):
-                html = self._process_chunk(chunk, i, len(chunks))
-                results.append(html)
-            
-            # Połącz wyniki
-            final_html = "\n".join(results)
-            
-            # Zapisz wynik
-            output_file = self.file_handler.save_file(final_html, input_file)
-            if output_file:
-                logger.info(f"Zapisano wynik do pliku: {output_file}")
-            else:
-                raise ValueError("Nie udało się zapisać pliku wyjściowego")
+            with profiler.stage("process_file"):
+                # Walidacja pliku wejściowego
+                Validator.validate_input_file(input_file)
+            
+                # Walidacja środowiska przed przetwarzaniem
+                Validator.validate_environment()
+            
+                # Wczytaj zawartość pliku i przetwórz ją
+                content = self.file_handler.read_file(input_file)
+                chunk_figures = [] if self.image_manifest is not None else None
+                final_html = self.process_text(content, deadline, chunk_figures)
+            
+                # Zapisz wynik
+                output_file = self.file_handler.save_file(final_html, input_file, output_file)
+                if output_file:
+                    logger.info(f"Zapisano wynik do pliku: {output_file}")
+                else:
+                    raise ValueError("Nie udało się zapisać pliku wyjściowego")
+                
+                if self.image_manifest is not None:
+                    self.image_manifest.add(output_file, chunk_figures)
+                self.metrics.increment("files_done")
+                return output_file
                 
         except Exception as e:
+            self.metrics.increment("files_failed")
             logger.error(f"Błąd podczas przetwarzania pliku {input_file}: {str(e)}")
             raise
 
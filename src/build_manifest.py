@@ -0,0 +1,56 @@
+import os
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from .file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+
+class BuildManifest:
+    """Plik JSON z metadanymi wygenerowanych plików, używany do pomijania niezmienionej pracy."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Ścieżka do pliku manifestu
+        """
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError) as e:
+            # Uszkodzony manifest oznacza tylko pełną przebudowę
+            logger.warning(f"Nie można wczytać manifestu {self.path}: {e}")
+            self._entries = {}
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(name)
+
+    def set(self, name: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[name] = entry
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def names(self):
+        with self._lock:
+            return list(self._entries)
+
+    def save(self) -> None:
+        """Zapisuje manifest atomowo."""
+        with self._lock:
+            data = json.dumps(self._entries, ensure_ascii=False, indent=1, sort_keys=True)
+        FileHandler.write_atomic(self.path, data)
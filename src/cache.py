@@ -0,0 +1,342 @@
+import os
+import json
+import time
+import atexit
+import pickle
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+from .file_handler import FileHandler
+from .profiler import profiler
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+
+class FileLock:
+    """Blokada międzyprocesowa oparta na pliku (flock lub msvcrt.locking)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @contextmanager
+    def acquire(self, shared: bool = False):
+        """
+        Zakłada blokadę na czas trwania kontekstu.
+
+        Args:
+            shared: Blokada współdzielona (wielu posiadaczy naraz); w Windows
+                zawsze wyłączna
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK poddaje się po ~10 s - czekaj dalej
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+class ResponseCache:
+    """Klasa obsługująca buforowanie odpowiedzi API.
+
+    Cache może być współdzielony przez wiele procesów na jednym hoście:
+    wpisy są zapisywane do unikalnych plików tymczasowych i podmieniane
+    atomowo, więc czytelnicy nigdy nie widzą częściowo zapisanych plików.
+    Operacje porządkowe (czyszczenie, usuwanie starych wpisów) wykonywane
+    są pod wyłączną blokadą pliku `.lock`, a zapisy pod blokadą współdzieloną.
+    """
+
+    LOCK_NAME = '.lock'
+    # Trwałe liczniki trafień i chybień (sumowane między uruchomieniami)
+    STATS_NAME = 'cache_stats.json'
+    # Pliki tymczasowe starsze niż ten czas pochodzą z przerwanych procesów
+    STALE_TEMP_SECONDS = 3600
+
+    def __init__(self, cache_dir: str = None, clear_on_start: bool = False):
+        """
+        Args:
+            cache_dir: Katalog cache (domyślnie .cache w katalogu projektu)
+            clear_on_start: Czy wyczyścić cache przy starcie; przy wielu procesach
+                korzystających z tego samego katalogu usuwa to wpisy pozostałych
+        """
+        if cache_dir is None:
+            # Użyj katalogu .cache w katalogu projektu
+            project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cache_dir = os.path.join(project_dir, '.cache')
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self._file_lock = FileLock(self.cache_dir / self.LOCK_NAME)
+        self._hits = 0
+        self._misses = 0
+        self._stats_lock = threading.Lock()
+        atexit.register(self.flush_stats)
+
+        if clear_on_start:
+            self.clear()
+
+    def clear(self):
+        """Czyści cache."""
+        with self._file_lock.acquire():
+            if self.cache_dir.exists():
+                for cache_file in self.cache_dir.glob('*.pkl'):
+                    try:
+                        cache_file.unlink()
+                    except FileNotFoundError:
+                        pass
+                    except Exception as e:
+                        logger.warning(f"Nie można usunąć pliku cache {cache_file}: {e}")
+                self._remove_stale_temp_files()
+
+    def _remove_stale_temp_files(self) -> None:
+        """Usuwa pliki tymczasowe pozostawione przez przerwane procesy (pod blokadą)."""
+        threshold = time.time() - self.STALE_TEMP_SECONDS
+        for temp_file in self.cache_dir.glob('.*.tmp'):
+            try:
+                if temp_file.stat().st_mtime < threshold:
+                    temp_file.unlink()
+            except FileNotFoundError:
+                pass
+
+    def prune(self, max_age: Optional[float] = None, max_bytes: Optional[int] = None) -> int:
+        """
+        Usuwa stare wpisy i najstarsze wpisy ponad limit rozmiaru.
+
+        Args:
+            max_age: Maksymalny wiek wpisu w sekundach
+            max_bytes: Maksymalny łączny rozmiar cache w bajtach
+
+        Returns:
+            int: Liczba usuniętych wpisów
+        """
+        removed = 0
+        with self._file_lock.acquire():
+            entries = []
+            for cache_file in self.cache_dir.glob('*.pkl'):
+                try:
+                    stat = cache_file.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, cache_file))
+
+            # Od najstarszych
+            entries.sort()
+            total_size = sum(size for _, size, _ in entries)
+            now = time.time()
+            for mtime, size, cache_file in entries:
+                too_old = max_age is not None and now - mtime > max_age
+                too_big = max_bytes is not None and total_size > max_bytes
+                if not (too_old or too_big):
+                    continue
+                try:
+                    cache_file.unlink()
+                    removed += 1
+                    total_size -= size
+                except FileNotFoundError:
+                    pass
+            self._remove_stale_temp_files()
+
+        if removed:
+            logger.info(f"Usunięto {removed} wpisów z cache")
+        return removed
+
+    def remove(self, cache_keys: Iterable[str]) -> int:
+        """
+        Usuwa wskazane wpisy.
+
+        Args:
+            cache_keys: Klucze wpisów do usunięcia
+
+        Returns:
+            int: Liczba usuniętych wpisów
+        """
+        removed = 0
+        with self._file_lock.acquire():
+            for cache_key in cache_keys:
+                try:
+                    self._get_cache_path(cache_key).unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        if removed:
+            logger.info(f"Usunięto {removed} wpisów z cache")
+        return removed
+
+    def keys(self) -> Iterator[str]:
+        """Zwraca klucze wszystkich wpisów (bez ich wczytywania)."""
+        for cache_file in self.cache_dir.glob('*.pkl'):
+            yield cache_file.stem
+
+    def entries(self) -> Iterator[Tuple[str, Optional[dict]]]:
+        """Zwraca pary (klucz, wpis); uszkodzone wpisy mają wartość None."""
+        for cache_key in self.keys():
+            yield cache_key, self.get_entry(cache_key)
+
+    def restore(self, entry: dict) -> bool:
+        """
+        Zapisuje wpis z zachowaniem jego danych i znacznika czasu (np. przy imporcie).
+
+        Args:
+            entry: Wpis z kluczami prompt, response i timestamp
+
+        Returns:
+            bool: True, gdy wpis zapisano; False, gdy jest niepełny
+        """
+        if not entry.get('prompt') or not entry.get('response'):
+            return False
+        cache_path = self._get_cache_path(self._get_cache_key(entry['prompt']))
+        with self._file_lock.acquire(shared=True):
+            FileHandler.write_atomic(cache_path, pickle.dumps(entry))
+        return True
+
+    def record_lookup(self, hit: bool, count: int = 1) -> None:
+        """Zlicza trafienia lub chybienia cache (zapisywane przy zakończeniu procesu)."""
+        with self._stats_lock:
+            if hit:
+                self._hits += count
+            else:
+                self._misses += count
+
+    def load_stats(self) -> dict:
+        """
+        Wczytuje trwałe liczniki trafień.
+
+        Returns:
+            dict: Klucze hits, misses i since (czas pierwszego zapisu)
+        """
+        try:
+            return json.loads((self.cache_dir / self.STATS_NAME).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {'hits': 0, 'misses': 0, 'since': None}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Nie można odczytać statystyk cache: {e}")
+            return {'hits': 0, 'misses': 0, 'since': None}
+
+    def flush_stats(self) -> None:
+        """Dopisuje bieżące liczniki do trwałych statystyk."""
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+            self._hits = self._misses = 0
+        if not hits and not misses:
+            return
+        try:
+            # Odczyt i zapis pod wyłączną blokadą - inne procesy też dopisują liczniki
+            with self._file_lock.acquire():
+                stats = self.load_stats()
+                stats['hits'] = stats.get('hits', 0) + hits
+                stats['misses'] = stats.get('misses', 0) + misses
+                stats['since'] = stats.get('since') or time.time()
+                FileHandler.write_atomic(self.cache_dir / self.STATS_NAME, json.dumps(stats))
+        except Exception as e:
+            logger.warning(f"Błąd zapisu statystyk cache: {e}")
+
+    def lock(self, shared: bool = False):
+        """Zwraca kontekst blokady katalogu cache (dla danych zapisywanych obok wpisów)."""
+        return self._file_lock.acquire(shared=shared)
+
+    def key_for(self, prompt: str) -> str:
+        """Zwraca klucz wpisu cache dla promptu."""
+        return self._get_cache_key(prompt)
+
+    def _get_cache_key(self, prompt: str) -> str:
+        """Generuje klucz cache na podstawie promptu."""
+        return hashlib.md5(prompt.encode()).hexdigest()
+
+    def entry_path(self, cache_key: str) -> Path:
+        """Zwraca ścieżkę pliku wpisu (np. do odczytu w innym procesie)."""
+        return self._get_cache_path(cache_key)
+
+    def _get_cache_path(self, cache_key: str) -> Path:
+        """Zwraca ścieżkę do pliku cache."""
+        return self.cache_dir / f"{cache_key}.pkl"
+
+    def contains(self, prompt: str) -> bool:
+        """Sprawdza czy odpowiedź jest w cache, bez wczytywania wpisu."""
+        return self._get_cache_path(self._get_cache_key(prompt)).exists()
+
+    def get_entry(self, cache_key: str) -> Optional[dict]:
+        """
+        Wczytuje pełny wpis cache (prompt, odpowiedź, znacznik czasu).
+
+        Args:
+            cache_key: Klucz wpisu
+
+        Returns:
+            Optional[dict]: Wpis lub None, jeśli nie istnieje albo jest uszkodzony
+        """
+        cache_path = self._get_cache_path(cache_key)
+
+        # Odczyt bez blokady - pliki są podmieniane atomowo
+        try:
+            with profiler.stage("cache_read"), cache_path.open('rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Błąd odczytu cache: {str(e)}")
+            return None
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Pobiera odpowiedź z cache."""
+        cache_key = self._get_cache_key(prompt)
+        cached_data = self.get_entry(cache_key)
+        if cached_data is None:
+            return None
+
+        logger.debug(f"Znaleziono w cache: {cache_key}")
+        return cached_data['response']
+
+    def set(self, prompt: str, response: str, **extra) -> None:
+        """
+        Zapisuje odpowiedź do cache.
+
+        Args:
+            prompt: Prompt zapytania
+            response: Odpowiedź modelu
+            **extra: Dodatkowe dane wpisu wyliczone z odpowiedzi (np. grafiki)
+        """
+        cache_key = self._get_cache_key(prompt)
+        cache_path = self._get_cache_path(cache_key)
+
+        try:
+            cached_data = {
+                **extra,
+                'prompt': prompt,
+                'response': response,
+                'timestamp': time.time()
+            }
+            # Blokada współdzielona chroni plik tymczasowy przed sprzątaniem
+            with profiler.stage("cache_write"), self._file_lock.acquire(shared=True):
+                FileHandler.write_atomic(cache_path, pickle.dumps(cached_data))
+            logger.debug(f"Zapisano w cache: {cache_key}")
+        except Exception as e:
+            logger.warning(f"Błąd zapisu cache: {str(e)}")
@@ -0,0 +1,406 @@
+"""Administracja cache odpowiedzi API.
+
+    python -m src.cache_admin stats
+    python -m src.cache_admin verify --remove
+    python -m src.cache_admin prune --max-age 30 --max-size 500 --stale-template
+    python -m src.cache_admin warm teksty/ --cpu-workers 4
+    python -m src.cache_admin export cache.jsonl.gz
+    python -m src.cache_admin import cache.jsonl.gz
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import logging
+import argparse
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from .cache import ResponseCache
+from .config import PROMPT
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = "oxido-cache"
+ARCHIVE_VERSION = 1
+# Granice wieku wpisów w statystykach (dni)
+AGE_BUCKETS = (1, 7, 30, 90)
+# Instrukcje promptu kończą się przed nagłówkiem części (zob. build_chunk_prompt)
+PART_HEADER = "\n\nCzęść "
+PART_PATTERN = re.compile(r"\n\nCzęść \d+/(\d+):")
+
+
+def split_prompt(prompt: str):
+    """Rozdziela prompt na instrukcje (szablon) i część zależną od tekstu."""
+    index = prompt.find(PART_HEADER)
+    if index == -1:
+        return "", prompt
+    return prompt[:index], prompt[index:]
+
+
+def is_whole_article(prompt: str) -> bool:
+    """Sprawdza, czy prompt obejmuje cały artykuł, a nie jedną z jego części."""
+    match = PART_PATTERN.search(prompt)
+    return match is None or match.group(1) == "1"
+
+
+def template_id(template: str) -> str:
+    """Zwraca krótki identyfikator wersji instrukcji promptu."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+CURRENT_TEMPLATE = template_id(PROMPT)
+
+
+def is_current(entry: Dict[str, Any]) -> bool:
+    """Sprawdza, czy wpis powstał dla bieżących instrukcji promptu."""
+    return template_id(split_prompt(entry["prompt"])[0]) == CURRENT_TEMPLATE
+
+
+# Klasa narzędzi administracyjnych cache
+# Funkcjonalności:
+# - Statystyki: liczba i rozmiar wpisów, wiek, wersje szablonu, modele, trafienia
+# - Weryfikacja wpisów (odczyt, zgodność klucza, poprawność HTML)
+# - Usuwanie wpisów według wieku, rozmiaru i nieaktualnego szablonu
+# - Eksport i import przenośnego archiwum (JSON Lines + gzip)
+class CacheAdmin:
+    """Operacje administracyjne na katalogu cache."""
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Zbiera statystyki cache.
+
+        Returns:
+            Dict[str, Any]: Liczba i rozmiar wpisów, rozkład wieku, szablonów i modeli,
+            uszkodzone wpisy oraz trwałe liczniki trafień
+        """
+        now = time.time()
+        entries = total_bytes = corrupt = figures = 0
+        ages = Counter()
+        templates = Counter()
+        tiers = Counter()
+        oldest = newest = None
+
+        for cache_key, entry in self.cache.entries():
+            try:
+                total_bytes += self.cache.entry_path(cache_key).stat().st_size
+            except FileNotFoundError:
+                continue
+            if entry is None:
+                corrupt += 1
+                continue
+            entries += 1
+            timestamp = entry.get("timestamp", 0)
+            oldest = timestamp if oldest is None else min(oldest, timestamp)
+            newest = timestamp if newest is None else max(newest, timestamp)
+            age_days = (now - timestamp) / 86400
+            bucket = next((f"< {days} d" for days in AGE_BUCKETS if age_days < days),
+                          f">= {AGE_BUCKETS[-1]} d")
+            ages[bucket] += 1
+            templates[template_id(split_prompt(entry["prompt"])[0])] += 1
+            tiers[entry.get("tier") or "nieznany"] += 1
+            figures += len(entry.get("figures") or [])
+
+        lookups = self.cache.load_stats()
+        total_lookups = lookups.get("hits", 0) + lookups.get("misses", 0)
+        return {
+            "cache_dir": str(self.cache.cache_dir),
+            "entries": entries,
+            "corrupt": corrupt,
+            "bytes": total_bytes,
+            "oldest": oldest,
+            "newest": newest,
+            "ages": dict(ages),
+            "templates": dict(templates),
+            "current_template": CURRENT_TEMPLATE,
+            "tiers": dict(tiers),
+            "figures": figures,
+            "hits": lookups.get("hits", 0),
+            "misses": lookups.get("misses", 0),
+            "hit_ratio": lookups.get("hits", 0) / total_lookups if total_lookups else 0.0,
+            "stats_since": lookups.get("since"),
+        }
+
+    @staticmethod
+    def format_stats(stats: Dict[str, Any]) -> str:
+        """Formatuje statystyki jako tekst."""
+        def when(timestamp: Optional[float]) -> str:
+            return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp)) if timestamp else "-"
+
+        lines = [
+            f"Katalog: {stats['cache_dir']}",
+            f"Wpisy: {stats['entries']} ({stats['bytes'] / 1024 / 1024:.1f} MB), "
+            f"uszkodzone: {stats['corrupt']}, grafiki: {stats['figures']}",
+            f"Najstarszy: {when(stats['oldest'])}, najnowszy: {when(stats['newest'])}",
+            f"Trafienia: {stats['hits']}, chybienia: {stats['misses']} "
+            f"({stats['hit_ratio']:.1%}) od {when(stats['stats_since'])}",
+            "Wiek wpisów:",
+        ]
+        order = [f"< {days} d" for days in AGE_BUCKETS] + [f">= {AGE_BUCKETS[-1]} d"]
+        lines += [f"  {bucket}: {stats['ages'][bucket]}" for bucket in order if bucket in stats["ages"]]
+        lines.append("Wersje szablonu promptu:")
+        for template, count in sorted(stats["templates"].items(), key=lambda item: -item[1]):
+            marker = " (bieżąca)" if template == stats["current_template"] else " (nieaktualna)"
+            lines.append(f"  {template}{marker}: {count}")
+        lines.append("Modele:")
+        lines += [f"  {tier}: {count}" for tier, count in sorted(stats["tiers"].items())]
+        return "\n".join(lines)
+
+    def verify(self, remove: bool = False) -> Dict[str, Any]:
+        """
+        Sprawdza wpisy: odczyt, zgodność klucza z promptem i poprawność HTML odpowiedzi.
+
+        Args:
+            remove: Usuń wpisy, które nie przeszły weryfikacji
+
+        Returns:
+            Dict[str, Any]: Liczba sprawdzonych wpisów, problemy (klucz -> opis) i liczba usuniętych
+        """
+        from .article_processor import validate_html
+
+        problems: Dict[str, str] = {}
+        checked = 0
+        for cache_key, entry in self.cache.entries():
+            checked += 1
+            if entry is None:
+                problems[cache_key] = "nie można odczytać wpisu"
+                continue
+            if not entry.get("prompt") or not entry.get("response"):
+                problems[cache_key] = "brak promptu lub odpowiedzi"
+                continue
+            if self.cache.key_for(entry["prompt"]) != cache_key:
+                problems[cache_key] = "klucz niezgodny z promptem"
+                continue
+            if "<article" not in entry["response"]:
+                problems[cache_key] = "odpowiedź bez tagu <article>"
+                continue
+            try:
+                # Części dłuższych artykułów nie zawierają wszystkich wymaganych tagów (np. <h1>)
+                validate_html(entry["response"], strict=True,
+                              required_tags=is_whole_article(entry["prompt"]))
+            except ValueError as e:
+                problems[cache_key] = f"niepoprawny HTML: {e}"
+
+        removed = self.cache.remove(problems) if remove and problems else 0
+        return {"checked": checked, "problems": problems, "removed": removed}
+
+    def prune(self, max_age_days: Optional[float] = None, max_size_mb: Optional[float] = None,
+              stale_template: bool = False) -> int:
+        """
+        Usuwa wpisy według nieaktualnego szablonu, wieku i łącznego rozmiaru.
+
+        Returns:
+            int: Liczba usuniętych wpisów
+        """
+        removed = 0
+        if stale_template:
+            stale = [
+                cache_key for cache_key, entry in self.cache.entries()
+                if entry is not None and entry.get("prompt") and not is_current(entry)
+            ]
+            removed += self.cache.remove(stale)
+        if max_age_days is not None or max_size_mb is not None:
+            removed += self.cache.prune(
+                max_age=max_age_days * 86400 if max_age_days is not None else None,
+                max_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb is not None else None
+            )
+        return removed
+
+    def export(self, path: str, current_only: bool = False) -> int:
+        """
+        Eksportuje wpisy do przenośnego archiwum (JSON Lines + gzip).
+
+        Instrukcje promptu zapisywane są raz (rekord "template"), a wpisy
+        odwołują się do nich identyfikatorem - archiwum jest znacznie mniejsze.
+
+        Args:
+            path: Ścieżka archiwum
+            current_only: Eksportuj tylko wpisy dla bieżącego szablonu promptu
+
+        Returns:
+            int: Liczba wyeksportowanych wpisów
+        """
+        exported = 0
+        written_templates = set()
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION,
+                                "exported": time.time()}) + "\n")
+            for _, entry in self.cache.entries():
+                if entry is None or not entry.get("prompt") or not entry.get("response"):
+                    continue
+                template, rest = split_prompt(entry["prompt"])
+                template_key = template_id(template)
+                if current_only and template_key != CURRENT_TEMPLATE:
+                    continue
+                if template_key not in written_templates:
+                    f.write(json.dumps({"template": template_key, "text": template},
+                                       ensure_ascii=False) + "\n")
+                    written_templates.add(template_key)
+                record = {key: value for key, value in entry.items() if key != "prompt"}
+                record.update({"template_id": template_key, "prompt_rest": rest})
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n")
+                exported += 1
+        logger.info(f"Wyeksportowano {exported} wpisów do {path}")
+        return exported
+
+    def import_archive(self, path: str, overwrite: bool = False) -> Dict[str, int]:
+        """
+        Importuje wpisy z archiwum utworzonego przez export.
+
+        Args:
+            path: Ścieżka archiwum
+            overwrite: Nadpisuj istniejące wpisy (domyślnie zostaje nowszy wpis)
+
+        Returns:
+            Dict[str, int]: Liczba zaimportowanych, pominiętych i niepoprawnych wpisów
+
+        Raises:
+            ValueError: Gdy plik nie jest archiwum cache
+        """
+        result = {"imported": 0, "skipped": 0, "invalid": 0}
+        templates: Dict[str, str] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("format") != ARCHIVE_FORMAT:
+                raise ValueError(f"Plik {path} nie jest archiwum cache")
+            if header.get("version", 0) > ARCHIVE_VERSION:
+                raise ValueError(f"Nieobsługiwana wersja archiwum: {header.get('version')}")
+
+            for line in f:
+                record = json.loads(line)
+                if "template" in record:
+                    templates[record["template"]] = record["text"]
+                    continue
+                template = templates.get(record.pop("template_id", None))
+                if template is None or "prompt_rest" not in record:
+                    result["invalid"] += 1
+                    continue
+                record["prompt"] = template + record.pop("prompt_rest")
+                record.setdefault("timestamp", time.time())
+
+                if not overwrite:
+                    existing = self.cache.get_entry(self.cache.key_for(record["prompt"]))
+                    if existing is not None and existing.get("timestamp", 0) >= record["timestamp"]:
+                        result["skipped"] += 1
+                        continue
+                if self.cache.restore(record):
+                    result["imported"] += 1
+                else:
+                    result["invalid"] += 1
+        logger.info(
+            f"Zaimportowano {result['imported']} wpisów z {path} "
+            f"(pominięte: {result['skipped']}, niepoprawne: {result['invalid']})"
+        )
+        return result
+
+
+def warm(paths: Iterable[str], cpu_workers: Optional[int] = None,
+         cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Wypełnia cache odpowiedziami dla korpusu tekstów potokiem wsadowym.
+
+    Args:
+        paths: Pliki lub katalogi z plikami tekstowymi
+        cpu_workers: Liczba procesów roboczych
+        cache_dir: Katalog cache (domyślnie katalog procesora)
+    """
+    from .article_processor import ArticleProcessor
+    from .file_handler import FileHandler
+    from .pipeline import BatchPipeline
+
+    input_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            input_files.extend(sorted(FileHandler.find_text_files(path)))
+        else:
+            input_files.append(path)
+
+    processor = ArticleProcessor()
+    if cache_dir:
+        processor.set_cache_dir(cache_dir)
+    processor.use_cache = True
+    return BatchPipeline(processor, cpu_workers=cpu_workers).warm(input_files)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cache_admin",
+        description="Administracja cache odpowiedzi API"
+    )
+    parser.add_argument("--cache-dir", help="Katalog cache (domyślnie .cache w katalogu projektu)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats = commands.add_parser("stats", help="Pokaż statystyki cache")
+    stats.add_argument("--json", action="store_true", help="Wynik w formacie JSON")
+
+    verify = commands.add_parser("verify", help="Sprawdź poprawność wpisów")
+    verify.add_argument("--remove", action="store_true", help="Usuń niepoprawne wpisy")
+
+    prune = commands.add_parser("prune", help="Usuń stare, nadmiarowe lub nieaktualne wpisy")
+    prune.add_argument("--max-age", type=float, metavar="DNI", help="Maksymalny wiek wpisu")
+    prune.add_argument("--max-size", type=float, metavar="MB", help="Maksymalny rozmiar cache")
+    prune.add_argument("--stale-template", action="store_true",
+                       help="Usuń wpisy dla innej wersji instrukcji promptu niż bieżąca")
+
+    warm_parser = commands.add_parser("warm", help="Wypełnij cache dla korpusu tekstów (wywołuje API)")
+    warm_parser.add_argument("paths", nargs="+", help="Pliki lub katalogi z plikami tekstowymi")
+    warm_parser.add_argument("--cpu-workers", type=int, metavar="N",
+                             help="Liczba procesów roboczych (domyślnie liczba rdzeni)")
+
+    export = commands.add_parser("export", help="Eksportuj cache do archiwum .jsonl.gz")
+    export.add_argument("path", help="Ścieżka archiwum")
+    export.add_argument("--current-only", action="store_true",
+                        help="Tylko wpisy dla bieżącej wersji instrukcji promptu")
+
+    import_parser = commands.add_parser("import", help="Importuj cache z archiwum .jsonl.gz")
+    import_parser.add_argument("path", help="Ścieżka archiwum")
+    import_parser.add_argument("--overwrite", action="store_true",
+                               help="Nadpisuj istniejące wpisy (domyślnie zostaje nowszy)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    args = parse_args(argv)
+    admin = CacheAdmin(ResponseCache(args.cache_dir))
+
+    try:
+        if args.command == "stats":
+            stats = admin.stats()
+            print(json.dumps(stats, indent=2, ensure_ascii=False) if args.json
+                  else admin.format_stats(stats))
+        elif args.command == "verify":
+            result = admin.verify(remove=args.remove)
+            for cache_key, problem in sorted(result["problems"].items()):
+                print(f"{cache_key}: {problem}")
+            print(f"Sprawdzono {result['checked']} wpisów, problemy: {len(result['problems'])}, "
+                  f"usunięto: {result['removed']}")
+            return 1 if result["problems"] and not args.remove else 0
+        elif args.command == "prune":
+            if args.max_age is None and args.max_size is None and not args.stale_template:
+                print("Podaj --max-age, --max-size lub --stale-template", file=sys.stderr)
+                return 2
+            print(f"Usunięto {admin.prune(args.max_age, args.max_size, args.stale_template)} wpisów")
+        elif args.command == "warm":
+            result = warm(args.paths, args.cpu_workers, args.cache_dir)
+            return 1 if result["errors"] else 0
+        elif args.command == "export":
+            print(f"Wyeksportowano {admin.export(args.path, args.current_only)} wpisów")
+        elif args.command == "import":
+            result = admin.import_archive(args.path, overwrite=args.overwrite)
+            print(f"Zaimportowano {result['imported']}, pominięto {result['skipped']}, "
+                  f"niepoprawne {result['invalid']}")
+    except (OSError, ValueError) as e:
+        logger.error(f"Błąd: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
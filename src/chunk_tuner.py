@@ -0,0 +1,278 @@
+import json
+import math
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .config import (
+    PLAN_BASE_LATENCY, PLAN_OUTPUT_RATIO, PLAN_OUTPUT_TOKENS_PER_SECOND, PROMPT, TOKENS_PER_CHAR
+)
+from .file_handler import FileHandler
+
+logger = logging.getLogger(__name__)
+
+TUNING_FILE = "chunk_tuning.json"
+
+# Najmniejsza część, na jaką warto dzielić artykuł (krótsze tracą spójność struktury)
+MIN_CHUNK_TOKENS = 1500
+# Rozmiar części zaokrąglany w górę do wielokrotności - stabilne klucze cache między uruchomieniami
+CHUNK_TOKENS_STEP = 500
+# Minimalna liczba obserwacji modelu, od której używany jest dopasowany model opóźnień
+MIN_SAMPLES = 5
+# Powyżej tej liczby obserwacji starsze są wygaszane (sumy skalowane w dół)
+MAX_SAMPLES = 500
+# Podział na więcej części niż konieczne musi skrócić czas co najmniej o tyle
+MIN_IMPROVEMENT = 0.1
+# Co ile obserwacji stan jest zapisywany na dysk
+SAVE_INTERVAL = 20
+
+PROMPT_TOKENS = math.ceil(len(PROMPT) * TOKENS_PER_CHAR)
+
+
+def fit_latency(stats: Dict[str, float]) -> Optional[Tuple[float, float]]:
+    """
+    Dopasowuje prostą: opóźnienie = stały narzut + czas na token wyjściowy.
+
+    Args:
+        stats: Sumy obserwacji (n, sum_x, sum_y, sum_xx, sum_xy; x - tokeny wyjściowe, y - sekundy)
+
+    Returns:
+        Optional[Tuple[float, float]]: (narzut w s, sekundy na token) lub None przy zbyt małej
+        liczbie obserwacji albo dopasowaniu bez sensu fizycznego
+    """
+    n = stats.get("n", 0)
+    if n < MIN_SAMPLES:
+        return None
+    denominator = n * stats["sum_xx"] - stats["sum_x"] ** 2
+    if denominator <= 0:
+        return None
+    slope = (n * stats["sum_xy"] - stats["sum_x"] * stats["sum_y"]) / denominator
+    if slope <= 0:
+        return None
+    intercept = (stats["sum_y"] - slope * stats["sum_x"]) / n
+    return max(0.0, intercept), slope
+
+
+def expected_wall_time(total_tokens: int, chunks: int, base_latency: float,
+                       seconds_per_token: float, output_ratio: float, concurrency: int,
+                       requests_per_minute: Optional[float] = None,
+                       tokens_per_minute: Optional[float] = None) -> float:
+    """
+    Szacuje czas przetwarzania artykułu podzielonego na równe części.
+
+    Części są przetwarzane falami po `concurrency`; czas fali wyznacza
+    najdłuższa generacja. Limity dostawcy ograniczają czas od dołu.
+    """
+    chunk_tokens = total_tokens / chunks
+    latency = base_latency + seconds_per_token * chunk_tokens * output_ratio
+    wall_time = math.ceil(chunks / max(1, concurrency)) * latency
+    if requests_per_minute:
+        wall_time = max(wall_time, chunks / requests_per_minute * 60)
+    if tokens_per_minute:
+        tokens = chunks * PROMPT_TOKENS + total_tokens * (1 + output_ratio)
+        wall_time = max(wall_time, tokens / tokens_per_minute * 60)
+    return wall_time
+
+
+def optimal_chunk_tokens(total_tokens: int, base_latency: float, seconds_per_token: float,
+                         output_ratio: float, concurrency: int, max_chunk_tokens: int,
+                         requests_per_minute: Optional[float] = None,
+                         tokens_per_minute: Optional[float] = None) -> int:
+    """
+    Wybiera rozmiar części minimalizujący przewidywany czas przetwarzania artykułu.
+
+    Funkcja nie korzysta ze stanu, więc może działać w osobnych procesach
+    (argumenty zwraca ChunkSizeTuner.policy).
+
+    Args:
+        total_tokens: Szacowana liczba tokenów artykułu
+        base_latency: Stały narzut zapytania (s)
+        seconds_per_token: Czas generowania tokenu wyjściowego (s)
+        output_ratio: Stosunek tokenów odpowiedzi do tokenów tekstu
+        concurrency: Liczba równoległych zapytań
+        max_chunk_tokens: Największa dopuszczalna część
+        requests_per_minute: Limit zapytań na minutę
+        tokens_per_minute: Limit tokenów na minutę
+
+    Returns:
+        int: Maksymalna liczba tokenów części dla split_content_offsets
+    """
+    if total_tokens <= MIN_CHUNK_TOKENS:
+        return max_chunk_tokens
+
+    def wall_time(chunks: int) -> float:
+        return expected_wall_time(total_tokens, chunks, base_latency, seconds_per_token,
+                                  output_ratio, concurrency, requests_per_minute, tokens_per_minute)
+
+    min_chunks = math.ceil(total_tokens / max_chunk_tokens)
+    max_chunks = max(min_chunks, total_tokens // MIN_CHUNK_TOKENS)
+    best_chunks = min(range(min_chunks, max_chunks + 1), key=wall_time)
+    # Dodatkowy podział tylko, gdy wyraźnie się opłaca
+    if wall_time(best_chunks) > wall_time(min_chunks) * (1 - MIN_IMPROVEMENT):
+        return max_chunk_tokens
+
+    chunk_tokens = math.ceil(total_tokens / best_chunks)
+    chunk_tokens = math.ceil(chunk_tokens / CHUNK_TOKENS_STEP) * CHUNK_TOKENS_STEP
+    return max(MIN_CHUNK_TOKENS, min(max_chunk_tokens, chunk_tokens))
+
+
+def chunk_tokens_for_text(text: str, policy: Optional[Dict[str, Any]], default: int) -> int:
+    """
+    Zwraca maksymalny rozmiar części dla tekstu.
+
+    Args:
+        text: Tekst artykułu
+        policy: Argumenty z ChunkSizeTuner.policy lub None (dobór wyłączony)
+        default: Rozmiar części bez doboru
+    """
+    if not policy:
+        return default
+    return optimal_chunk_tokens(math.ceil(len(text) * TOKENS_PER_CHAR), **policy)
+
+
+# Klasa doboru rozmiaru części tekstu
+# Funkcjonalności:
+# - Zapis opóźnień zapytań względem liczby tokenów dla każdego modelu
+# - Dopasowanie modelu opóźnień (narzut + czas na token) i stosunku wyjścia do wejścia
+# - Wybór rozmiaru części przy bieżącej równoległości i limitach dostawcy
+# - Trwały stan w katalogu cache (chunk_tuning.json) między uruchomieniami
+class ChunkSizeTuner:
+    """Uczy się krzywej opóźnień modeli i dobiera rozmiar części artykułu."""
+
+    def __init__(self, cache_dir: Union[str, Path],
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """
+        Args:
+            cache_dir: Katalog cache, w którym zapisywany jest stan
+            requests_per_minute: Limit zapytań na minutę (np. RATE_LIMIT_RPM)
+            tokens_per_minute: Limit tokenów na minutę (np. RATE_LIMIT_TPM)
+        """
+        self.path = Path(cache_dir) / TUNING_FILE
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._models: Dict[str, Dict[str, float]] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._load()
+        atexit.register(self.save)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            self._models = json.loads(self.path.read_text(encoding="utf-8")).get("models", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Nie udało się wczytać stanu doboru części {self.path}: {e}")
+
+    def save(self) -> None:
+        """Zapisuje obserwacje, jeśli pojawiły się nowe."""
+        with self._lock:
+            if not self._unsaved:
+                return
+            data = json.dumps({"models": self._models}, indent=2)
+            self._unsaved = 0
+        try:
+            FileHandler.write_atomic(self.path, data)
+        except OSError as e:
+            logger.warning(f"Nie udało się zapisać stanu doboru części {self.path}: {e}")
+
+    def record(self, model: str, input_tokens: int, output_tokens: int, seconds: float) -> None:
+        """
+        Zapisuje obserwację zapytania.
+
+        Args:
+            model: Nazwa modelu
+            input_tokens: Tokeny tekstu zapytania (bez stałych instrukcji)
+            output_tokens: Tokeny odpowiedzi
+            seconds: Czas zapytania
+        """
+        with self._lock:
+            stats = self._models.setdefault(model, {
+                "n": 0, "sum_x": 0.0, "sum_y": 0.0, "sum_xx": 0.0, "sum_xy": 0.0,
+                "input_tokens": 0.0, "output_tokens": 0.0,
+            })
+            if stats["n"] >= MAX_SAMPLES:
+                # Wygaszanie starszych obserwacji - model nadąża za zmianami dostawcy
+                for key in stats:
+                    stats[key] *= (MAX_SAMPLES - 1) / MAX_SAMPLES
+            stats["n"] += 1
+            stats["sum_x"] += output_tokens
+            stats["sum_y"] += seconds
+            stats["sum_xx"] += output_tokens * output_tokens
+            stats["sum_xy"] += output_tokens * seconds
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            self._unsaved += 1
+            save = self._unsaved >= SAVE_INTERVAL
+        if save:
+            self.save()
+
+    def model_params(self, model: str) -> Tuple[float, float, float]:
+        """
+        Zwraca parametry modelu opóźnień.
+
+        Bez wystarczającej liczby obserwacji używane są stałe trybu planowania (config.py).
+
+        Returns:
+            Tuple[float, float, float]: (narzut w s, sekundy na token wyjściowy, stosunek wyjścia do wejścia)
+        """
+        with self._lock:
+            stats = dict(self._models.get(model, {}))
+        fit = fit_latency(stats) if stats else None
+        if fit is None:
+            base_latency, seconds_per_token = PLAN_BASE_LATENCY, 1 / PLAN_OUTPUT_TOKENS_PER_SECOND
+        else:
+            base_latency, seconds_per_token = fit
+        if stats.get("n", 0) >= MIN_SAMPLES and stats["input_tokens"] > 0:
+            output_ratio = stats["output_tokens"] / stats["input_tokens"]
+        else:
+            output_ratio = PLAN_OUTPUT_RATIO
+        return base_latency, seconds_per_token, output_ratio
+
+    def policy(self, model: str, concurrency: int, max_chunk_tokens: int) -> Dict[str, Any]:
+        """Zwraca argumenty optimal_chunk_tokens (bez liczby tokenów artykułu)."""
+        base_latency, seconds_per_token, output_ratio = self.model_params(model)
+        return {
+            "base_latency": base_latency,
+            "seconds_per_token": seconds_per_token,
+            "output_ratio": output_ratio,
+            "concurrency": concurrency,
+            "max_chunk_tokens": max_chunk_tokens,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+        }
+
+    def chunk_tokens_for(self, total_tokens: int, model: str, concurrency: int,
+                         max_chunk_tokens: int) -> int:
+        """
+        Wybiera rozmiar części artykułu.
+
+        Args:
+            total_tokens: Szacowana liczba tokenów artykułu
+            model: Model generujący części
+            concurrency: Bieżący limit równoległych zapytań
+            max_chunk_tokens: Największa dopuszczalna część
+
+        Returns:
+            int: Maksymalna liczba tokenów części
+        """
+        return optimal_chunk_tokens(total_tokens, **self.policy(model, concurrency, max_chunk_tokens))
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Zwraca dopasowane parametry i liczbę obserwacji każdego modelu."""
+        with self._lock:
+            models = list(self._models)
+        report = {}
+        for model in models:
+            base_latency, seconds_per_token, output_ratio = self.model_params(model)
+            report[model] = {
+                "samples": int(self._models[model]["n"]),
+                "base_latency": base_latency,
+                "output_tokens_per_second": 1 / seconds_per_token,
+                "output_ratio": output_ratio,
+            }
+        return report
+
@@ -0,0 +1,171 @@
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Typy błędów API (wartości APIErrorType) oznaczające przeciążenie dostawcy
+CONGESTION_ERRORS = {"rate_limit", "server_error", "timeout"}
+
+# Klasa ograniczająca liczbę równoległych zapytań do API
+# Funkcjonalności:
+# - Addytywne zwiększanie limitu, gdy opóźnienia i błędy są w normie (AIMD)
+# - Multiplikatywne zmniejszanie limitu po błędach przeciążenia
+# - Dolna i górna granica limitu
+# - Publikacja bieżącego limitu jako metryki
+class AdaptiveConcurrencyLimiter:
+    """Adaptacyjny limit równoległości sterowany opóźnieniami i błędami API."""
+
+    def __init__(self, initial_limit: int = 3, min_limit: int = 1, max_limit: int = 16,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 2.0,
+                 max_error_rate: float = 0.1, window_size: int = 20,
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            initial_limit: Początkowa liczba równoległych zapytań
+            min_limit: Dolna granica limitu
+            max_limit: Górna granica limitu
+            decrease_factor: Mnożnik limitu po błędzie przeciążenia
+            latency_tolerance: Ile razy opóźnienie może przekroczyć bazowe, by nadal zwiększać limit
+            max_error_rate: Maksymalny odsetek błędów w oknie, przy którym limit rośnie
+            window_size: Liczba ostatnich zapytań branych pod uwagę
+            metrics: Rejestr metryk, do którego publikowany jest limit
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Nieprawidłowe granice limitu równoległości")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.metrics = metrics or Metrics()
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._successes_since_increase = 0
+        self._baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._outcomes = deque(maxlen=window_size)
+        self._condition = threading.Condition()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """Bieżący limit równoległych zapytań."""
+        with self._condition:
+            return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        with self._condition:
+            return self._in_flight
+
+    def _publish(self) -> None:
+        self.metrics.set_gauge("concurrency_limit", int(self._limit))
+        self.metrics.set_gauge("requests_in_flight", self._in_flight)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Czeka na wolne miejsce w ramach bieżącego limitu.
+
+        Args:
+            timeout: Maksymalny czas oczekiwania w sekundach (None - bez limitu)
+
+        Returns:
+            bool: True jeśli zajęto miejsce, False jeśli minął czas oczekiwania
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < int(self._limit), timeout):
+                return False
+            self._in_flight += 1
+            self._publish()
+            return True
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._publish()
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Kontekst obejmujący jedno zapytanie do API."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def record_success(self, latency: float) -> None:
+        """
+        Rejestruje udane zapytanie i zwiększa limit, gdy system jest w dobrej kondycji.
+
+        Args:
+            latency: Czas trwania zapytania w sekundach
+        """
+        with self._condition:
+            self._outcomes.append(True)
+
+            # Bazowe opóźnienie śledzi najszybsze odpowiedzi, powoli zapominając stare minimum
+            if self._baseline_latency is None or latency < self._baseline_latency:
+                self._baseline_latency = latency
+            else:
+                self._baseline_latency = 0.95 * self._baseline_latency + 0.05 * latency
+
+            healthy = (
+                latency <= self._baseline_latency * self.latency_tolerance
+                and self._error_rate() <= self.max_error_rate
+            )
+            if not healthy:
+                self._successes_since_increase = 0
+                return
+
+            # Zwiększenie o 1 po pełnej "rundzie" udanych zapytań
+            self._successes_since_increase += 1
+            if self._successes_since_increase >= int(self._limit) and self._limit < self.max_limit:
+                self._limit = min(self._limit + 1, self.max_limit)
+                self._successes_since_increase = 0
+                logger.debug(f"Zwiększono limit równoległości do {int(self._limit)}")
+                self._publish()
+                self._condition.notify_all()
+
+    def record_failure(self, error_type: str, latency: Optional[float] = None) -> None:
+        """
+        Rejestruje nieudane zapytanie; błędy przeciążenia zmniejszają limit.
+
+        Args:
+            error_type: Typ błędu (wartość APIErrorType)
+            latency: Czas trwania zapytania w sekundach
+        """
+        with self._condition:
+            self._outcomes.append(False)
+            if error_type not in CONGESTION_ERRORS:
+                return
+
+            self._successes_since_increase = 0
+            # Seria błędów z jednej fali zapytań zmniejsza limit tylko raz
+            now = time.monotonic()
+            cooldown = latency or self._baseline_latency or 1.0
+            if now - self._last_decrease < cooldown:
+                return
+
+            self._last_decrease = now
+            new_limit = max(self.min_limit, int(self._limit * self.decrease_factor))
+            if new_limit < self._limit:
+                logger.warning(
+                    f"Przeciążenie API ({error_type}) - zmniejszono limit równoległości "
+                    f"z {int(self._limit)} do {new_limit}"
+                )
+            self._limit = float(new_limit)
+            self._publish()
@@ -3,6 +3,46 @@
 # Maksymalna liczba tokenów dla modelu
 MAX_TOKENS = 32000
 
+# Przybliżona liczba tokenów na znak tekstu (średnio 4 znaki na token)
+TOKENS_PER_CHAR = 0.25
+
+# Model szacowania kosztu w trybie planowania (--plan)
+# Stosunek liczby tokenów HTML na wyjściu do tokenów tekstu wejściowego
+PLAN_OUTPUT_RATIO = 1.4
+# Stały narzut czasu każdego zapytania (s)
+PLAN_BASE_LATENCY = 1.0
+# Szybkość generowania odpowiedzi (tokeny/s)
+PLAN_OUTPUT_TOKENS_PER_SECOND = 250
+
+# Modele API: duży (domyślny) i szybki dla krótkich artykułów (--fast-model)
+LARGE_MODEL = "llama3-70b-8192"
+FAST_MODEL = "llama3-8b-8192"
+# Domyślny próg (szacowane tokeny tekstu), do którego artykuł trafia do szybkiego modelu
+FAST_MODEL_MAX_TOKENS = 1000
+
+# Maksymalna liczba zapytań o dokończenie uciętej odpowiedzi
+MAX_CONTINUATIONS = 3
+
+# Prompt z prośbą o dokończenie uciętej odpowiedzi
+CONTINUATION_PROMPT = """Twoja odpowiedź została ucięta z powodu limitu długości.
+Kontynuuj DOKŁADNIE od miejsca, w którym przerwałeś:
+   - NIE powtarzaj wcześniej wygenerowanego kodu
+   - NIE zaczynaj artykułu od nowa
+   - NIE dodawaj żadnych komentarzy ani wyjaśnień
+   - Zakończ odpowiedź zamykającym tagiem </article>"""
+
+# Prompt z prośbą o łatkę HTML dla prawie identycznego fragmentu tekstu
+NEAR_DUPLICATE_PATCH_PROMPT = """Poniższy kod HTML został wygenerowany dla tekstu, który nieznacznie się zmienił.
+Zmiany tekstu (stary fragment => nowy fragment):
+{changes}
+
+Zwróć WYŁĄCZNIE listę JSON zamian w kodzie HTML w postaci:
+[{{"stare": "dokładny fragment obecnego HTML", "nowe": "fragment po zmianie"}}]
+Każdy fragment "stare" musi występować w HTML dokładnie raz. Nie zwracaj całego dokumentu.
+
+Kod HTML:
+{html}"""
+
 # Prompt dla generowania HTML
 PROMPT = """Przekształć poniższy tekst w semantyczny kod HTML zgodnie z następującymi wymaganiami:
 
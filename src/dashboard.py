@@ -0,0 +1,253 @@
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .metrics import Metrics
+
+try:
+    from rich.console import Console
+    from rich.live import Live
+    from rich.table import Table
+except ImportError:
+    Console = Live = Table = None
+
+logger = logging.getLogger(__name__)
+
+# Prefiks liczników błędów API (wartości APIErrorType) w metrykach procesora
+ERROR_PREFIX = "api_errors_"
+
+
+def summarize(current: Dict[str, Any], previous: Optional[Dict[str, Any]] = None,
+              interval: float = 0.0) -> Dict[str, Any]:
+    """
+    Wylicza stan przetwarzania z migawek metryk (Metrics.snapshot).
+
+    Args:
+        current: Bieżąca migawka
+        previous: Migawka z początku okna, z którego liczone są tempo i ostatnie błędy
+        interval: Czas między migawkami (s)
+
+    Returns:
+        Dict[str, Any]: Postęp, tempo, trafienia cache, równoległość, ostatnie błędy i ETA
+            (None, gdy nie da się go jeszcze oszacować)
+    """
+    counters = current["counters"]
+    gauges = current["gauges"]
+    before = previous["counters"] if previous else {}
+
+    def delta(name: str) -> float:
+        return counters.get(name, 0) - before.get(name, 0)
+
+    def rate(name: str) -> float:
+        return delta(name) / interval if interval > 0 else 0.0
+
+    files_done = int(counters.get("files_done", 0))
+    files_failed = int(counters.get("files_failed", 0))
+    files_total = int(gauges.get("files_total", 0))
+    articles = counters.get("articles_planned", 0)
+    chunks_planned = counters.get("chunks_planned", 0)
+    chunks_done = int(counters.get("chunks_done", 0))
+
+    # Pliki jeszcze nierozpoczęte - tyle części, ile średnio mają już podzielone
+    unplanned = max(0, files_total - counters.get("files_started", 0))
+    chunks_total = chunks_planned + unplanned * (chunks_planned / articles if articles else 1)
+    remaining = max(0.0, chunks_total - chunks_done)
+    chunk_rate = rate("chunks_done")
+    if remaining == 0:
+        eta = 0.0
+    else:
+        eta = remaining / chunk_rate if chunk_rate > 0 else None
+
+    hits = counters.get("cache_hits", 0)
+    lookups = hits + counters.get("cache_misses", 0)
+    recent_errors = {
+        name[len(ERROR_PREFIX):]: int(delta(name))
+        for name in sorted(counters)
+        if name.startswith(ERROR_PREFIX) and delta(name) > 0
+    }
+    return {
+        "files_done": files_done,
+        "files_failed": files_failed,
+        "files_total": files_total,
+        "chunks_done": chunks_done,
+        "chunks_total": round(chunks_total),
+        "requests_per_second": rate("api_requests"),
+        "tokens_per_second": rate("input_tokens") + rate("output_tokens"),
+        "cache_hit_rate": hits / lookups if lookups else None,
+        "concurrency_limit": int(gauges.get("concurrency_limit", 0)),
+        "requests_in_flight": int(gauges.get("requests_in_flight", 0)),
+        "retries": int(delta("retries")),
+        "retry_budget_exhausted": int(delta("retry_budget_exhausted")),
+        "circuit_open": bool(gauges.get("circuit_open", 0)),
+        "recent_errors": recent_errors,
+        "eta": eta,
+    }
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Formatuje czas, np. "1 h 05 min", "3 min 07 s"; None - "?"."""
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours} h {minutes:02d} min"
+    if minutes:
+        return f"{minutes} min {seconds:02d} s"
+    return f"{seconds} s"
+
+
+def _progress(done: int, total: int) -> str:
+    return f"{done}/{total}" if total else str(done)
+
+
+def _errors(status: Dict[str, Any]) -> str:
+    errors = ", ".join(f"{name}: {count}" for name, count in status["recent_errors"].items())
+    return errors or "brak"
+
+
+def format_status(status: Dict[str, Any]) -> str:
+    """Zwraca stan przetwarzania w jednej linii (do logu)."""
+    hit_rate = status["cache_hit_rate"]
+    return (
+        f"Pliki {_progress(status['files_done'], status['files_total'])}"
+        f" (błędy: {status['files_failed']}), "
+        f"części {_progress(status['chunks_done'], status['chunks_total'])}, "
+        f"{status['requests_per_second']:.2f} zapytań/s, "
+        f"{status['tokens_per_second']:.0f} tokenów/s, "
+        f"cache {'-' if hit_rate is None else f'{hit_rate:.0%}'}, "
+        f"zapytania w toku {status['requests_in_flight']}/{status['concurrency_limit']}, "
+        f"ponowienia {status['retries']}, błędy API: {_errors(status)}, "
+        f"pozostało {format_duration(status['eta'])}"
+    )
+
+
+# Klasa panelu postępu przetwarzania
+# Funkcjonalności:
+# - Odczyt metryk procesora we własnym wątku (wątki robocze nie są spowalniane)
+# - Tempo zapytań i tokenów oraz ostatnie błędy API z przesuwnego okna czasu
+# - Postęp plików i części oraz szacowany czas do końca
+# - Panel rich w terminalu; bez rich lub terminala - okresowy wpis w logu
+class LiveDashboard:
+    """Panel na żywo ze stanem przetwarzania wsadowego lub trybu obserwowania."""
+
+    def __init__(self, metrics: Metrics, refresh: float = 1.0, window: float = 60.0,
+                 log_interval: float = 30.0, title: str = "Generator artykułów HTML"):
+        """
+        Args:
+            metrics: Rejestr metryk procesora
+            refresh: Odstęp między odświeżeniami panelu (s)
+            window: Okno (s), z którego liczone są tempo i ostatnie błędy
+            log_interval: Odstęp (s) wpisów w logu, gdy panel nie jest dostępny
+            title: Tytuł panelu
+        """
+        self.metrics = metrics
+        self.refresh = refresh
+        self.window = window
+        self.log_interval = log_interval
+        self.title = title
+        self._history = deque()
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._live = None
+        self._handlers: List[Any] = []
+
+        self.console = Console(stderr=True) if Console is not None else None
+        self.interactive = self.console is not None and self.console.is_terminal
+        if Live is None:
+            logger.info("Brak pakietu rich - stan przetwarzania będzie zapisywany w logu")
+
+    def status(self) -> Dict[str, Any]:
+        """Pobiera migawkę metryk i zwraca bieżący stan (zob. summarize)."""
+        now = time.monotonic()
+        snapshot = self.metrics.snapshot()
+        self._history.append((now, snapshot))
+        # Najstarsza zachowana migawka wyznacza początek okna
+        while len(self._history) > 2 and now - self._history[1][0] >= self.window:
+            self._history.popleft()
+        started, previous = self._history[0]
+        return summarize(snapshot, previous, now - started)
+
+    def render(self, status: Dict[str, Any]):
+        """Tworzy tabelę rich ze stanu przetwarzania."""
+        hit_rate = status["cache_hit_rate"]
+        retries = str(status["retries"])
+        if status["retry_budget_exhausted"]:
+            retries += f" (budżet wyczerpany: {status['retry_budget_exhausted']})"
+        table = Table(title=self.title, show_header=False, title_justify="left")
+        table.add_column(style="bold")
+        table.add_column()
+        table.add_row("Pliki", f"{_progress(status['files_done'], status['files_total'])}"
+                               f" (błędy: {status['files_failed']})")
+        table.add_row("Części", _progress(status["chunks_done"], status["chunks_total"]))
+        table.add_row("Zapytania/s", f"{status['requests_per_second']:.2f}")
+        table.add_row("Tokeny/s", f"{status['tokens_per_second']:.0f}")
+        table.add_row("Trafienia cache", "-" if hit_rate is None else f"{hit_rate:.0%}")
+        table.add_row("Zapytania w toku", f"{status['requests_in_flight']} (limit {status['concurrency_limit']})")
+        table.add_row(f"Ponowienia ({self.window:.0f} s)", retries)
+        table.add_row(f"Błędy API ({self.window:.0f} s)",
+                      f"[red]{_errors(status)}[/red]" if status["recent_errors"] else "brak")
+        if status["circuit_open"]:
+            table.add_row("Wyłącznik obwodu", "[red]otwarty - zapytania wstrzymane[/red]")
+        table.add_row("Czas", f"{format_duration(time.monotonic() - self._started)}, "
+                              f"pozostało {format_duration(status['eta'])}")
+        return table
+
+    def _redirect_logging(self) -> None:
+        # Live przekierowuje sys.stderr, ale handler konsoli trzyma pierwotny strumień -
+        # bez podmiany wpisy logu rozrywałyby panel
+        for handler in logging.getLogger().handlers:
+            if type(handler) is logging.StreamHandler and handler.stream in (sys.__stderr__, sys.__stdout__):
+                self._handlers.append((handler, handler.setStream(sys.stderr)))
+
+    def _run(self) -> None:
+        last_log = time.monotonic()
+        while not self._stop.wait(self.refresh):
+            status = self.status()
+            if self._live is not None:
+                self._live.update(self.render(status), refresh=True)
+            elif time.monotonic() - last_log >= self.log_interval:
+                logger.info(format_status(status))
+                last_log = time.monotonic()
+
+    def start(self) -> "LiveDashboard":
+        """Uruchamia panel (lub okresowe wpisy w logu)."""
+        self._started = time.monotonic()
+        self.status()
+        if self.interactive:
+            self._live = Live(self.render(self.status()), console=self.console,
+                              auto_refresh=False, redirect_stdout=True, redirect_stderr=True)
+            self._live.start()
+            self._redirect_logging()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="dashboard")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Zatrzymuje panel, pozostawiając na ekranie (lub w logu) stan końcowy."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        status = self.status()
+        if self._live is not None:
+            self._live.update(self.render(status), refresh=True)
+            for handler, stream in self._handlers:
+                handler.setStream(stream)
+            self._handlers.clear()
+            self._live.stop()
+            self._live = None
+        else:
+            logger.info(format_status(status))
+
+    def __enter__(self) -> "LiveDashboard":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,120 @@
+import time
+import weakref
+import threading
+from typing import Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Przekroczono termin zakończenia pracy."""
+
+
+class Cancelled(Exception):
+    """Praca została anulowana (np. po trwałym błędzie innej części)."""
+
+
+# Klasa terminu zakończenia pracy
+# Funkcjonalności:
+# - Termin przetwarzania wsadowego, artykułu i pojedynczego zapytania
+# - Terminy podrzędne nie wykraczają poza termin nadrzędny
+# - Anulowanie przenoszone na terminy podrzędne
+# - Oczekiwanie przerywane anulowaniem i ograniczone terminem
+class Deadline:
+    """Termin zakończenia pracy z kooperacyjnym anulowaniem."""
+
+    def __init__(self, timeout: Optional[float] = None, parent: Optional["Deadline"] = None):
+        """
+        Args:
+            timeout: Czas na wykonanie pracy w sekundach (None - bez limitu)
+            parent: Termin nadrzędny, którego anulowanie i termin obowiązują też tutaj
+        """
+        self.expires_at = time.monotonic() + timeout if timeout else None
+        if parent is not None and parent.expires_at is not None:
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        # Słabe referencje - zakończone artykuły nie są przechowywane przez termin wsadu
+        self._children: "weakref.WeakSet[Deadline]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        if parent is not None:
+            parent._add_child(self)
+
+    def _add_child(self, child: "Deadline") -> None:
+        with self._lock:
+            self._children.add(child)
+            cancelled = self._event.is_set()
+        if cancelled:
+            child.cancel(self.reason)
+
+    def child(self, timeout: Optional[float] = None) -> "Deadline":
+        """Tworzy termin podrzędny (np. artykułu w ramach przetwarzania wsadowego)."""
+        return Deadline(timeout, parent=self)
+
+    def remaining(self) -> Optional[float]:
+        """Zwraca pozostały czas w sekundach lub None, gdy termin nie jest ustawiony."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: Optional[str] = None) -> None:
+        """Anuluje pracę objętą terminem i wszystkimi terminami podrzędnymi."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            children = list(self._children)
+        for child in children:
+            child.cancel(reason)
+
+    def check(self) -> None:
+        """
+        Sprawdza, czy można kontynuować pracę.
+
+        Raises:
+            Cancelled: Gdy praca została anulowana
+            DeadlineExceeded: Gdy minął termin
+        """
+        if self._event.is_set():
+            raise Cancelled(self.reason or "Przetwarzanie zostało anulowane")
+        if self.expired:
+            raise DeadlineExceeded("Przekroczono termin przetwarzania")
+
+    def timeout_for(self, limit: Optional[float]) -> Optional[float]:
+        """
+        Zwraca limit czasu operacji ograniczony pozostałym czasem.
+
+        Args:
+            limit: Własny limit operacji (None - bez limitu)
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return limit
+        if limit is None:
+            return remaining
+        return min(limit, remaining)
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Czeka podany czas, ale nie dłużej niż do terminu.
+
+        Raises:
+            Cancelled: Gdy praca została anulowana w trakcie oczekiwania
+            DeadlineExceeded: Gdy oczekiwanie sięgnęłoby poza termin
+        """
+        remaining = self.remaining()
+        if remaining is not None and remaining <= seconds:
+            # Kolejna próba i tak nie zdążyłaby przed terminem
+            raise DeadlineExceeded(
+                f"Oczekiwanie {seconds:.1f} s przekroczyłoby termin (pozostało {remaining:.1f} s)"
+            )
+        self._event.wait(seconds)
+        self.check()
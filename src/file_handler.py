@@ -1,7 +1,10 @@
 import os
 import logging
+import tempfile
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import List, Optional, Set, Tuple, Union
+
+from .profiler import profiler
 
 try:
     import tkinter as tk
@@ -23,6 +26,7 @@ class FileHandler:
     
     ENCODINGS = ['utf-8', 'cp1250', 'iso-8859-2', 'ascii']
     MIN_CONTENT_LENGTH = 50
+    TEXT_EXTENSIONS = {'.txt', '.md', '.text'}
     
     @staticmethod
     def try_read_with_encodings(filename: str) -> Tuple[str, str]:
@@ -40,14 +44,15 @@ class FileHandler:
         """
         errors = []
         
-        for encoding in FileHandler.ENCODINGS:
-            try:
-                with open(filename, 'r', encoding=encoding) as file:
-                    content = file.read().strip()
-                    return content, encoding
-            except UnicodeDecodeError as e:
-                errors.append(f"Próba {encoding}: {str(e)}")
-                continue
+        with profiler.stage("encoding_detection"):
+            for encoding in FileHandler.ENCODINGS:
+                try:
+                    with open(filename, 'r', encoding=encoding) as file:
+                        content = file.read().strip()
+                        return content, encoding
+                except UnicodeDecodeError as e:
+                    errors.append(f"Próba {encoding}: {str(e)}")
+                    continue
                 
         raise UnicodeDecodeError(
             f"Nie udało się odczytać pliku {filename} z żadnym z kodowań: "
@@ -69,6 +74,16 @@ class FileHandler:
             FileNotFoundError: Gdy plik nie istnieje
             ValueError: Gdy plik jest pusty lub za krótki
         """
+        return FileHandler.read_file_with_encoding(filename)[0]
+        
+    @staticmethod
+    def read_file_with_encoding(filename: str) -> Tuple[str, str]:
+        """
+        Odczytuje zawartość pliku jak read_file, zwracając też wykryte kodowanie.
+        
+        Returns:
+            Tuple[str, str]: (zawartość pliku, użyte kodowanie)
+        """
         if not os.path.exists(filename):
             raise FileNotFoundError(f"Nie znaleziono pliku {filename}")
             
@@ -83,21 +98,31 @@ class FileHandler:
                 f"(minimum {FileHandler.MIN_CONTENT_LENGTH} znaków)"
             )
             
-        return content
+        return content, encoding
 
     @staticmethod
-    def save_file(content: str, original_path: str = None) -> Optional[str]:
+    def save_file(content: str, original_path: str = None,
+                  output_path: str = None) -> Optional[str]:
         """
         Zapisuje wygenerowany HTML do pliku.
         
         Args:
             content (str): Treść do zapisania
             original_path (str, optional): Ścieżka oryginalnego pliku
+            output_path (str, optional): Dokładna ścieżka pliku wyjściowego;
+                istniejący plik zostanie nadpisany
             
         Returns:
             Optional[str]: Ścieżka zapisanego pliku lub None w przypadku błędu
         """
         try:
+            if output_path:
+                output_dir = os.path.dirname(os.path.abspath(output_path))
+                os.makedirs(output_dir, exist_ok=True)
+                with profiler.stage("write_output"), open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                return output_path
+            
             # Ustal nazwę pliku wyjściowego
             if original_path:
                 output_dir = os.path.dirname(os.path.abspath(original_path))
@@ -107,21 +132,13 @@ class FileHandler:
                 base_name = "artykul"
             
             # Znajdź pierwszą wolną nazwę pliku
-            counter = 0
-            while True:
-                suffix = f"_{counter}" if counter > 0 else ""
-                output_path = os.path.join(output_dir, f"{base_name}{suffix}.html")
-                if not os.path.exists(output_path):
-                    break
-                counter += 1
-                if counter > 100:  # Zabezpieczenie przed nieskończoną pętlą
-                    raise ValueError("Nie można znaleźć wolnej nazwy pliku")
+            output_path = FileHandler._free_output_path(output_dir, base_name)
             
             # Utwórz katalog jeśli nie istnieje
             os.makedirs(output_dir, exist_ok=True)
             
             # Zapisz plik
-            with open(output_path, 'w', encoding='utf-8') as f:
+            with profiler.stage("write_output"), open(output_path, 'w', encoding='utf-8') as f:
                 f.write(content)
             
             return output_path
@@ -130,6 +147,72 @@ class FileHandler:
             logger.error(f"Błąd podczas zapisywania pliku: {str(e)}")
             return None
 
+    @staticmethod
+    def write_atomic(path: Union[str, Path], data: Union[str, bytes]) -> None:
+        """
+        Zapisuje plik atomowo - czytelnicy widzą starą albo nową wersję, nigdy częściową.
+        
+        Args:
+            path: Ścieżka pliku docelowego
+            data: Treść do zapisania (tekst zapisywany jest w UTF-8)
+        """
+        path = os.fspath(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        
+        # Unikalna nazwa pliku tymczasowego w tym samym katalogu (ten sam system plików)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _free_output_path(output_dir: str, base_name: str, taken: Optional[Set[str]] = None) -> str:
+        """Zwraca pierwszą wolną nazwę <base_name>[_N].html w katalogu (z pominięciem `taken`)."""
+        counter = 0
+        while True:
+            suffix = f"_{counter}" if counter > 0 else ""
+            output_path = os.path.join(output_dir, f"{base_name}{suffix}.html")
+            if not os.path.exists(output_path) and (taken is None or output_path not in taken):
+                return output_path
+            counter += 1
+            if counter > 100:  # Zabezpieczenie przed nieskończoną pętlą
+                raise ValueError("Nie można znaleźć wolnej nazwy pliku")
+
+    @staticmethod
+    def reserve_output_paths(original_paths: List[str]) -> List[str]:
+        """
+        Wyznacza nazwy, które save_file nadałby wynikom zapisanym w podanej kolejności.
+        
+        Pozwala zapisywać wyniki w kolejności ukończenia, zachowując nazwy
+        zależne tylko od kolejności plików wejściowych.
+        
+        Args:
+            original_paths: Ścieżki plików wejściowych
+            
+        Returns:
+            List[str]: Ścieżki plików wynikowych
+        """
+        taken: Set[str] = set()
+        output_paths = []
+        for original_path in original_paths:
+            output_dir = os.path.dirname(os.path.abspath(original_path))
+            output_path = FileHandler._free_output_path(output_dir, "artykul", taken)
+            taken.add(output_path)
+            output_paths.append(output_path)
+        return output_paths
+
     @staticmethod
     def get_next_filename(base_filename: str, extension: str) -> str:
         """
@@ -153,6 +236,23 @@ class FileHandler:
                 return new_filename
             counter += 1
 
+    @staticmethod
+    def is_text_file(filename: str) -> bool:
+        """
+        Sprawdza czy nazwa pliku wskazuje na plik tekstowy do przetworzenia.
+        
+        Args:
+            filename: Nazwa lub ścieżka pliku
+            
+        Returns:
+            bool: True dla plików .txt/.md/.text, które nie są ukryte ani checklistą
+        """
+        name = os.path.basename(filename)
+        if Path(name).suffix.lower() not in FileHandler.TEXT_EXTENSIONS:
+            return False
+        # Ignoruj pliki zaczynające się od kropki i checklisty
+        return not name.startswith('.') and 'checklist' not in name.lower()
+
     @staticmethod
     def find_text_files(directory="."):
         """
@@ -164,16 +264,13 @@ class FileHandler:
         Returns:
             list: Lista znalezionych plików tekstowych
         """
-        text_extensions = {'.txt', '.md', '.text'}
         text_files = []
         
         try:
             for file in os.listdir(directory):
                 file_path = os.path.join(directory, file)
-                if os.path.isfile(file_path) and Path(file).suffix.lower() in text_extensions:
-                    # Ignoruj pliki zaczynające się od kropki i checklisty
-                    if not os.path.basename(file).startswith('.') and not 'checklist' in file.lower():
-                        text_files.append(file_path)
+                if FileHandler.is_text_file(file) and os.path.isfile(file_path):
+                    text_files.append(file_path)
             
             logger.info(f"Znaleziono pliki tekstowe: {text_files}")
             return text_files
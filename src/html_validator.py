@@ -1,5 +1,37 @@
+import re
 import html.parser
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Optional, Set
+
+IMAGE_PROMPT_PREFIX = "[PROMPT DO AI:"
+# Pola promptu grafiki zgodne z instrukcjami w PROMPT (config.py)
+IMAGE_PROMPT_FIELDS = ("Styl", "Scena", "Kontekst", "Nastrój", "Kolory", "Kompozycja", "Szczegóły", "Format")
+_FIELD_PATTERN = re.compile(r"\b(" + "|".join(IMAGE_PROMPT_FIELDS) + r"):\s*")
+
+
+def parse_image_prompt(alt: str) -> Optional[Dict[str, str]]:
+    """
+    Rozbija atrybut alt z promptem grafiki na pola.
+    
+    Args:
+        alt: Wartość atrybutu alt
+        
+    Returns:
+        Optional[Dict[str, str]]: Pola promptu (klucze małymi literami) lub None,
+        jeśli alt nie zawiera promptu
+    """
+    text = alt.strip()
+    if not text.startswith(IMAGE_PROMPT_PREFIX):
+        return None
+    text = text[len(IMAGE_PROMPT_PREFIX):]
+    if text.endswith("]"):
+        text = text[:-1]
+    
+    parts = _FIELD_PATTERN.split(text)
+    # parts: [tekst przed pierwszym polem, nazwa, wartość, nazwa, wartość, ...]
+    fields = {name.lower(): " ".join(value.split()) for name, value in zip(parts[1::2], parts[2::2])}
+    if not fields and text.strip():
+        fields["opis"] = " ".join(text.split())
+    return fields
 
 class HTMLValidator(html.parser.HTMLParser):
     """Validator kodu HTML sprawdzający poprawność struktury."""
@@ -11,6 +43,10 @@ class HTMLValidator(html.parser.HTMLParser):
         self.optional_tags: Set[str] = {"h2", "figure", "figcaption", "img"}
         self.found_tags: Set[str] = set()
         self.self_closing_tags: Set[str] = {"img", "br", "hr"}
+        # Grafiki zbierane przy walidacji na potrzeby generatora obrazów
+        self.figures: List[Dict[str, Any]] = []
+        self._figure: Optional[Dict[str, Any]] = None
+        self._caption: Optional[List[str]] = None
         
     def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
         """
@@ -22,6 +58,13 @@ class HTMLValidator(html.parser.HTMLParser):
         """
         self.found_tags.add(tag)
         
+        if tag == "figure":
+            self._figure = self._new_figure()
+        elif tag == "figcaption" and self._figure is not None:
+            self._caption = []
+        elif tag == "img":
+            self._collect_image(dict(attrs))
+        
         # Ignoruj self-closing tagi
         if tag in self.self_closing_tags:
             return
@@ -43,14 +86,47 @@ class HTMLValidator(html.parser.HTMLParser):
         Args:
             tag: Nazwa tagu
         """
+        if tag == "figcaption" and self._caption is not None:
+            self._figure["caption"] = " ".join("".join(self._caption).split())
+            self._caption = None
+        elif tag == "figure" and self._figure is not None:
+            self.figures.append(self._figure)
+            self._figure = None
+        
         # Ignoruj zamykające tagi dla self-closing tagów
         if tag in self.self_closing_tags:
             return
             
-        if tag in self.tags:
-            # Znajdź i usuń tag ze stosu
-            tag_index = len(self.tags) - 1 - self.tags[::-1].index(tag)
-            self.tags.pop(tag_index)
+        # Znajdź i usuń ostatnie wystąpienie tagu ze stosu - szukanie od wierzchołka
+        # bez kopiowania stosu (w poprawnym HTML tag jest na samej górze)
+        for tag_index in range(len(self.tags) - 1, -1, -1):
+            if self.tags[tag_index] == tag:
+                del self.tags[tag_index]
+                break
+            
+    def handle_data(self, data: str) -> None:
+        if self._caption is not None:
+            self._caption.append(data)
+            
+    def _new_figure(self) -> Dict[str, Any]:
+        return {
+            "index": len(self.figures),
+            "line": self.getpos()[0],
+            "src": None,
+            "alt": None,
+            "prompt": None,
+            "caption": None,
+        }
+        
+    def _collect_image(self, attrs: Dict[str, Optional[str]]) -> None:
+        """Zapisuje dane obrazu w bieżącej grafice (lub jako osobną grafikę bez podpisu)."""
+        figure = self._figure if self._figure is not None else self._new_figure()
+        alt = attrs.get("alt") or ""
+        figure["src"] = attrs.get("src")
+        figure["alt"] = alt
+        figure["prompt"] = parse_image_prompt(alt)
+        if self._figure is None:
+            self.figures.append(figure)
             
     def validate(self) -> Dict[str, bool]:
         """
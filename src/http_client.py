@@ -0,0 +1,128 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://api.groq.com"
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no', '')
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Ustawienia puli połączeń HTTP klienta modelu."""
+
+    # Rozmiar puli; None - dobierany do liczby równoległych zapytań
+    pool_size: Optional[int] = None
+    # Czas utrzymywania bezczynnego połączenia (s)
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 120.0
+    # Maksymalny czas oczekiwania na wolne połączenie z puli (s)
+    pool_timeout: float = 30.0
+    http2: bool = False
+    # Otwieranie połączeń przed pierwszym zapytaniem
+    warmup: bool = False
+
+    @classmethod
+    def from_env(cls) -> "HTTPPoolConfig":
+        """Tworzy konfigurację ze zmiennych środowiskowych HTTP_*."""
+        pool_size = os.getenv('HTTP_POOL_SIZE')
+        return cls(
+            pool_size=int(pool_size) if pool_size else None,
+            keepalive_expiry=float(os.getenv('HTTP_KEEPALIVE_EXPIRY', cls.keepalive_expiry)),
+            connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', cls.connect_timeout)),
+            read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', cls.read_timeout)),
+            pool_timeout=float(os.getenv('HTTP_POOL_TIMEOUT', cls.pool_timeout)),
+            http2=_env_flag('HTTP_HTTP2'),
+            warmup=_env_flag('HTTP_WARMUP'),
+        )
+
+    def size_for(self, concurrency: int) -> int:
+        """
+        Zwraca rozmiar puli dla danej liczby równoległych zapytań.
+
+        Zapas ponad limit równoległości obsługuje zapytania o dokończenie
+        odpowiedzi i łatki, które nie czekają na zwolnienie miejsca w puli.
+        """
+        if self.pool_size:
+            return self.pool_size
+        return max(1, concurrency) + 2
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            self.read_timeout,
+            connect=self.connect_timeout,
+            pool=self.pool_timeout
+        )
+
+
+def create_http_client(config: HTTPPoolConfig, concurrency: int) -> httpx.Client:
+    """
+    Tworzy klienta HTTP z pulą połączeń utrzymywanych między zapytaniami.
+
+    Args:
+        config: Ustawienia puli
+        concurrency: Maksymalna liczba równoległych zapytań do API
+
+    Returns:
+        httpx.Client: Klient współdzielony przez wszystkie wątki
+    """
+    http2 = config.http2
+    if http2 and h2 is None:
+        logger.warning("HTTP/2 wymaga pakietu h2 (pip install httpx[http2]) - używam HTTP/1.1")
+        http2 = False
+
+    size = config.size_for(concurrency)
+    limits = httpx.Limits(
+        max_connections=size,
+        max_keepalive_connections=size,
+        keepalive_expiry=config.keepalive_expiry
+    )
+    logger.debug(f"Pula połączeń HTTP: {size} połączeń, HTTP/2: {http2}")
+    return httpx.Client(limits=limits, timeout=config.timeout, http2=http2)
+
+
+def warm_up_pool(client: httpx.Client, base_url: str, connections: int) -> int:
+    """
+    Otwiera połączenia z API przed pierwszym zapytaniem.
+
+    Równoległe zapytania HEAD wymuszają osobne połączenia (z uzgodnieniem TLS),
+    które pozostają w puli do ponownego użycia.
+
+    Args:
+        client: Klient HTTP z pulą połączeń
+        base_url: Adres API
+        connections: Liczba połączeń do otwarcia
+
+    Returns:
+        int: Liczba udanych połączeń
+    """
+    def open_connection(_):
+        try:
+            client.head(base_url)
+            return True
+        except httpx.HTTPError as e:
+            logger.debug(f"Nie udało się otworzyć połączenia z {base_url}: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        opened = sum(executor.map(open_connection, range(connections)))
+    logger.info(f"Rozgrzano {opened}/{connections} połączeń z {base_url}")
+    return opened
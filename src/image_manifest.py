@@ -0,0 +1,86 @@
+import os
+import json
+import logging
+import threading
+from typing import Any, Dict, List
+
+from .file_handler import FileHandler
+from .html_validator import HTMLValidator
+
+logger = logging.getLogger(__name__)
+
+# Wersja podziału promptów grafik na pola (parse_image_prompt); grafiki zapisane
+# w cache z inną wersją są analizowane ponownie
+FIGURES_VERSION = 2
+
+
+def extract_figures(html_content: str) -> List[Dict[str, Any]]:
+    """Zbiera grafiki z kodu HTML jednym przebiegiem parsera walidacji."""
+    parser = HTMLValidator()
+    parser.feed(html_content)
+    parser.close()
+    return parser.figures
+
+
+# Klasa zbierająca prompty grafik z wygenerowanych artykułów
+# Funkcjonalności:
+# - Manifest JSON obok każdego artykułu (<artykuł>.images.json)
+# - Zbiorczy manifest dla całego przetwarzania wsadowego
+# - Dane pochodzą z walidacji HTML - bez ponownego czytania plików wynikowych
+class ImageManifest:
+    """Manifest grafik do wygenerowania dla przetworzonych artykułów."""
+
+    SUFFIX = ".images.json"
+
+    def __init__(self):
+        self._articles: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def article_manifest_path(cls, output_file: str) -> str:
+        return os.path.splitext(output_file)[0] + cls.SUFFIX
+
+    def add(self, output_file: str, chunk_figures: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Zapisuje manifest artykułu i dodaje go do manifestu zbiorczego.
+
+        Args:
+            output_file: Ścieżka zapisanego artykułu
+            chunk_figures: Grafiki kolejnych części artykułu
+
+        Returns:
+            List[Dict[str, Any]]: Grafiki artykułu z numeracją w obrębie całego artykułu
+        """
+        figures = []
+        for chunk_index, chunk in enumerate(chunk_figures):
+            for figure in chunk:
+                figures.append({**figure, "index": len(figures), "chunk": chunk_index})
+
+        data = {"article": os.path.basename(output_file), "figures": figures}
+        FileHandler.write_atomic(
+            self.article_manifest_path(output_file),
+            json.dumps(data, ensure_ascii=False, indent=2)
+        )
+        with self._lock:
+            self._articles[os.path.abspath(output_file)] = figures
+        logger.info(f"Zapisano manifest grafik artykułu {output_file}: {len(figures)} grafik")
+        return figures
+
+    def save(self, path: str) -> None:
+        """
+        Zapisuje manifest zbiorczy wszystkich artykułów.
+
+        Args:
+            path: Ścieżka pliku JSON
+        """
+        with self._lock:
+            articles = [
+                {"article": article, "figures": figures}
+                for article, figures in sorted(self._articles.items())
+            ]
+        data = {
+            "articles": articles,
+            "total_figures": sum(len(article["figures"]) for article in articles),
+        }
+        FileHandler.write_atomic(path, json.dumps(data, ensure_ascii=False, indent=2))
+        logger.info(f"Zapisano zbiorczy manifest grafik: {path} ({data['total_figures']} grafik)")
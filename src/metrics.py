@@ -0,0 +1,56 @@
+import threading
+from typing import Any, Dict
+
+
+class Metrics:
+    """Bezpieczny wątkowo rejestr liczników, wskaźników i czasów operacji."""
+
+    def __init__(self):
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Zwiększa licznik o podaną wartość."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Ustawia bieżącą wartość wskaźnika."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Rejestruje czas trwania operacji."""
+        with self._lock:
+            timing = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def gauge(self, name: str, default: float = 0) -> float:
+        with self._lock:
+            return self._gauges.get(name, default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Zwraca kopię wszystkich metryk.
+
+        Returns:
+            Dict[str, Any]: Słownik z kluczami counters, gauges i timings
+        """
+        with self._lock:
+            timings = {
+                name: dict(timing, avg=timing["total"] / timing["count"])
+                for name, timing in self._timings.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings,
+            }
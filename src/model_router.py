@@ -0,0 +1,117 @@
+import os
+import logging
+from typing import Any, Dict, Optional
+
+from .config import FAST_MODEL, LARGE_MODEL, TOKENS_PER_CHAR
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+FAST_TIER = "fast"
+LARGE_TIER = "large"
+TIERS = (FAST_TIER, LARGE_TIER)
+
+
+# Klasa wyboru modelu dla fragmentu tekstu
+# Funkcjonalności:
+# - Krótkie artykuły (jedna część, do progu tokenów) trafiają do szybkiego modelu
+# - Pozostałe fragmenty do dużego modelu
+# - Liczniki fragmentów, czasy generowania i odsetek eskalacji dla każdego poziomu
+class ModelRouter:
+    """Kieruje fragmenty do szybkiego lub dużego modelu według rozmiaru."""
+
+    def __init__(self, fast_max_tokens: int = 0, fast_model: str = FAST_MODEL,
+                 large_model: str = LARGE_MODEL, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            fast_max_tokens: Maksymalna szacowana liczba tokenów tekstu dla szybkiego
+                modelu (0 - wszystkie fragmenty do dużego modelu)
+            fast_model: Nazwa szybkiego modelu
+            large_model: Nazwa dużego modelu
+            metrics: Rejestr metryk (domyślnie własny)
+        """
+        self.fast_max_tokens = fast_max_tokens
+        self.fast_model = fast_model
+        self.large_model = large_model
+        self.metrics = metrics or Metrics()
+
+    @classmethod
+    def from_env(cls, metrics: Optional[Metrics] = None) -> "ModelRouter":
+        """Tworzy router ze zmiennych FAST_MODEL_MAX_TOKENS, FAST_MODEL i LARGE_MODEL."""
+        return cls(
+            fast_max_tokens=int(os.getenv('FAST_MODEL_MAX_TOKENS', 0)),
+            fast_model=os.getenv('FAST_MODEL', FAST_MODEL),
+            large_model=os.getenv('LARGE_MODEL', LARGE_MODEL),
+            metrics=metrics,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.fast_max_tokens > 0 and self.fast_model != self.large_model
+
+    def model_name(self, tier: str) -> str:
+        return self.fast_model if tier == FAST_TIER else self.large_model
+
+    def tier_for(self, chunk: str, total_chunks: int = 1) -> str:
+        """
+        Wybiera poziom modelu dla fragmentu.
+
+        Do szybkiego modelu trafiają tylko całe krótkie artykuły - części
+        dłuższych tekstów wymagają spójności, którą lepiej zapewnia duży model.
+
+        Args:
+            chunk: Tekst fragmentu
+            total_chunks: Liczba części artykułu
+
+        Returns:
+            str: FAST_TIER lub LARGE_TIER
+        """
+        if not self.enabled or total_chunks > 1:
+            return LARGE_TIER
+        if len(chunk) * TOKENS_PER_CHAR > self.fast_max_tokens:
+            return LARGE_TIER
+        return FAST_TIER
+
+    def record(self, tier: str, seconds: float, escalated: bool = False) -> None:
+        """
+        Rejestruje wygenerowanie fragmentu przez model danego poziomu.
+
+        Args:
+            tier: Poziom modelu
+            seconds: Czas generowania (z kontynuacjami i walidacją)
+            escalated: Czy odpowiedź nie przeszła walidacji i fragment trafił wyżej
+        """
+        self.metrics.increment(f"model_{tier}_chunks")
+        self.metrics.observe(f"model_{tier}_latency", seconds)
+        if escalated:
+            self.metrics.increment(f"model_{tier}_escalations")
+
+    def report(self) -> Dict[str, Any]:
+        """Zwraca liczbę fragmentów, średni czas i odsetek eskalacji każdego poziomu."""
+        timings = self.metrics.snapshot()["timings"]
+        report: Dict[str, Any] = {"fast_max_tokens": self.fast_max_tokens}
+        for tier in TIERS:
+            chunks = int(self.metrics.counter(f"model_{tier}_chunks"))
+            escalations = int(self.metrics.counter(f"model_{tier}_escalations"))
+            timing = timings.get(f"model_{tier}_latency", {})
+            report[tier] = {
+                "model": self.model_name(tier),
+                "chunks": chunks,
+                "avg_latency": timing.get("avg", 0.0),
+                "max_latency": timing.get("max", 0.0),
+                "escalations": escalations,
+                "escalation_rate": escalations / chunks if chunks else 0.0,
+            }
+        return report
+
+    def format_report(self) -> str:
+        report = self.report()
+        lines = [f"Wybór modelu: szybki do {report['fast_max_tokens']} tokenów"]
+        for tier, label in ((FAST_TIER, "szybki"), (LARGE_TIER, "duży")):
+            tier_report = report[tier]
+            lines.append(
+                f"  {label} ({tier_report['model']}): fragmentów {tier_report['chunks']}, "
+                f"średnio {tier_report['avg_latency']:.2f} s, maks. {tier_report['max_latency']:.2f} s, "
+                f"eskalacje {tier_report['escalations']} ({tier_report['escalation_rate']:.1%})"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,183 @@
+import os
+import re
+import gzip
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from .build_manifest import BuildManifest
+from .file_handler import FileHandler
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bloki, w których białe znaki mają znaczenie, oraz komentarze
+PRESERVED_PATTERN = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>|<!--.*?-->)",
+    re.IGNORECASE | re.DOTALL
+)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Wartości atrybutów zawierające białe znaki (np. wielowierszowe prompty grafik w alt)
+ATTRIBUTE_VALUE_PATTERN = re.compile(r"""=\s*("[^"\s]*\s[^"]*"|'[^'\s]*\s[^']*')""")
+# Wartość atrybutu w cudzysłowie może zawierać znak ">"
+QUOTED_VALUE = r"\"[^\"]*\"|'[^']*'"
+# Białe znaki wokół znaczników blokowych nie wpływają na wygląd strony
+BLOCK_TAG_PATTERN = re.compile(
+    r" ?(</?(?:html|head|body|meta|link|title|article|section|header|footer|nav|main|aside"
+    r"|div|p|h[1-6]|ul|ol|li|dl|dt|dd|figure|figcaption|table|thead|tbody|tfoot|tr|td|th"
+    r"|blockquote|hr|br)\b(?:[^>\"']|" + QUOTED_VALUE + r")*>) ?",
+    re.IGNORECASE
+)
+
+
+def minify_html(content: str) -> str:
+    """
+    Minifikuje HTML bez zmiany sposobu wyświetlania.
+
+    Zawartość <pre>, <textarea>, <script> i <style> oraz wartości atrybutów
+    (np. wielowierszowe prompty grafik w alt) pozostają bez zmian, komentarze
+    są usuwane (poza warunkowymi), a ciągi białych znaków w tekście zastępowane
+    pojedynczą spacją - odstępy między słowami i elementami wierszowymi są zachowane.
+
+    Args:
+        content: Kod HTML
+
+    Returns:
+        str: Zminifikowany kod HTML
+    """
+    parts = []
+    position = 0
+    for match in PRESERVED_PATTERN.finditer(content):
+        parts.append(_collapse(content[position:match.start()]))
+        block = match.group(1)
+        if not block.startswith("<!--") or block.startswith("<!--["):
+            parts.append(block)
+        position = match.end()
+    parts.append(_collapse(content[position:]))
+    return "".join(parts).strip()
+
+
+def _collapse(text: str) -> str:
+    parts = []
+    position = 0
+    for match in ATTRIBUTE_VALUE_PATTERN.finditer(text):
+        parts.append(WHITESPACE_PATTERN.sub(" ", text[position:match.start(1)]))
+        parts.append(match.group(1))
+        position = match.end(1)
+    parts.append(WHITESPACE_PATTERN.sub(" ", text[position:]))
+    return BLOCK_TAG_PATTERN.sub(r"\1", "".join(parts))
+
+
+# Klasa przygotowująca pliki wynikowe do serwowania
+# Funkcjonalności:
+# - Bezpieczna minifikacja HTML
+# - Wstępnie skompresowane kopie .gz i (gdy dostępne brotli) .br
+# - Równoległa kompresja wielu plików
+# - Pomijanie plików, których treść się nie zmieniła
+class OutputOptimizer:
+    """Minifikuje pliki HTML i zapisuje obok nich skompresowane kopie."""
+
+    MANIFEST_NAME = ".output_manifest.json"
+
+    def __init__(self, minify: bool = True, use_brotli: bool = True,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            minify: Czy minifikować HTML przed kompresją
+            use_brotli: Czy zapisywać kopie .br (wymaga pakietu brotli)
+            max_workers: Liczba wątków kompresji (domyślnie liczba rdzeni)
+        """
+        self.minify = minify
+        self.use_brotli = use_brotli and brotli is not None
+        if use_brotli and brotli is None:
+            logger.debug("Brak pakietu brotli - pomijam kopie .br")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._manifests: Dict[str, BuildManifest] = {}
+        self._lock = threading.Lock()
+
+    def _manifest_for(self, path: str) -> BuildManifest:
+        """Zwraca wspólny manifest katalogu pliku (wczytywany raz na instancję)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        with self._lock:
+            if directory not in self._manifests:
+                self._manifests[directory] = BuildManifest(
+                    os.path.join(directory, self.MANIFEST_NAME)
+                )
+            return self._manifests[directory]
+
+    def _sidecars(self, path: str):
+        sidecars = [f"{path}.gz"]
+        if self.use_brotli:
+            sidecars.append(f"{path}.br")
+        return sidecars
+
+    def optimize_file(self, path: str, manifest: BuildManifest) -> bool:
+        """
+        Minifikuje plik i zapisuje jego skompresowane kopie.
+
+        Args:
+            path: Ścieżka do pliku HTML
+            manifest: Manifest katalogu pliku
+
+        Returns:
+            bool: True jeśli plik został przetworzony, False jeśli pominięty
+        """
+        name = os.path.basename(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        previous = manifest.get(name)
+        if (previous and previous.get("output_hash") == digest
+                and previous.get("brotli") == self.use_brotli
+                and all(os.path.exists(sidecar) for sidecar in self._sidecars(path))):
+            return False
+
+        if self.minify:
+            minified = minify_html(data.decode("utf-8")).encode("utf-8")
+            if minified != data:
+                FileHandler.write_atomic(path, minified)
+                data = minified
+                digest = hashlib.sha256(data).hexdigest()
+
+        # mtime=0 - identyczna treść daje identyczny plik .gz
+        FileHandler.write_atomic(f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+        if self.use_brotli:
+            FileHandler.write_atomic(f"{path}.br", brotli.compress(data, mode=brotli.MODE_TEXT))
+
+        manifest.set(name, {"output_hash": digest, "brotli": self.use_brotli, "size": len(data)})
+        return True
+
+    def optimize(self, paths: Iterable[str]) -> Dict[str, int]:
+        """
+        Przetwarza pliki równolegle.
+
+        Args:
+            paths: Ścieżki plików HTML
+
+        Returns:
+            Dict[str, int]: Liczba plików przetworzonych i pominiętych
+        """
+        jobs = [(path, self._manifest_for(path)) for path in paths]
+
+        stats = defaultdict(int)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # zlib i brotli zwalniają GIL na czas kompresji
+            for processed in executor.map(lambda job: self.optimize_file(*job), jobs):
+                stats["optimized" if processed else "skipped"] += 1
+
+        for manifest in {id(manifest): manifest for _, manifest in jobs}.values():
+            manifest.save()
+
+        logger.info(
+            f"Przygotowano pliki do serwowania: przetworzono {stats['optimized']}, "
+            f"pominięto {stats['skipped']}"
+        )
+        return {"optimized": stats["optimized"], "skipped": stats["skipped"]}
@@ -0,0 +1,321 @@
+import os
+import pickle
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .article_processor import MAX_CHUNK_TOKENS, ArticleProcessor, split_content_offsets, validate_html
+from .cache import ResponseCache
+from .chunk_tuner import chunk_tokens_for_text
+from .deadline import Deadline
+from .file_handler import FileHandler
+from .validator import Validator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DocumentPlan:
+    """Wynik przygotowania dokumentu - położenia części zamiast ich treści."""
+
+    path: str
+    encoding: Optional[str] = None
+    offsets: List[Tuple[int, int]] = field(default_factory=list)
+    cache_keys: List[str] = field(default_factory=list)
+    missing: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class FetchTask:
+    """Zapytania do API o brakujące części jednego dokumentu."""
+
+    plan: DocumentPlan
+    deadline: Deadline
+    futures: List[Future] = field(default_factory=list)
+
+
+@dataclass
+class RenderTask:
+    """Zadanie złożenia artykułu z wpisów cache."""
+
+    path: str
+    output_path: str
+    cache_paths: List[str]
+
+
+@dataclass
+class RenderResult:
+    path: str
+    output_path: Optional[str] = None
+    figures: List[List[Dict[str, Any]]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def prepare_document(job: Tuple[str, str, Optional[Dict[str, Any]]]) -> DocumentPlan:
+    """
+    Etap 1 (proces): walidacja, odczyt z wykrywaniem kodowania, podział i klucze cache.
+
+    Args:
+        job: (ścieżka pliku wejściowego, katalog cache, parametry doboru rozmiaru części lub None)
+    """
+    path, cache_dir, chunk_policy = job
+    plan = DocumentPlan(path=path)
+    try:
+        Validator.validate_input_file(path)
+        content, plan.encoding = FileHandler.read_file_with_encoding(path)
+        ArticleProcessor._validate_content_size(content)
+    except Exception as e:
+        plan.error = str(e)
+        return plan
+
+    cache = ResponseCache(cache_dir)
+    plan.offsets = split_content_offsets(
+        content, chunk_tokens_for_text(content, chunk_policy, MAX_CHUNK_TOKENS)
+    )
+    for index, (start, end) in enumerate(plan.offsets):
+        prompt = ArticleProcessor.build_chunk_prompt(content[start:end], index, len(plan.offsets))
+        cache_key = cache.key_for(prompt)
+        plan.cache_keys.append(cache_key)
+        if not cache.entry_path(cache_key).exists():
+            plan.missing.append(index)
+    return plan
+
+
+def render_document(task: RenderTask) -> RenderResult:
+    """
+    Etap 3 (proces): walidacja odpowiedzi z cache, złożenie i zapis artykułu.
+
+    Odpowiedzi są czytane z plików cache w procesie roboczym, więc między
+    procesami przesyłane są tylko ścieżki.
+    """
+    result = RenderResult(path=task.path)
+    try:
+        parts = []
+        for cache_path in task.cache_paths:
+            with open(cache_path, "rb") as f:
+                entry = pickle.load(f)
+            figures: List[Dict[str, Any]] = []
+            parts.append(validate_html(entry["response"], figures))
+            result.figures.append(figures)
+
+        os.makedirs(os.path.dirname(os.path.abspath(task.output_path)), exist_ok=True)
+        FileHandler.write_atomic(task.output_path, "\n".join(parts))
+        result.output_path = task.output_path
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+# Klasa potoku przetwarzania wsadowego
+# Funkcjonalności:
+# - Etapy obciążające CPU (odczyt, podział, walidacja, zapis) w puli procesów
+# - Zapytania do API w wątkach, w ramach limitu równoległości procesora; części
+#   jednego artykułu pobierane równolegle, błąd części anuluje pozostałe
+# - Zadania wysyłane paczkami; między procesami tylko ścieżki i położenia
+# - Artykuły w całości z cache składane bez czekania na zapytania do API
+class BatchPipeline:
+    """Przetwarza wiele plików, rozdzielając pracę CPU na procesy."""
+
+    def __init__(self, processor: ArticleProcessor, cpu_workers: Optional[int] = None):
+        """
+        Args:
+            processor: Procesor artykułów (cache, limit zapytań, klient modelu)
+            cpu_workers: Liczba procesów roboczych (domyślnie liczba rdzeni)
+        """
+        self.processor = processor
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+
+    @staticmethod
+    def output_path_for(path: str, output_dir: Optional[str]) -> str:
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(output_dir or os.path.dirname(os.path.abspath(path)), f"{name}.html")
+
+    def _render_task(self, plan: DocumentPlan, output_dir: Optional[str]) -> RenderTask:
+        cache = self.processor.cache
+        return RenderTask(
+            path=plan.path,
+            output_path=self.output_path_for(plan.path, output_dir),
+            cache_paths=[str(cache.entry_path(key)) for key in plan.cache_keys],
+        )
+
+    def _fetch_missing(self, plan: DocumentPlan, threads: ThreadPoolExecutor,
+                       deadline: Optional[Deadline]) -> FetchTask:
+        """Etap 2: zapytania do API dla części spoza cache, równolegle w puli wątków."""
+        article_deadline = Deadline(self.processor.article_timeout, parent=deadline)
+        with open(plan.path, "r", encoding=plan.encoding) as f:
+            content = f.read().strip()
+        task = FetchTask(plan=plan, deadline=article_deadline)
+        for index in plan.missing:
+            start, end = plan.offsets[index]
+            task.futures.append(threads.submit(
+                self.processor._process_chunk, content[start:end], index, len(plan.offsets),
+                deadline=article_deadline
+            ))
+        return task
+
+    @staticmethod
+    def _completed_fetches(tasks: List[FetchTask]) -> Iterator[Tuple[DocumentPlan, Optional[Exception]]]:
+        """
+        Zwraca dokumenty w kolejności pobrania wszystkich ich części.
+
+        Trwały błąd jednej części anuluje pozostałe części tego dokumentu.
+
+        Yields:
+            Tuple[DocumentPlan, Optional[Exception]]: Plan dokumentu i pierwszy błąd lub None
+        """
+        owners = {future: task for task in tasks for future in task.futures}
+        remaining = {id(task): len(task.futures) for task in tasks}
+        for future in as_completed(owners):
+            task = owners[future]
+            if id(task) not in remaining:
+                # Dokument już zakończony błędem
+                continue
+            try:
+                future.result()
+            except Exception as e:
+                # Nie zużywaj limitu API na części dokumentu, który i tak się nie powiedzie
+                del remaining[id(task)]
+                task.deadline.cancel(f"Anulowano po błędzie części artykułu: {e}")
+                for pending in task.futures:
+                    pending.cancel()
+                yield task.plan, e
+                continue
+            remaining[id(task)] -= 1
+            if not remaining[id(task)]:
+                yield task.plan, None
+
+    def _chunksize(self, count: int) -> int:
+        return max(1, count // (self.cpu_workers * 4))
+
+    def warm(self, paths: List[str], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Wypełnia cache odpowiedziami dla plików bez zapisu artykułów.
+
+        Args:
+            paths: Ścieżki plików wejściowych
+            deadline: Termin całego przetwarzania
+
+        Returns:
+            Dict[str, Any]: Liczba części ("chunks"), części już w cache ("cached"),
+            pobranych ("fetched") i błędy plików ("errors")
+
+        Raises:
+            ValueError: Gdy cache jest wyłączony
+        """
+        if not self.processor.use_cache:
+            raise ValueError("Wypełnianie cache wymaga włączonego cache")
+
+        cache_dir = str(self.processor.cache.cache_dir)
+        chunk_policy = self.processor.chunk_policy()
+        errors: Dict[str, str] = {}
+        chunks = cached = fetched = 0
+
+        with ProcessPoolExecutor(max_workers=self.cpu_workers) as processes, \
+                ThreadPoolExecutor(max_workers=self.processor.limiter.max_limit) as threads:
+            plans = processes.map(
+                prepare_document, [(path, cache_dir, chunk_policy) for path in paths],
+                chunksize=self._chunksize(len(paths))
+            )
+            fetching = []
+            for plan in plans:
+                if plan.error:
+                    errors[plan.path] = plan.error
+                    continue
+                chunks += len(plan.offsets)
+                cached += len(plan.offsets) - len(plan.missing)
+                self.processor.record_cache_lookup(True, len(plan.offsets) - len(plan.missing))
+                if plan.missing:
+                    fetching.append(self._fetch_missing(plan, threads, deadline))
+
+            for plan, error in self._completed_fetches(fetching):
+                if error is not None:
+                    errors[plan.path] = str(error)
+                else:
+                    fetched += len(plan.missing)
+
+        for path, error in errors.items():
+            logger.error(f"Błąd podczas przetwarzania pliku {path}: {error}")
+        logger.info(f"Cache: {chunks} części, {cached} już w cache, pobrano {fetched}, błędy: {len(errors)}")
+        return {"chunks": chunks, "cached": cached, "fetched": fetched, "errors": errors}
+
+    def run(self, paths: List[str], output_dir: Optional[str] = None,
+            deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Przetwarza pliki wejściowe.
+
+        Args:
+            paths: Ścieżki plików wejściowych
+            output_dir: Katalog wynikowy (domyślnie katalog pliku); wynik to <nazwa>.html
+            deadline: Termin całego przetwarzania
+
+        Returns:
+            Dict[str, Any]: Ścieżki zapisanych plików ("outputs") i błędy plików ("errors")
+
+        Raises:
+            ValueError: Gdy cache jest wyłączony (przekazuje odpowiedzi między etapami)
+        """
+        if not self.processor.use_cache:
+            raise ValueError("Potok z pulą procesów wymaga włączonego cache")
+
+        cache_dir = str(self.processor.cache.cache_dir)
+        chunk_policy = self.processor.chunk_policy()
+        errors: Dict[str, str] = {}
+        results: List[RenderResult] = []
+
+        with ProcessPoolExecutor(max_workers=self.cpu_workers) as processes, \
+                ThreadPoolExecutor(max_workers=self.processor.limiter.max_limit) as threads:
+            plans = processes.map(
+                prepare_document, [(path, cache_dir, chunk_policy) for path in paths],
+                chunksize=self._chunksize(len(paths))
+            )
+
+            ready, fetching = [], []
+            for plan in plans:
+                self.processor.metrics.increment("files_started")
+                if plan.error:
+                    errors[plan.path] = plan.error
+                    continue
+                # Chybienia zlicza _process_chunk przy pobieraniu brakujących części
+                self.processor.record_cache_lookup(True, len(plan.offsets) - len(plan.missing))
+                self.processor.record_planned_chunks(len(plan.offsets))
+                self.processor.metrics.increment("chunks_done", len(plan.offsets) - len(plan.missing))
+                if plan.missing:
+                    fetching.append(self._fetch_missing(plan, threads, deadline))
+                else:
+                    ready.append(self._render_task(plan, output_dir))
+            logger.info(
+                f"Przygotowano {len(paths)} plików: {len(ready)} w całości z cache, "
+                f"{len(fetching)} wymaga zapytań do API"
+            )
+
+            # Artykuły z cache są składane równolegle z zapytaniami do API
+            cached_results = processes.map(render_document, ready,
+                                           chunksize=self._chunksize(len(ready)))
+
+            rendering = []
+            for plan, error in self._completed_fetches(fetching):
+                if error is not None:
+                    errors[plan.path] = str(error)
+                    continue
+                rendering.append(processes.submit(render_document, self._render_task(plan, output_dir)))
+
+            results.extend(cached_results)
+            results.extend(future.result() for future in rendering)
+
+        outputs = []
+        for result in results:
+            if result.error:
+                errors[result.path] = result.error
+                continue
+            outputs.append(result.output_path)
+            if self.processor.image_manifest is not None:
+                self.processor.image_manifest.add(result.output_path, result.figures)
+
+        for path, error in errors.items():
+            logger.error(f"Błąd podczas przetwarzania pliku {path}: {error}")
+        logger.info(f"Zapisano {len(outputs)} artykułów, błędy: {len(errors)}")
+        self.processor.metrics.increment("files_done", len(outputs))
+        self.processor.metrics.increment("files_failed", len(errors))
+        return {"outputs": outputs, "errors": errors}
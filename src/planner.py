@@ -0,0 +1,188 @@
+import os
+import json
+import math
+import logging
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import (
+    PLAN_BASE_LATENCY, PLAN_OUTPUT_RATIO, PLAN_OUTPUT_TOKENS_PER_SECOND, TOKENS_PER_CHAR
+)
+from .validator import Validator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FilePlan:
+    path: str
+    chunks: int = 0
+    cached_chunks: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    wall_time: float = 0.0
+    error: Optional[str] = None
+    chunk_latencies: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def requests(self) -> int:
+        return self.chunks - self.cached_chunks
+
+
+# Klasa szacująca koszt przetwarzania wsadowego bez wywołań API
+# Funkcjonalności:
+# - Walidacja, odczyt i podział plików tak jak podczas przetwarzania
+# - Sprawdzenie, które fragmenty są już w cache (gdy cache jest włączony)
+# - Szacowanie tokenów, liczby zapytań i czasu przy danej równoległości i limitach
+class BatchPlanner:
+    """Planuje przetwarzanie wsadowe i przewiduje jego koszt."""
+
+    def __init__(self, processor, concurrency: Optional[int] = None,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """
+        Args:
+            processor: ArticleProcessor dostarczający podział tekstu i cache
+            concurrency: Liczba równoległych zapytań (domyślnie bieżący limit procesora)
+            requests_per_minute: Limit zapytań na minutę (domyślnie RATE_LIMIT_RPM)
+            tokens_per_minute: Limit tokenów na minutę (domyślnie RATE_LIMIT_TPM)
+        """
+        self.processor = processor
+        self.concurrency = concurrency or processor.limiter.limit
+        if requests_per_minute is None and os.getenv('RATE_LIMIT_RPM'):
+            requests_per_minute = float(os.getenv('RATE_LIMIT_RPM'))
+        if tokens_per_minute is None and os.getenv('RATE_LIMIT_TPM'):
+            tokens_per_minute = float(os.getenv('RATE_LIMIT_TPM'))
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        return math.ceil(len(text) * TOKENS_PER_CHAR)
+
+    def plan_file(self, path: str) -> FilePlan:
+        """
+        Planuje przetwarzanie jednego pliku.
+
+        Args:
+            path: Ścieżka do pliku wejściowego
+
+        Returns:
+            FilePlan: Plan pliku (z opisem błędu, jeśli plik nie przejdzie walidacji)
+        """
+        plan = FilePlan(path=path)
+        try:
+            Validator.validate_input_file(path)
+            content = self.processor.file_handler.read_file(path)
+            self.processor._validate_content_size(content)
+            chunks = self.processor._split_large_content(content)
+        except Exception as e:
+            plan.error = str(e)
+            return plan
+
+        plan.chunks = len(chunks)
+        for index, chunk in enumerate(chunks):
+            prompt = self.processor.build_chunk_prompt(chunk, index, len(chunks))
+            # Przy wyłączonym cache (--no-cache) każda część wymaga zapytania
+            if self.processor.use_cache and self.processor.cache.contains(prompt):
+                plan.cached_chunks += 1
+                continue
+            output_tokens = math.ceil(self.estimate_tokens(chunk) * PLAN_OUTPUT_RATIO)
+            plan.input_tokens += self.estimate_tokens(prompt)
+            plan.output_tokens += output_tokens
+            plan.chunk_latencies.append(
+                PLAN_BASE_LATENCY + output_tokens / PLAN_OUTPUT_TOKENS_PER_SECOND
+            )
+
+        # Czas pliku przetwarzanego samodzielnie - części równolegle
+        if plan.chunk_latencies:
+            workers = min(self.concurrency, len(plan.chunk_latencies))
+            plan.wall_time = max(sum(plan.chunk_latencies) / workers, max(plan.chunk_latencies))
+        return plan
+
+    def plan(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """
+        Planuje przetwarzanie wsadowe.
+
+        Args:
+            paths: Ścieżki plików wejściowych
+
+        Returns:
+            Dict[str, Any]: Podsumowanie (klucz "summary") i plany plików (klucz "files")
+        """
+        files = [self.plan_file(path) for path in paths]
+        valid = [plan for plan in files if plan.error is None]
+
+        chunks = sum(plan.chunks for plan in valid)
+        cached = sum(plan.cached_chunks for plan in valid)
+        requests = sum(plan.requests for plan in valid)
+        input_tokens = sum(plan.input_tokens for plan in valid)
+        output_tokens = sum(plan.output_tokens for plan in valid)
+
+        # Czas wyznacza najwęższe gardło: opóźnienia przy danej równoległości lub limity API.
+        # Części wszystkich plików dzielą jeden limit równoległości (harmonogram wsadu),
+        # ale wsad nie skończy się przed najdłuższym artykułem
+        bounds = {"latency": max(
+            sum(sum(plan.chunk_latencies) for plan in valid) / self.concurrency,
+            max((plan.wall_time for plan in valid), default=0.0)
+        )}
+        if self.requests_per_minute:
+            bounds["requests_per_minute"] = requests / self.requests_per_minute * 60
+        if self.tokens_per_minute:
+            bounds["tokens_per_minute"] = (input_tokens + output_tokens) / self.tokens_per_minute * 60
+        bottleneck = max(bounds, key=bounds.get)
+
+        summary = {
+            "files": len(files),
+            "invalid_files": len(files) - len(valid),
+            "chunks": chunks,
+            "cached_chunks": cached,
+            "cache_hit_ratio": cached / chunks if chunks else 0.0,
+            "requests": requests,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "concurrency": self.concurrency,
+            "projected_wall_time": bounds[bottleneck],
+            "bottleneck": bottleneck,
+        }
+        return {
+            "summary": summary,
+            "files": [
+                {key: value for key, value in asdict(plan).items() if key != "chunk_latencies"}
+                for plan in files
+            ],
+        }
+
+    @staticmethod
+    def format_json(plan: Dict[str, Any]) -> str:
+        return json.dumps(plan, indent=2, ensure_ascii=False)
+
+    @staticmethod
+    def format_table(plan: Dict[str, Any]) -> str:
+        """Formatuje plan jako tabelę tekstową."""
+        lines = [
+            f"{'Plik':<40}{'Części':>8}{'Cache':>7}{'Tokeny we':>11}{'Tokeny wy':>11}{'Czas [s]':>10}",
+            "-" * 87,
+        ]
+        for file_plan in plan["files"]:
+            name = os.path.basename(file_plan["path"])[:39]
+            if file_plan["error"]:
+                lines.append(f"{name:<40}  BŁĄD: {file_plan['error']}")
+                continue
+            lines.append(
+                f"{name:<40}{file_plan['chunks']:>8}{file_plan['cached_chunks']:>7}"
+                f"{file_plan['input_tokens']:>11}{file_plan['output_tokens']:>11}"
+                f"{file_plan['wall_time']:>10.1f}"
+            )
+
+        summary = plan["summary"]
+        lines += [
+            "-" * 87,
+            f"Pliki: {summary['files']} (nieprawidłowe: {summary['invalid_files']}), "
+            f"części: {summary['chunks']}, zapytania do API: {summary['requests']}",
+            f"Trafienia cache: {summary['cache_hit_ratio']:.1%}, tokeny: "
+            f"{summary['input_tokens']} wejściowe / {summary['output_tokens']} wyjściowe",
+            f"Przewidywany czas: {summary['projected_wall_time']:.0f} s przy równoległości "
+            f"{summary['concurrency']} (ograniczenie: {summary['bottleneck']})",
+        ]
+        return "\n".join(lines)
@@ -0,0 +1,157 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+LIVE_RELOAD_SCRIPT = (
+    '<script>new EventSource("/events?v={version}")'
+    '.addEventListener("reload", function () {{ location.reload(); }});</script>'
+)
+
+
+class _PreviewRequestHandler(BaseHTTPRequestHandler):
+    """Obsługa żądań serwera podglądu."""
+
+    server_version = "OxidoPreview/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/":
+            self._send_page()
+        elif url.path == "/events":
+            query = parse_qs(url.query)
+            try:
+                version = int(query.get("v", ["0"])[0])
+            except ValueError:
+                self.send_error(400, explain="Nieprawidłowa wersja strony")
+                return
+            self._stream_events(version)
+        else:
+            self.send_error(404)
+
+    def _send_page(self):
+        body = self.server.preview.page()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self, version: int):
+        preview = self.server.preview
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+        preview.client_connected()
+        try:
+            self.wfile.write(b"retry: 1000\n\n")
+            self.wfile.flush()
+            while not preview.stopped:
+                new_version = preview.wait_for_update(version, timeout=15)
+                if new_version == version:
+                    # Komentarz podtrzymujący połączenie
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    version = new_version
+                    self.wfile.write(f"event: reload\ndata: {version}\n\n".encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            preview.client_disconnected()
+
+    def log_message(self, format, *args):
+        logger.debug(f"Serwer podglądu: {format % args}")
+
+
+# Lokalny serwer podglądu z automatycznym odświeżaniem
+# Funkcjonalności:
+# - Serwowanie strony z pamięci, bez zapisu na dysk
+# - Powiadamianie przeglądarki o zmianach przez server-sent events
+# - Śledzenie liczby otwartych kart podglądu
+class PreviewServer:
+    """Serwer HTTP udostępniający podgląd artykułu z live reload."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            host: Adres nasłuchiwania (domyślnie tylko lokalnie)
+            port: Port nasłuchiwania (0 - dowolny wolny port)
+        """
+        self._httpd = ThreadingHTTPServer((host, port), _PreviewRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.preview = self
+        self._condition = threading.Condition()
+        self._page = b""
+        self._version = 0
+        self._clients = 0
+        self._thread = None
+        self.stopped = False
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def has_clients(self) -> bool:
+        """Czy jakakolwiek karta przeglądarki nasłuchuje zmian."""
+        with self._condition:
+            return self._clients > 0
+
+    def start(self) -> None:
+        """Uruchamia serwer w wątku w tle."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Serwer podglądu działa pod adresem {self.url}")
+
+    def stop(self) -> None:
+        """Zatrzymuje serwer i zamyka połączenia z przeglądarką."""
+        with self._condition:
+            self.stopped = True
+            self._condition.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def update(self, html: str) -> None:
+        """
+        Podmienia stronę podglądu i powiadamia przeglądarki o zmianie.
+
+        Args:
+            html: Kompletna strona HTML
+        """
+        with self._condition:
+            self._version += 1
+            script = LIVE_RELOAD_SCRIPT.format(version=self._version)
+            body_end = html.rfind("</body>")
+            if body_end == -1:
+                page = html + script
+            else:
+                page = html[:body_end] + script + html[body_end:]
+            self._page = page.encode("utf-8")
+            self._condition.notify_all()
+
+    def page(self) -> bytes:
+        with self._condition:
+            return self._page
+
+    def wait_for_update(self, version: int, timeout: float) -> int:
+        """Czeka aż wersja strony będzie inna niż `version` i zwraca aktualną wersję."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._version != version or self.stopped, timeout=timeout
+            )
+            return self._version
+
+    def client_connected(self) -> None:
+        with self._condition:
+            self._clients += 1
+
+    def client_disconnected(self) -> None:
+        with self._condition:
+            self._clients -= 1
@@ -0,0 +1,236 @@
+import io
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import nullcontext
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    """Pomiar pojedynczego wykonania etapu."""
+
+    __slots__ = ("profiler", "name", "network", "wall_start", "cpu_start",
+                 "memory_start", "memory_peak", "cprofile")
+
+    def __init__(self, profiler: "StageProfiler", name: str, network: bool):
+        self.profiler = profiler
+        self.name = name
+        self.network = network
+        self.cprofile = None
+
+    def __enter__(self):
+        local = self.profiler._local
+        depth = getattr(local, "depth", 0)
+        local.depth = depth + 1
+
+        # cProfile działa na wątek - profilowany jest tylko najbardziej zewnętrzny etap
+        if self.profiler.use_cprofile and depth == 0:
+            self.cprofile = self.profiler._start_cprofile()
+
+        self.memory_start = self.profiler._enter_memory(self) if self.profiler.trace_memory else 0
+        self.cpu_start = time.thread_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.thread_time() - self.cpu_start
+        peak = 0
+        if self.profiler.trace_memory:
+            peak = max(0, self.profiler._exit_memory(self) - self.memory_start)
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+        self.profiler._local.depth -= 1
+        self.profiler._record(self.name, self.network, wall, cpu, peak, self.cprofile)
+        return False
+
+
+# Klasa mierząca czas i pamięć poszczególnych etapów przetwarzania
+# Funkcjonalności:
+# - Czas rzeczywisty i czas CPU wątku dla każdego etapu
+# - Oddzielenie oczekiwania na sieć od pracy CPU
+# - Opcjonalne profilowanie cProfile i próbkowanie pamięci tracemalloc
+# - Raport w formacie JSON i tabeli tekstowej
+class StageProfiler:
+    """Profiler etapów potoku; wyłączony nie dodaje praktycznie żadnego narzutu."""
+
+    def __init__(self):
+        self.enabled = False
+        self.use_cprofile = False
+        self.trace_memory = False
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._cprofile_stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._memory_stages = []
+        self._cprofile_warned = False
+        self._started_wall = 0.0
+        self._started_cpu = 0.0
+
+    def enable(self, use_cprofile: bool = False, trace_memory: bool = False) -> None:
+        """
+        Włącza profilowanie.
+
+        Args:
+            use_cprofile: Zbieraj statystyki funkcji przez cProfile
+            trace_memory: Mierz szczytowe zużycie pamięci przez tracemalloc
+        """
+        self.enabled = True
+        self.use_cprofile = use_cprofile
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.process_time()
+
+    def stage(self, name: str, network: bool = False):
+        """
+        Zwraca kontekst mierzący etap.
+
+        Args:
+            name: Nazwa etapu
+            network: Czy etap polega głównie na oczekiwaniu na sieć
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, network)
+
+    def _start_cprofile(self) -> Optional[cProfile.Profile]:
+        """Włącza cProfile dla etapu; None, gdy aktywny jest już inny profiler."""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Od Pythona 3.12 w procesie może działać tylko jeden profiler naraz -
+            # etapy równoległych wątków są wtedy mierzone bez cProfile
+            if not self._cprofile_warned:
+                self._cprofile_warned = True
+                logger.debug(f"Pominięto cProfile dla równoległego etapu: {str(e)}")
+            return None
+        return profile
+
+    def _enter_memory(self, stage: _Stage) -> int:
+        """Zeruje szczyt tracemalloc dla nowego etapu i zwraca bieżące zużycie pamięci."""
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            # Szczyt sprzed wyzerowania zachowują trwające etapy (także nadrzędne)
+            for active in self._memory_stages:
+                active.memory_peak = max(active.memory_peak, peak)
+            tracemalloc.reset_peak()
+            stage.memory_peak = current
+            self._memory_stages.append(stage)
+            return current
+
+    def _exit_memory(self, stage: _Stage) -> int:
+        """Zwraca szczytowe zużycie pamięci w czasie etapu."""
+        with self._lock:
+            peak = max(stage.memory_peak, tracemalloc.get_traced_memory()[1])
+            self._memory_stages.remove(stage)
+            # Szczyt jest globalny dla procesu - przy równoległych etapach to górne oszacowanie
+            return peak
+
+    def _record(self, name: str, network: bool, wall: float, cpu: float, peak: int,
+                profile: Optional[cProfile.Profile]) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                "network": network, "calls": 0, "wall": 0.0, "cpu": 0.0,
+                "max_wall": 0.0, "peak_memory": 0
+            })
+            stats["calls"] += 1
+            stats["wall"] += wall
+            stats["cpu"] += cpu
+            stats["max_wall"] = max(stats["max_wall"], wall)
+            stats["peak_memory"] = max(stats["peak_memory"], peak)
+
+            if profile is not None:
+                if self._cprofile_stats is None:
+                    self._cprofile_stats = pstats.Stats(profile)
+                else:
+                    self._cprofile_stats.add(profile)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Zwraca zebrane pomiary.
+
+        Returns:
+            Dict[str, Any]: Pomiary etapów i podsumowanie oczekiwania na sieć i pracy CPU
+        """
+        with self._lock:
+            stages = {name: dict(stats) for name, stats in self._stats.items()}
+
+        network_wait = 0.0
+        local_cpu = 0.0
+        for stats in stages.values():
+            stats["wait"] = max(0.0, stats["wall"] - stats["cpu"])
+            if stats["network"]:
+                network_wait += stats["wait"]
+            local_cpu += stats["cpu"]
+
+        return {
+            "total_wall": time.perf_counter() - self._started_wall,
+            "total_cpu": time.process_time() - self._started_cpu,
+            "network_wait": network_wait,
+            "stage_cpu": local_cpu,
+            "stages": stages,
+        }
+
+    def format_report(self, report: Dict[str, Any]) -> str:
+        """Formatuje raport jako tabelę tekstową."""
+        lines = [
+            f"{'Etap':<22}{'Wywołania':>10}{'Czas [s]':>11}{'CPU [s]':>10}"
+            f"{'Oczekiwanie [s]':>17}{'Pamięć [MB]':>13}",
+            "-" * 83,
+        ]
+        ordered = sorted(report["stages"].items(), key=lambda item: -item[1]["wall"])
+        for name, stats in ordered:
+            label = f"{name} (sieć)" if stats["network"] else name
+            lines.append(
+                f"{label:<22}{stats['calls']:>10}{stats['wall']:>11.3f}{stats['cpu']:>10.3f}"
+                f"{stats['wait']:>17.3f}{stats['peak_memory'] / 1024 / 1024:>13.2f}"
+            )
+        lines.append("-" * 83)
+        lines.append(
+            f"Całość: {report['total_wall']:.3f} s, CPU procesu: {report['total_cpu']:.3f} s, "
+            f"oczekiwanie na sieć: {report['network_wait']:.3f} s"
+        )
+        lines.append("Etapy zagnieżdżone są wliczane również do etapów nadrzędnych.")
+        return "\n".join(lines)
+
+    def write_report(self, path: str) -> None:
+        """
+        Zapisuje raport JSON, tabelę tekstową i (opcjonalnie) statystyki cProfile.
+
+        Args:
+            path: Ścieżka raportu JSON; obok powstają pliki .txt i .prof
+        """
+        report = self.report()
+        text = self.format_report(report)
+        base = path[:-5] if path.endswith(".json") else path
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        if self._cprofile_stats is not None:
+            self._cprofile_stats.dump_stats(f"{base}.prof")
+            stream = io.StringIO()
+            stats = pstats.Stats(f"{base}.prof", stream=stream)
+            stats.sort_stats("cumulative").print_stats(30)
+            text += "\n\n" + stream.getvalue()
+
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(text)
+
+        logger.info(f"Raport profilowania zapisano do {path}\n{self.format_report(report)}")
+
+
+# Wspólny profiler używany przez moduły potoku
+profiler = StageProfiler()
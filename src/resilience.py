@@ -0,0 +1,201 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Typy błędów API (wartości APIErrorType) oznaczające niedostępność dostawcy
+OUTAGE_ERRORS = {"server_error", "timeout", "connection_error"}
+
+
+class CircuitOpenError(Exception):
+    """Zapytanie odrzucone bez wysyłania - dostawca API jest uznany za niedostępny."""
+
+
+# Klasa wspólnego budżetu ponowień
+# Funkcjonalności:
+# - Ponowienia ograniczone do odsetka udanych zapytań w ostatnim oknie czasu
+# - Stała rezerwa ponowień dla małego ruchu
+# - Jeden budżet dla wszystkich wątków - awaria nie mnoży obciążenia dostawcy
+class RetryBudget:
+    """Ogranicza łączną liczbę ponowień względem udanych zapytań."""
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 5, window: float = 60.0,
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            ratio: Dopuszczalna liczba ponowień na udane zapytanie w oknie
+            min_retries: Ponowienia dostępne zawsze w oknie (np. na początku pracy)
+            window: Długość okna w sekundach
+            metrics: Rejestr metryk
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self.metrics = metrics or Metrics()
+        self._successes = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, metrics: Optional[Metrics] = None) -> "RetryBudget":
+        """Tworzy budżet ze zmiennych RETRY_BUDGET_RATIO i RETRY_BUDGET_MIN."""
+        return cls(
+            ratio=float(os.getenv('RETRY_BUDGET_RATIO', 0.2)),
+            min_retries=int(os.getenv('RETRY_BUDGET_MIN', 5)),
+            metrics=metrics,
+        )
+
+    def _expire(self, now: float) -> None:
+        for events in (self._successes, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_success(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._successes.append(now)
+
+    def try_acquire(self) -> bool:
+        """
+        Zajmuje jedno ponowienie z budżetu.
+
+        Returns:
+            bool: True, gdy można ponowić zapytanie; False, gdy budżet jest wyczerpany
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if len(self._retries) >= self.min_retries + self.ratio * len(self._successes):
+                self.metrics.increment("retry_budget_exhausted")
+                return False
+            self._retries.append(now)
+        self.metrics.increment("retries")
+        return True
+
+
+# Klasa wyłącznika obwodu dla API
+# Funkcjonalności:
+# - Otwarcie po serii kolejnych błędów niedostępności dostawcy
+# - Natychmiastowe odrzucanie zapytań, gdy obwód jest otwarty
+# - Pojedyncze zapytanie próbne po czasie oczekiwania (stan półotwarty)
+# - Stan publikowany jako metryka
+class CircuitBreaker:
+    """Wyłącznik obwodu przerywający zapytania podczas awarii dostawcy."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            failure_threshold: Liczba kolejnych błędów niedostępności otwierająca obwód
+                (0 - wyłącznik nieaktywny)
+            reset_timeout: Czas (s) do wysłania zapytania próbnego
+            metrics: Rejestr metryk
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics or Metrics()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self._publish()
+
+    @classmethod
+    def from_env(cls, metrics: Optional[Metrics] = None) -> "CircuitBreaker":
+        """Tworzy wyłącznik ze zmiennych CIRCUIT_FAILURE_THRESHOLD i CIRCUIT_RESET_TIMEOUT."""
+        return cls(
+            failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5)),
+            reset_timeout=float(os.getenv('CIRCUIT_RESET_TIMEOUT', 30)),
+            metrics=metrics,
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _publish(self) -> None:
+        self.metrics.set_gauge("circuit_open", 0 if self._state == self.CLOSED else 1)
+
+    def before_request(self) -> None:
+        """
+        Sprawdza, czy zapytanie może zostać wysłane.
+
+        Raises:
+            CircuitOpenError: Gdy obwód jest otwarty lub trwa zapytanie próbne
+        """
+        if self.failure_threshold <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_started = None
+            # Jedno zapytanie próbne naraz; próba bez wyniku (np. anulowana) wygasa
+            if self._state == self.HALF_OPEN and (
+                self._probe_started is None or now - self._probe_started >= self.reset_timeout
+            ):
+                self._probe_started = now
+                logger.info("Wyłącznik obwodu: zapytanie próbne do API")
+                return
+            retry_in = max(0.0, self.reset_timeout - (now - self._opened_at))
+        self.metrics.increment("circuit_rejections")
+        raise CircuitOpenError(
+            f"API niedostępne po {self.failure_threshold} kolejnych błędach - "
+            f"zapytania wstrzymane (kolejna próba za {retry_in:.0f} s)"
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Wyłącznik obwodu: API ponownie dostępne")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_started = None
+            self._publish()
+
+    def record_failure(self, error_type: str) -> None:
+        """
+        Rejestruje nieudane zapytanie.
+
+        Args:
+            error_type: Typ błędu (wartość APIErrorType); tylko błędy niedostępności
+                dostawcy (OUTAGE_ERRORS) zbliżają otwarcie obwodu
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if error_type not in OUTAGE_ERRORS:
+                # Dostawca odpowiada (np. błąd zapytania) - nie jest niedostępny
+                self._failures = 0
+                if self._state == self.HALF_OPEN:
+                    self._state = self.CLOSED
+                    self._publish()
+                return
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+                self.metrics.increment("circuit_opened")
+                logger.warning(
+                    f"Wyłącznik obwodu otwarty po {self._failures} kolejnych błędach ({error_type}) - "
+                    f"zapytania wstrzymane na {self.reset_timeout:.0f} s"
+                )
+                self._publish()
@@ -0,0 +1,301 @@
+import heapq
+import logging
+import threading
+from fnmatch import fnmatch
+from queue import Queue
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .config import TOKENS_PER_CHAR
+from .deadline import Cancelled, Deadline
+from .validator import Validator
+
+logger = logging.getLogger(__name__)
+
+# lpt - najpierw największe artykuły (najkrótszy czas całego wsadu),
+# sjf - najpierw najkrótsze (najkrótszy średni czas oczekiwania na artykuł),
+# fifo - w kolejności zgłoszenia
+POLICIES = ("lpt", "sjf", "fifo")
+
+
+def parse_priorities(values: Iterable[str]) -> List[Tuple[str, int]]:
+    """
+    Odczytuje priorytety plików w postaci WZORZEC=N (np. "pilne*.txt=10").
+
+    Raises:
+        ValueError: Gdy wpis nie ma postaci WZORZEC=N
+    """
+    priorities = []
+    for value in values:
+        pattern, separator, priority = value.rpartition("=")
+        if not separator or not pattern:
+            raise ValueError(f"Priorytet musi mieć postać WZORZEC=N: {value}")
+        try:
+            priorities.append((pattern, int(priority)))
+        except ValueError:
+            raise ValueError(f"Priorytet musi być liczbą całkowitą: {value}")
+    return priorities
+
+
+def priority_for(path: str, priorities: List[Tuple[str, int]]) -> int:
+    """Zwraca priorytet pierwszego wzorca pasującego do ścieżki lub nazwy pliku (domyślnie 0)."""
+    name = path.replace("\\", "/").rsplit("/", 1)[-1]
+    for pattern, priority in priorities:
+        if fnmatch(path, pattern) or fnmatch(name, pattern):
+            return priority
+    return 0
+
+
+@dataclass
+class Job:
+    """Artykuł zgłoszony do harmonogramu."""
+
+    job_id: Any
+    text: str
+    # Wyższy priorytet jest obsługiwany wcześniej niezależnie od strategii
+    priority: int = 0
+
+
+@dataclass
+class _Article:
+    job: Job
+    chunks: List[str]
+    work: float
+    figures: List[Optional[List[Dict[str, Any]]]]
+    results: List[Optional[str]] = field(default_factory=list)
+    remaining: int = 0
+    deadline: Optional[Deadline] = None
+    failed: bool = False
+    finished: bool = False
+
+
+# Klasa harmonogramu części artykułów
+# Funkcjonalności:
+# - Jedna kolejka priorytetowa części wszystkich artykułów wsadu
+# - Strategie: najpierw duże (LPT), najpierw krótkie (SJF) lub FIFO
+# - Jawne priorytety zadań przed strategią
+# - Koszt artykułu z planu podziału, bez części już obecnych w cache
+# - Termin artykułu liczony od rozpoczęcia jego pierwszej części
+class ChunkScheduler:
+    """Kolejkuje części artykułów przed wątkami wywołującymi API."""
+
+    def __init__(self, processor, policy: str = "lpt", workers: Optional[int] = None):
+        """
+        Args:
+            processor: ArticleProcessor (podział tekstu, cache, przetwarzanie części)
+            policy: Strategia kolejności: lpt, sjf lub fifo
+            workers: Liczba wątków (domyślnie górny limit równoległych zapytań)
+
+        Raises:
+            ValueError: Gdy strategia jest nieznana
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Nieznana strategia harmonogramu: {policy}")
+        self.processor = processor
+        self.policy = policy
+        self.workers = workers or processor.limiter.max_limit
+
+    def _plan(self, job: Job, collect_figures: bool) -> _Article:
+        """Dzieli tekst i szacuje koszt artykułu (tokeny części spoza cache)."""
+        self.processor._validate_content_size(job.text)
+        chunks = self.processor._split_large_content(job.text)
+        self.processor.record_planned_chunks(len(chunks))
+        work = 0.0
+        for index, chunk in enumerate(chunks):
+            prompt = self.processor.build_chunk_prompt(chunk, index, len(chunks))
+            if not (self.processor.use_cache and self.processor.cache.contains(prompt)):
+                work += len(chunk) * TOKENS_PER_CHAR
+        return _Article(
+            job=job,
+            chunks=chunks,
+            work=work,
+            figures=[[] if collect_figures else None for _ in chunks],
+            results=[None] * len(chunks),
+            remaining=len(chunks),
+        )
+
+    def _key(self, article: _Article, index: int, sequence: int) -> Tuple:
+        """Klucz kolejki - mniejszy jest obsługiwany wcześniej."""
+        if self.policy == "lpt":
+            # Największe artykuły i ich najdłuższe części jak najwcześniej
+            order = (-article.work, -len(article.chunks[index]))
+        elif self.policy == "sjf":
+            order = (article.work, index)
+        else:
+            order = ()
+        return (-article.job.priority, *order, sequence)
+
+    def run(self, jobs: Iterable[Union[Job, Tuple[Any, str]]], deadline: Optional[Deadline] = None,
+            collect_figures: bool = False) -> Iterator[Tuple[Any, Union[str, Exception], Optional[list]]]:
+        """
+        Przetwarza artykuły, zwracając wyniki w kolejności ukończenia.
+
+        Args:
+            jobs: Zadania lub pary (identyfikator, tekst)
+            deadline: Termin całego wsadu
+            collect_figures: Zbieraj grafiki części (dla manifestu grafik)
+
+        Yields:
+            Tuple: (identyfikator, kod HTML lub błąd, grafiki kolejnych części lub None)
+        """
+        batch_deadline = Deadline(parent=deadline)
+        results: Queue = Queue()
+        heap = []
+        articles: List[_Article] = []
+        sequence = 0
+
+        for job in jobs:
+            if not isinstance(job, Job):
+                job = Job(*job)
+            try:
+                article = self._plan(job, collect_figures)
+            except Exception as e:
+                yield job.job_id, e, None
+                continue
+            articles.append(article)
+            for index in range(len(article.chunks)):
+                heapq.heappush(heap, (self._key(article, index, sequence), sequence, article, index))
+                sequence += 1
+
+        logger.info(f"Harmonogram ({self.policy}): {len(articles)} artykułów, {len(heap)} części")
+        lock = threading.Condition()
+        active = 0
+        running = 0
+
+        def fail(article: _Article, error: Exception) -> None:
+            with lock:
+                if article.failed:
+                    return
+                article.failed = True
+                if article.deadline is not None:
+                    # Pozostałe części tego artykułu nie zużyją limitu API
+                    article.deadline.cancel(f"Anulowano po błędzie części artykułu: {error}")
+            results.put((article, error))
+
+        def worker() -> None:
+            nonlocal running
+            try:
+                work()
+            finally:
+                with lock:
+                    running -= 1
+                    if running:
+                        return
+                    # Ostatni wątek kończy też artykuły, których części nie zostały
+                    # pobrane z kolejki (np. po anulowaniu wsadu) - inaczej wywołujący
+                    # czekałby na ich wyniki bez końca
+                    unfinished = [article for article in articles
+                                  if not article.failed and not article.finished]
+                    for article in unfinished:
+                        article.failed = True
+                reason = batch_deadline.reason or "Przetwarzanie wsadu zostało anulowane"
+                for article in unfinished:
+                    results.put((article, Cancelled(reason)))
+
+        def work() -> None:
+            nonlocal active
+            while True:
+                with lock:
+                    # Część jest pobierana z kolejki dopiero, gdy może od razu wysłać zapytanie -
+                    # inaczej o kolejności decydowałoby oczekiwanie na limiter, a nie harmonogram
+                    while heap and active >= self.processor.limiter.limit and not batch_deadline.cancelled:
+                        lock.wait(timeout=0.1)
+                    if not heap or batch_deadline.cancelled:
+                        return
+                    _, _, article, index = heapq.heappop(heap)
+                    if article.failed:
+                        continue
+                    if article.deadline is None:
+                        article.deadline = Deadline(self.processor.article_timeout, parent=batch_deadline)
+                    active += 1
+                try:
+                    html_content = self.processor._process_chunk(
+                        article.chunks[index], index, len(article.chunks),
+                        article.figures[index], article.deadline
+                    )
+                except Exception as e:
+                    fail(article, e)
+                    html_content = None
+                with lock:
+                    active -= 1
+                    lock.notify()
+                    if html_content is None:
+                        continue
+                    article.results[index] = html_content
+                    article.remaining -= 1
+                    done = article.remaining == 0 and not article.failed
+                    article.finished = done
+                if done:
+                    results.put((article, None))
+
+        threads = [
+            threading.Thread(target=worker, daemon=True, name=f"scheduler-{i}")
+            for i in range(min(self.workers, len(heap)))
+        ]
+        running = len(threads)
+        for thread in threads:
+            thread.start()
+        try:
+            for _ in range(len(articles)):
+                article, error = results.get()
+                if error is not None:
+                    yield article.job.job_id, error, None
+                else:
+                    figures = article.figures if collect_figures else None
+                    yield article.job.job_id, "\n".join(article.results), figures
+        finally:
+            # Przerwanie iteracji przez wywołującego anuluje pozostałą pracę
+            batch_deadline.cancel("Przerwano przetwarzanie wsadu")
+
+    def process_files(self, input_files: List[str], priorities: Optional[List[Tuple[str, int]]] = None,
+                      deadline: Optional[Deadline] = None) -> List[str]:
+        """
+        Przetwarza pliki i zapisuje wyniki zaraz po ukończeniu każdego artykułu.
+
+        Nazwy plików wynikowych są ustalane z góry w kolejności plików wejściowych,
+        więc nie zależą od kolejności ukończenia.
+
+        Args:
+            input_files: Ścieżki plików wejściowych
+            priorities: Priorytety plików (WZORZEC, N) - zob. parse_priorities
+            deadline: Termin całego wsadu
+
+        Returns:
+            List[str]: Ścieżki zapisanych plików (w kolejności ukończenia)
+        """
+        processor = self.processor
+        jobs = []
+        for input_file in input_files:
+            processor.metrics.increment("files_started")
+            try:
+                Validator.validate_input_file(input_file)
+                content = processor.file_handler.read_file(input_file)
+            except Exception as e:
+                logger.error(f"Błąd podczas przetwarzania pliku {input_file}: {str(e)}")
+                processor.metrics.increment("files_failed")
+                continue
+            jobs.append(Job(input_file, content, priority_for(input_file, priorities or [])))
+        Validator.validate_environment()
+
+        output_paths = dict(zip(
+            [job.job_id for job in jobs],
+            processor.file_handler.reserve_output_paths([job.job_id for job in jobs])
+        ))
+        outputs = []
+        collect_figures = processor.image_manifest is not None
+        for input_file, result, figures in self.run(jobs, deadline, collect_figures):
+            if isinstance(result, Exception):
+                logger.error(f"Błąd podczas przetwarzania pliku {input_file}: {str(result)}")
+                processor.metrics.increment("files_failed")
+                continue
+            output_file = processor.file_handler.save_file(result, input_file, output_paths[input_file])
+            if not output_file:
+                logger.error(f"Nie udało się zapisać wyniku dla pliku {input_file}")
+                processor.metrics.increment("files_failed")
+                continue
+            logger.info(f"Zapisano wynik do pliku: {output_file}")
+            processor.metrics.increment("files_done")
+            outputs.append(output_file)
+            if collect_figures:
+                processor.image_manifest.add(output_file, figures)
+        return outputs
@@ -0,0 +1,263 @@
+import os
+import re
+import html
+import json
+import struct
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set, Tuple
+
+from .cache import ResponseCache
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Liczba funkcji haszujących MinHash i podział sygnatury na pasma LSH
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Stałe współczynniki permutacji - sygnatury muszą być zgodne między uruchomieniami
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME or 1,
+        int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERMUTATIONS)
+]
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+_DIGIT_PATTERN = re.compile(r"\d")
+
+
+def normalize_text(text: str) -> List[str]:
+    """
+    Normalizuje tekst do porównań: małe litery, cyfry zastąpione zerami, bez interpunkcji.
+
+    Returns:
+        List[str]: Słowa znormalizowanego tekstu
+    """
+    return _WORD_PATTERN.findall(_DIGIT_PATTERN.sub("0", text.lower()))
+
+
+def minhash_signature(text: str) -> List[int]:
+    """Oblicza sygnaturę MinHash dla n-gramów słów znormalizowanego tekstu."""
+    words = normalize_text(text)
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {
+            " ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)
+        }
+
+    hashes = [
+        struct.unpack("<I", hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest())[0]
+        for shingle in shingles
+    ]
+    return [
+        min((a * value + b) % _MERSENNE_PRIME & _MAX_HASH for value in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(first: List[int], second: List[int]) -> float:
+    """Szacuje podobieństwo Jaccarda na podstawie dwóch sygnatur."""
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERMUTATIONS
+
+
+def word_changes(old_text: str, new_text: str, max_changes: int = 20) -> Optional[List[Tuple[str, str]]]:
+    """
+    Wyznacza zmiany na poziomie słów między dwiema wersjami tekstu.
+
+    Każda zmiana zawiera po jednym niezmienionym słowie kontekstu z obu stron,
+    aby dało się ją jednoznacznie odnaleźć w wygenerowanym HTML.
+
+    Args:
+        old_text: Tekst, dla którego istnieje odpowiedź w cache
+        new_text: Nowy tekst
+        max_changes: Maksymalna liczba zmian, powyżej której łatanie się nie opłaca
+
+    Returns:
+        Optional[List[Tuple[str, str]]]: Pary (stary fragment, nowy fragment) lub None
+    """
+    old_words, new_words = old_text.split(), new_text.split()
+    changes = []
+    matcher = SequenceMatcher(None, old_words, new_words, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        start_old, start_new = max(i1 - 1, 0), max(j1 - 1, 0)
+        changes.append((
+            " ".join(old_words[start_old:i2 + 1]),
+            " ".join(new_words[start_new:j2 + 1]),
+        ))
+        if len(changes) > max_changes:
+            return None
+    return changes
+
+
+def apply_text_changes(html_content: str, changes: List[Tuple[str, str]]) -> Optional[str]:
+    """
+    Nanosi zmiany tekstu na kod HTML wygenerowany dla starej wersji.
+
+    Fragment musi wystąpić w tekście HTML dokładnie raz (dowolne białe znaki
+    między słowami); w przeciwnym razie łatka jest odrzucana.
+
+    Returns:
+        Optional[str]: Poprawiony HTML lub None, gdy którejś zmiany nie da się nanieść
+    """
+    for old_fragment, new_fragment in changes:
+        if not old_fragment:
+            return None
+        pattern = re.compile(
+            r"(?<!\w)"
+            + r"\s+".join(re.escape(html.escape(word, quote=False)) for word in old_fragment.split())
+            + r"(?!\w)"
+        )
+        matches = pattern.findall(html_content)
+        if len(matches) != 1:
+            return None
+        replacement = html.escape(new_fragment, quote=False)
+        html_content = pattern.sub(lambda _: replacement, html_content, count=1)
+    return html_content
+
+
+# Indeks prawie identycznych fragmentów tekstu
+# Funkcjonalności:
+# - Sygnatury MinHash znormalizowanego tekstu (odporne na zmiany dat i literówki)
+# - Wyszukiwanie kandydatów przez LSH bez porównywania z każdym wpisem
+# - Trwały zapis w katalogu cache pod jego blokadą (plik dopisywany)
+# - Statystyki trafień i rozkład podobieństw do strojenia progu
+class NearDuplicateIndex:
+    """Indeks podobieństwa fragmentów tekstu wskazujący wpisy cache."""
+
+    INDEX_NAME = "similarity_index.jsonl"
+
+    def __init__(self, cache: ResponseCache, threshold: float = 0.9,
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            cache: Cache odpowiedzi, którego wpisy wskazuje indeks
+            threshold: Minimalne szacowane podobieństwo uznawane za trafienie (0-1)
+            metrics: Rejestr metryk dla statystyk trafień
+        """
+        self.cache = cache
+        self.threshold = threshold
+        self.metrics = metrics or Metrics()
+        self.index_path = os.path.join(cache.cache_dir, self.INDEX_NAME)
+        self._signatures: Dict[str, List[int]] = {}
+        self._bands: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = defaultdict(set)
+        self._histogram: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._insert(entry["key"], entry["signature"])
+        logger.info(f"Wczytano indeks podobieństwa: {len(self._signatures)} fragmentów")
+
+    def _insert(self, cache_key: str, signature: List[int]) -> None:
+        self._signatures[cache_key] = signature
+        for band in range(LSH_BANDS):
+            rows = tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            self._bands[(band, rows)].add(cache_key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._signatures)
+
+    def add(self, cache_key: str, text: str) -> None:
+        """
+        Dodaje fragment tekstu do indeksu.
+
+        Args:
+            cache_key: Klucz wpisu cache z odpowiedzią dla tego fragmentu
+            text: Tekst fragmentu
+        """
+        signature = minhash_signature(text)
+        with self._lock:
+            if cache_key in self._signatures:
+                return
+            self._insert(cache_key, signature)
+
+        line = json.dumps({"key": cache_key, "signature": signature}, separators=(",", ":"))
+        # Pojedynczy zapis w trybie dopisywania - wpisy innych procesów się nie przeplatają
+        with self.cache.lock(shared=True):
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def query(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Szuka najbardziej podobnego fragmentu w indeksie.
+
+        Args:
+            text: Tekst fragmentu
+
+        Returns:
+            Optional[Tuple[str, float]]: (klucz cache, podobieństwo) lub None poniżej progu
+        """
+        signature = minhash_signature(text)
+        with self._lock:
+            candidates = set()
+            for band in range(LSH_BANDS):
+                rows = tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+                candidates |= self._bands.get((band, rows), set())
+
+            best_key, best_similarity = None, 0.0
+            for key in candidates:
+                similarity = estimate_similarity(signature, self._signatures[key])
+                if similarity > best_similarity:
+                    best_key, best_similarity = key, similarity
+
+            # Rozkład najlepszych podobieństw co 0.05 - do wyboru progu
+            self._histogram[f"{int(best_similarity * 20) / 20:.2f}"] += 1
+
+        if best_key is None or best_similarity < self.threshold:
+            self.metrics.increment("near_duplicate_misses")
+            return None
+        self.metrics.increment("near_duplicate_hits")
+        return best_key, best_similarity
+
+    def report(self) -> Dict[str, object]:
+        """Zwraca statystyki trafień i rozkład podobieństw."""
+        hits = self.metrics.counter("near_duplicate_hits")
+        misses = self.metrics.counter("near_duplicate_misses")
+        with self._lock:
+            histogram = dict(sorted(self._histogram.items()))
+        return {
+            "threshold": self.threshold,
+            "indexed": len(self),
+            "hits": int(hits),
+            "misses": int(misses),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "local_patches": int(self.metrics.counter("near_duplicate_local_patches")),
+            "model_patches": int(self.metrics.counter("near_duplicate_model_patches")),
+            "patch_failures": int(self.metrics.counter("near_duplicate_patch_failures")),
+            "similarity_histogram": histogram,
+        }
+
+    def format_report(self) -> str:
+        report = self.report()
+        lines = [
+            f"Indeks podobieństwa: próg {report['threshold']:.2f}, fragmentów {report['indexed']}",
+            f"Trafienia: {report['hits']}, chybienia: {report['misses']} "
+            f"({report['hit_rate']:.1%}); łatki lokalne: {report['local_patches']}, "
+            f"łatki modelu: {report['model_patches']}, nieudane: {report['patch_failures']}",
+            "Rozkład najlepszego podobieństwa:",
+        ]
+        for bucket, count in report["similarity_histogram"].items():
+            lines.append(f"  >= {bucket}: {count}")
+        return "\n".join(lines)
@@ -0,0 +1,200 @@
+import os
+import re
+import glob
+import html
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .build_manifest import BuildManifest
+from .file_handler import FileHandler
+from .template import ArticleTemplate
+
+logger = logging.getLogger(__name__)
+
+TITLE_PATTERN = re.compile(r"<h1[^>]*>(.*?)</h1>", re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Klasa budująca kompletne strony z wygenerowanych artykułów
+# Funkcjonalności:
+# - Jednorazowe przygotowanie szablonu dla wszystkich stron
+# - Równoległe renderowanie i atomowy zapis stron
+# - Pomijanie stron bez zmian w artykule i szablonie
+# - Generowanie strony z indeksem artykułów
+class SiteBuilder:
+    """Renderuje artykuły HTML do szablonu strony."""
+
+    MANIFEST_NAME = ".build_manifest.json"
+    INDEX_NAME = "index.html"
+
+    def __init__(self, template_file: str, output_dir: str, max_workers: Optional[int] = None):
+        """
+        Args:
+            template_file: Ścieżka do szablonu strony (szablon.html)
+            output_dir: Katalog na wygenerowane strony
+            max_workers: Liczba wątków renderujących (domyślnie zależna od liczby rdzeni)
+        """
+        self.template = ArticleTemplate(template_file)
+        self.output_dir = os.path.abspath(output_dir)
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.manifest = BuildManifest(os.path.join(self.output_dir, self.MANIFEST_NAME))
+
+    @staticmethod
+    def extract_title(content: str, default: str) -> str:
+        """Wyciąga tekst pierwszego nagłówka <h1> z artykułu."""
+        match = TITLE_PATTERN.search(content)
+        if not match:
+            return default
+        title = html.unescape(TAG_PATTERN.sub("", match.group(1))).strip()
+        return " ".join(title.split()) or default
+
+    def _build_page(self, article_path: str, template_hash: str, force: bool) -> bool:
+        """
+        Renderuje jedną stronę, jeśli artykuł lub szablon się zmieniły.
+
+        Returns:
+            bool: True jeśli strona została zapisana, False jeśli pominięta
+        """
+        name = os.path.basename(article_path)
+        output_path = os.path.join(self.output_dir, name)
+        previous = self.manifest.get(name)
+        stat = os.stat(article_path)
+
+        if not force and previous and os.path.exists(output_path):
+            # Szybka ścieżka - bez odczytu pliku, gdy metadane się nie zmieniły
+            if (previous.get("template_hash") == template_hash
+                    and previous.get("mtime_ns") == stat.st_mtime_ns
+                    and previous.get("size") == stat.st_size):
+                return False
+
+        with open(article_path, "rb") as f:
+            data = f.read()
+        article_hash = hashlib.sha256(data).hexdigest()
+        content = data.decode("utf-8")
+
+        entry = {
+            "article_hash": article_hash,
+            "template_hash": template_hash,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "title": previous.get("title") if previous else None,
+        }
+
+        if (not force and previous and os.path.exists(output_path)
+                and previous.get("article_hash") == article_hash
+                and previous.get("template_hash") == template_hash):
+            # Zmienił się tylko czas modyfikacji - zaktualizuj manifest
+            self.manifest.set(name, entry)
+            return False
+
+        entry["title"] = self.extract_title(content, os.path.splitext(name)[0])
+        FileHandler.write_atomic(output_path, self.template.render(content))
+        self.manifest.set(name, entry)
+        return True
+
+    def _try_build_page(self, article_path: str, template_hash: str, force: bool) -> Optional[bool]:
+        """
+        Renderuje stronę, nie przerywając budowy przy błędzie pojedynczego artykułu.
+
+        Returns:
+            Optional[bool]: Wynik _build_page lub None, gdy budowa strony się nie powiodła
+        """
+        try:
+            return self._build_page(article_path, template_hash, force)
+        except Exception as e:
+            logger.error(f"Błąd podczas budowania strony {article_path}: {str(e)}")
+            return None
+
+    def _build_index(self, names: List[str]) -> bool:
+        """Zapisuje stronę indeksu, jeśli jej treść się zmieniła."""
+        items = []
+        for name in names:
+            entry = self.manifest.get(name) or {}
+            title = entry.get("title") or os.path.splitext(name)[0]
+            items.append(
+                f'        <li><a href="{html.escape(name, quote=True)}">{html.escape(title)}</a></li>'
+            )
+
+        content = (
+            "<article>\n"
+            "    <h1>Artykuły</h1>\n"
+            "    <ul>\n" + "\n".join(items) + "\n    </ul>\n"
+            "</article>\n"
+        )
+        page = self.template.render(content)
+        page_hash = hashlib.sha256(page.encode("utf-8")).hexdigest()
+        index_path = os.path.join(self.output_dir, self.INDEX_NAME)
+
+        # Skrót strony przed minifikacją (--optimize zmienia zapisany plik)
+        previous = self.manifest.get(self.INDEX_NAME)
+        if previous and previous.get("page_hash") == page_hash and os.path.exists(index_path):
+            return False
+        FileHandler.write_atomic(index_path, page)
+        self.manifest.set(self.INDEX_NAME, {"page_hash": page_hash})
+        return True
+
+    def build(self, input_dir: str, pattern: str = "artykul*.html",
+              force: bool = False) -> Dict[str, int]:
+        """
+        Buduje strony dla wszystkich artykułów pasujących do wzorca.
+
+        Args:
+            input_dir: Katalog z wygenerowanymi artykułami
+            pattern: Wzorzec nazw plików artykułów
+            force: Przebuduj wszystkie strony niezależnie od manifestu
+
+        Returns:
+            Dict[str, int]: Liczba stron wyrenderowanych, pominiętych, nieudanych i usuniętych
+
+        Raises:
+            ValueError: Gdy katalog wejściowy jest katalogiem wynikowym
+        """
+        input_dir = os.path.abspath(input_dir)
+        if input_dir == self.output_dir:
+            raise ValueError("Katalog wynikowy musi być inny niż katalog z artykułami")
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        articles = sorted(glob.glob(os.path.join(input_dir, pattern)))
+        # Szablon jest wczytywany raz dla całej przebudowy
+        template_hash = self.template.digest
+
+        # Manifest jest zapisywany także po błędzie - ukończone strony nie są budowane ponownie
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(
+                    lambda path: self._try_build_page(path, template_hash, force), articles
+                ))
+
+            # Usuń strony artykułów, które zniknęły z katalogu wejściowego
+            names = [os.path.basename(path) for path in articles]
+            current = set(names)
+            removed = 0
+            for name in self.manifest.names():
+                if name not in current and name != self.INDEX_NAME:
+                    # Razem ze stroną usuń jej skompresowane kopie (OutputOptimizer)
+                    for suffix in ("", ".gz", ".br"):
+                        try:
+                            os.unlink(os.path.join(self.output_dir, name + suffix))
+                        except FileNotFoundError:
+                            pass
+                    self.manifest.remove(name)
+                    removed += 1
+
+            # Indeks nie linkuje stron, których nie udało się zbudować ani wcześniej, ani teraz
+            index_written = self._build_index([name for name in names if self.manifest.get(name)])
+        finally:
+            self.manifest.save()
+
+        stats = {
+            "rendered": results.count(True),
+            "skipped": results.count(False),
+            "failed": results.count(None),
+            "removed": removed,
+            "index": int(index_written),
+        }
+        logger.info(
+            f"Zbudowano strony w {self.output_dir}: wyrenderowano {stats['rendered']}, "
+            f"pominięto {stats['skipped']}, błędy {stats['failed']}, usunięto {stats['removed']}"
+        )
+        return stats
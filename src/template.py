@@ -0,0 +1,78 @@
+import os
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = "<!-- Tutaj zostanie wklejony artykuł -->"
+
+# Klasa reprezentująca szablon strony z artykułem
+# Funkcjonalności:
+# - Jednorazowy podział szablonu w miejscu znacznika artykułu
+# - Ponowne wczytanie tylko po zmianie czasu modyfikacji pliku
+# - Skrót treści szablonu do wykrywania zmian
+class ArticleTemplate:
+    """Szablon HTML podzielony w miejscu wstawienia artykułu."""
+
+    def __init__(self, template_file: str, placeholder: str = PLACEHOLDER):
+        """
+        Args:
+            template_file: Ścieżka do pliku szablonu
+            placeholder: Znacznik, w miejsce którego wstawiany jest artykuł
+        """
+        self.template_file = template_file
+        self.placeholder = placeholder
+        self._mtime_ns: Optional[int] = None
+        self._head = ""
+        self._tail = ""
+        self._digest = ""
+        self._lock = threading.Lock()
+
+    def _reload_if_changed(self) -> None:
+        """
+        Wczytuje szablon ponownie, jeśli plik zmienił się od ostatniego odczytu.
+
+        Raises:
+            OSError: Gdy nie można odczytać pliku szablonu
+        """
+        mtime_ns = os.stat(self.template_file).st_mtime_ns
+        if mtime_ns == self._mtime_ns:
+            return
+
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return
+            with open(self.template_file, "r", encoding="utf-8") as file:
+                template = file.read()
+
+            head, found, tail = template.partition(self.placeholder)
+            if not found:
+                logger.warning(
+                    f"Szablon {self.template_file} nie zawiera znacznika {self.placeholder} - "
+                    "artykuł zostanie dopisany na końcu"
+                )
+            self._head, self._tail = head, tail
+            self._digest = hashlib.sha256(template.encode("utf-8")).hexdigest()
+            self._mtime_ns = mtime_ns
+            logger.debug(f"Wczytano szablon {self.template_file}")
+
+    @property
+    def digest(self) -> str:
+        """Skrót SHA-256 aktualnej treści szablonu."""
+        self._reload_if_changed()
+        return self._digest
+
+    def render(self, content: str) -> str:
+        """
+        Wstawia treść artykułu do szablonu.
+
+        Args:
+            content: Kod HTML artykułu
+
+        Returns:
+            str: Kompletna strona HTML
+        """
+        self._reload_if_changed()
+        return f"{self._head}{content}{self._tail}"
@@ -0,0 +1,219 @@
+import copy
+import gzip
+import json
+import atexit
+import time
+import hashlib
+import itertools
+import logging
+import threading
+from types import SimpleNamespace
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+
+from .article_processor import APIErrorHandler
+
+logger = logging.getLogger(__name__)
+
+
+def hash_messages(messages: List[Any]) -> str:
+    """Zwraca skrót SHA-256 treści i ról wiadomości zapytania."""
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(getattr(message, "type", "").encode())
+        digest.update(b"\0")
+        digest.update(str(message.content).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def rate_limit_headers(error: Exception) -> Optional[Dict[str, str]]:
+    """Zwraca nagłówki retry-after i x-ratelimit-* odpowiedzi z błędem (nazwy małymi literami)."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    selected = {
+        name.lower(): value for name, value in headers.items()
+        if name.lower() == "retry-after" or name.lower().startswith("x-ratelimit-")
+    }
+    return selected or None
+
+
+class ReplayedAPIError(Exception):
+    """Błąd API odtworzony z zapisu ruchu."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # Jak w błędach klienta HTTP - classify_error odczytuje z nich czas oczekiwania
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+# Klasa zapisująca rzeczywisty ruch do API
+# Funkcjonalności:
+# - Opakowanie klienta modelu bez zmiany jego interfejsu
+# - Zapis skrótu promptu, modelu, odpowiedzi, zużycia tokenów, opóźnienia i błędu
+#   (z nagłówkami limitów zapytań)
+# - Wspólny plik śladu dla dużego i szybkiego modelu
+# - Zwarty format: JSON Lines skompresowany gzip
+class TrafficRecorder:
+    """Klient modelu zapisujący każde zapytanie do pliku śladu."""
+
+    def __init__(self, llm, trace_file: str, model: Optional[str] = None):
+        """
+        Args:
+            llm: Opakowywany klient modelu (z metodą invoke)
+            trace_file: Ścieżka pliku śladu (.jsonl.gz), dopisywanego przy kolejnych uruchomieniach
+            model: Nazwa modelu zapisywana w śladzie (domyślnie model_name klienta)
+        """
+        self.llm = llm
+        self.model_name = model or getattr(llm, "model_name", None)
+        self.trace_file = trace_file
+        self._file = gzip.open(trace_file, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        # Zamknięcie dopisuje stopkę gzip - bez niej ostatnie rekordy byłyby nieczytelne
+        atexit.register(self.close)
+
+    def for_model(self, llm, model: Optional[str] = None) -> "TrafficRecorder":
+        """Zwraca rejestrator kolejnego klienta modelu zapisujący do tego samego pliku śladu."""
+        recorder = copy.copy(self)
+        recorder.llm = llm
+        recorder.model_name = model or getattr(llm, "model_name", None)
+        return recorder
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def invoke(self, messages, **kwargs):
+        """Wywołuje model i zapisuje przebieg zapytania."""
+        record = {
+            "prompt_hash": hash_messages(messages),
+            "model": self.model_name,
+            "offset": round(time.monotonic() - self._started, 4),
+        }
+        start = time.monotonic()
+        try:
+            response = self.llm.invoke(messages, **kwargs)
+        except Exception as e:
+            api_error = APIErrorHandler.classify_error(e)
+            record.update({
+                "latency": round(time.monotonic() - start, 4),
+                "error_type": api_error.type.value,
+                "error": str(e),
+                "status_code": (
+                    getattr(e, "status_code", None)
+                    or getattr(getattr(e, "response", None), "status_code", None)
+                ),
+                "headers": rate_limit_headers(e),
+            })
+            self._write(record)
+            raise
+
+        metadata = getattr(response, "response_metadata", None) or {}
+        record.update({
+            "latency": round(time.monotonic() - start, 4),
+            "response": response.content,
+            "finish_reason": metadata.get("finish_reason"),
+            "usage": getattr(response, "usage_metadata", None) or metadata.get("token_usage"),
+        })
+        self._write(record)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+# Klasa odtwarzająca zapisany ruch do API
+# Funkcjonalności:
+# - Odpowiedzi i błędy (w tym 429 z nagłówkami) w zapisanej kolejności dla danego
+#   promptu i modelu
+# - Opóźnienia z zapisu, opcjonalnie przeskalowane
+# - Tryb ścisły lub odtwarzanie nieznanych promptów po kolei
+class ReplayLLM:
+    """Zastępczy klient modelu odtwarzający zapisany ślad ruchu."""
+
+    def __init__(self, trace_file: str, speed: float = 1.0, strict: bool = False):
+        """
+        Args:
+            trace_file: Ścieżka pliku śladu zapisanego przez TrafficRecorder
+            speed: Mnożnik szybkości (2.0 - dwa razy krótsze opóźnienia, 0 - bez opóźnień)
+            strict: Czy zgłaszać błąd dla promptów, których nie ma w śladzie
+        """
+        self.speed = speed
+        self.strict = strict
+        self.model_name: Optional[str] = None
+        self._by_prompt: Dict[Tuple[Optional[str], str], deque] = defaultdict(deque)
+        self._sequence: List[Dict[str, Any]] = []
+        # Licznik współdzielony z klientami z for_model
+        self._positions = itertools.count()
+        self._lock = threading.Lock()
+
+        with gzip.open(trace_file, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        key = (record.get("model"), record["prompt_hash"])
+                        self._by_prompt[key].append(record)
+                        self._sequence.append(record)
+            except (EOFError, ValueError) as e:
+                # Ślad przerwanego nagrania - użyj rekordów zapisanych w całości
+                logger.warning(f"Plik śladu {trace_file} jest niekompletny: {e}")
+
+        if not self._sequence:
+            raise ValueError(f"Plik śladu {trace_file} jest pusty")
+        logger.info(f"Wczytano {len(self._sequence)} zapisanych zapytań z {trace_file}")
+
+    def for_model(self, model: str) -> "ReplayLLM":
+        """Zwraca klienta odtwarzającego zapisy danego modelu (wspólny stan odtwarzania)."""
+        replay = copy.copy(self)
+        replay.model_name = model
+        return replay
+
+    def _next_record(self, prompt_hash: str) -> Dict[str, Any]:
+        with self._lock:
+            # Ślady sprzed zapisu nazwy modelu mają model None
+            records = (
+                self._by_prompt.get((self.model_name, prompt_hash))
+                or self._by_prompt.get((None, prompt_hash))
+            )
+            if records:
+                # Kolejne wywołania tego samego promptu odtwarzają kolejne zapisy (np. 429, potem sukces)
+                record = records[0]
+                records.rotate(-1)
+                return record
+            if self.strict:
+                raise KeyError(f"Brak zapisu dla promptu {prompt_hash[:12]}")
+            return self._sequence[next(self._positions) % len(self._sequence)]
+
+    def invoke(self, messages, **kwargs):
+        """Odtwarza zapisaną odpowiedź lub błąd z zapisanym opóźnieniem."""
+        record = self._next_record(hash_messages(messages))
+        if self.speed > 0:
+            time.sleep(record.get("latency", 0) / self.speed)
+
+        if record.get("error_type"):
+            raise ReplayedAPIError(
+                record.get("error", record["error_type"]), record.get("status_code"), record.get("headers")
+            )
+
+        usage = record.get("usage") or {}
+        response = AIMessage(
+            content=record.get("response", ""),
+            response_metadata={
+                "finish_reason": record.get("finish_reason"),
+                "token_usage": usage,
+            },
+        )
+        if {"input_tokens", "output_tokens", "total_tokens"} <= set(usage):
+            response.usage_metadata = usage
+        return response
@@ -0,0 +1,254 @@
+import os
+import sys
+import time
+import select
+import struct
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .file_handler import FileHandler
+from .validator import Validator
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+
+class InotifySource:
+    """Źródło zdarzeń oparte na inotify (tylko Linux)."""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory: str):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.directory = directory
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 nie powiodło się")
+
+        # Zapis zakończony (edytor zamknął plik) lub zapis atomowy przez rename
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+        if wd < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"Nie można obserwować katalogu {directory}")
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Sprawdza czy inotify jest dostępne w systemie."""
+        return sys.platform.startswith('linux') and ctypes is not None
+
+    def poll(self, timeout: float) -> Optional[List[str]]:
+        """
+        Czeka na zdarzenia maksymalnie `timeout` sekund.
+
+        Returns:
+            Optional[List[str]]: Ścieżki zmienionych plików lub None,
+            gdy kolejka jądra się przepełniła i trzeba przeskanować katalog
+        """
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+            if name:
+                paths.append(os.path.join(self.directory, os.fsdecode(name)))
+        return paths
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingSource:
+    """Źródło zdarzeń oparte na okresowym odczycie metadanych katalogu."""
+
+    def __init__(self, directory: str, interval: float = 1.0):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        # os.scandir zwraca wpisy jednym odczytem katalogu - stat tylko dla plików tekstowych
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if FileHandler.is_text_file(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: float) -> Optional[List[str]]:
+        time.sleep(max(min(timeout, self.interval), 0))
+        snapshot = self._scan()
+        changed = [
+            path for path, signature in snapshot.items()
+            if self._snapshot.get(path) != signature
+        ]
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+# Klasa obserwująca katalog z plikami wejściowymi
+# Funkcjonalności:
+# - Wykrywanie nowych i zmienionych plików (inotify lub odpytywanie)
+# - Debouncing serii zapisów i łączenie zdarzeń dla tego samego pliku
+# - Pomijanie zapisów, które nie zmieniły treści pliku
+# - Przekazywanie do przetworzenia wyłącznie zmienionych plików
+class DirectoryWatcher:
+    """Obserwuje katalog i przetwarza pliki tekstowe po każdej zmianie."""
+
+    def __init__(self, directory: str, handler: Callable[[str], None],
+                 debounce: float = 1.0, poll_interval: float = 1.0,
+                 max_workers: int = 3, use_inotify: Optional[bool] = None):
+        """
+        Args:
+            directory: Obserwowany katalog
+            handler: Funkcja wywoływana ze ścieżką zmienionego pliku
+            debounce: Czas ciszy (s) po ostatnim zapisie zanim plik zostanie przetworzony
+            poll_interval: Odstęp odpytywania (s) gdy inotify jest niedostępne
+            max_workers: Maksymalna liczba równolegle przetwarzanych plików
+            use_inotify: Wymuszenie (True) lub wyłączenie (False) inotify
+        """
+        self.directory = os.path.abspath(directory)
+        self.handler = handler
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers
+        self.use_inotify = InotifySource.is_available() if use_inotify is None else use_inotify
+
+        self._pending: Dict[str, float] = {}
+        self._in_progress: Set[str] = set()
+        self._content_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _create_source(self):
+        if self.use_inotify:
+            try:
+                source = InotifySource(self.directory)
+                logger.info(f"Obserwowanie katalogu {self.directory} (inotify)")
+                return source
+            except OSError as e:
+                logger.warning(f"inotify niedostępne ({e}), przełączam na odpytywanie")
+        logger.info(f"Obserwowanie katalogu {self.directory} (odpytywanie co {self.poll_interval}s)")
+        return PollingSource(self.directory, self.poll_interval)
+
+    def _file_hash(self, path: str) -> Optional[str]:
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def _queue(self, paths: Iterable[str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for path in paths:
+                if FileHandler.is_text_file(path):
+                    # Kolejne zapisy tego samego pliku przesuwają tylko termin przetworzenia
+                    self._pending[path] = now
+
+    def _take_due(self) -> List[str]:
+        """Zwraca pliki, dla których minął czas debouncingu."""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            for path, last_event in list(self._pending.items()):
+                if now - last_event >= self.debounce and path not in self._in_progress:
+                    del self._pending[path]
+                    self._in_progress.add(path)
+                    due.append(path)
+        return due
+
+    def _next_timeout(self) -> float:
+        with self._lock:
+            if not self._pending:
+                return self.poll_interval
+            earliest = min(self._pending.values())
+        return max(0.05, min(self.poll_interval, earliest + self.debounce - time.monotonic()))
+
+    def _process(self, path: str) -> None:
+        try:
+            content_hash = self._file_hash(path)
+            if content_hash is None:
+                logger.debug(f"Plik {path} zniknął przed przetworzeniem")
+                return
+            if self._content_hashes.get(path) == content_hash:
+                logger.debug(f"Treść pliku {path} nie zmieniła się - pomijam")
+                return
+
+            Validator.validate_input_file(path)
+            logger.info(f"Wykryto zmianę: {path}")
+            self.handler(path)
+            self._content_hashes[path] = content_hash
+        except Exception as e:
+            logger.error(f"Błąd podczas przetwarzania zmienionego pliku {path}: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_progress.discard(path)
+
+    def stop(self) -> None:
+        """Zatrzymuje obserwowanie katalogu."""
+        self._stop.set()
+
+    def watch(self, process_existing: bool = False) -> None:
+        """
+        Obserwuje katalog aż do wywołania `stop()` lub przerwania z klawiatury.
+
+        Args:
+            process_existing: Czy przetworzyć pliki istniejące w chwili startu
+        """
+        source = self._create_source()
+
+        existing = FileHandler.find_text_files(self.directory)
+        if process_existing:
+            self._queue(existing)
+        else:
+            # Zapamiętaj stan początkowy, aby nie przetwarzać niezmienionych plików
+            for path in existing:
+                content_hash = self._file_hash(path)
+                if content_hash:
+                    self._content_hashes[path] = content_hash
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while not self._stop.is_set():
+                    changed = source.poll(self._next_timeout())
+                    if changed is None:
+                        logger.warning("Przepełnienie kolejki zdarzeń - skanuję cały katalog")
+                        changed = FileHandler.find_text_files(self.directory)
+                    self._queue(changed)
+
+                    for path in self._take_due():
+                        executor.submit(self._process, path)
+        except KeyboardInterrupt:
+            logger.info("Zatrzymano obserwowanie katalogu")
+        finally:
+            source.close()
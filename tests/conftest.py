@@ -0,0 +1,13 @@
+import pytest
+
+from src import article_processor
+from src.cache import ResponseCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Domyślny cache ArticleProcessor w katalogu testu zamiast .cache projektu."""
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(article_processor, "ResponseCache",
+                        lambda directory=cache_dir: ResponseCache(directory))
+    return cache_dir
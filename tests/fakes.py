@@ -0,0 +1,52 @@
+import threading
+import time
+from types import SimpleNamespace
+
+
+class FakeProcessor:
+    """
+    Procesor dzielący tekst po znaku "|", bez wywołań API.
+
+    Zapisuje kolejność rozpoczęcia części (`started`); w cache są tylko
+    prompty z `cached`.
+    """
+
+    def __init__(self, limit=1, delay=0.0, block=None, cached=(), use_cache=False):
+        self.limiter = SimpleNamespace(limit=limit, max_limit=limit)
+        self.article_timeout = None
+        self.use_cache = use_cache
+        self.cache = SimpleNamespace(contains=lambda prompt: prompt in cached)
+        self.file_handler = SimpleNamespace(read_file=self.read_file)
+        self.delay = delay
+        self.block = block
+        self.started = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def read_file(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def _validate_content_size(self, text):
+        if not text:
+            raise ValueError("Pusty tekst")
+
+    def _split_large_content(self, text):
+        return text.split("|")
+
+    def record_planned_chunks(self, count):
+        pass
+
+    def build_chunk_prompt(self, chunk, index, total):
+        return chunk
+
+    def _process_chunk(self, chunk, index, total, figures, deadline):
+        with self._lock:
+            self.started.append(chunk)
+        if self.block is not None:
+            self.block.set()
+            while True:
+                deadline.check()
+                time.sleep(0.01)
+        time.sleep(self.delay)
+        return f"<p>{chunk}</p>"
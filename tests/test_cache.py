@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+from src.cache import ResponseCache
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def test_set_and_get(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    assert cache.get("prompt") is None
+    cache.set("prompt", "<article></article>", figures=[])
+    assert cache.get("prompt") == "<article></article>"
+    assert cache.get_entry(cache.key_for("prompt"))["figures"] == []
+    assert cache.contains("prompt")
+
+
+def test_processes_sharing_cache_never_see_partial_entries():
+    result = subprocess.run(
+        [sys.executable, os.path.join(BENCHMARKS_DIR, "cache_stress.py"),
+         "--processes", "8", "--keys", "4", "--payload", "32768", "--duration", "1"],
+        capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Brak uszkodzonych wpisów" in result.stdout
@@ -0,0 +1,56 @@
+from src import cache_admin
+from src.cache import ResponseCache
+from src.cache_admin import CacheAdmin
+from src.config import PROMPT
+from src.pipeline import BatchPipeline
+
+WHOLE_PROMPT = f"{PROMPT}\n\nCzęść 1/1:\n\nCały artykuł."
+PART_PROMPT = f"{PROMPT}\n\nCzęść 2/2:\n\nDruga część artykułu."
+ARTICLE = "<article><h1>Tytuł</h1><p>Treść artykułu.</p></article>"
+PART = "<article><h2>Śródtytuł</h2><p>Druga część.</p></article>"
+
+
+def test_export_import_verify_round_trip(tmp_path):
+    source = ResponseCache(str(tmp_path / "source"))
+    source.set(WHOLE_PROMPT, ARTICLE, figures=[], tier="large")
+    source.set(PART_PROMPT, PART, figures=[])
+    archive = str(tmp_path / "cache.jsonl.gz")
+    assert CacheAdmin(source).export(archive) == 2
+
+    target = ResponseCache(str(tmp_path / "target"))
+    admin = CacheAdmin(target)
+    assert admin.import_archive(archive) == {"imported": 2, "skipped": 0, "invalid": 0}
+    assert target.get(WHOLE_PROMPT) == ARTICLE
+    assert target.get_entry(target.key_for(WHOLE_PROMPT))["tier"] == "large"
+
+    result = admin.verify()
+    assert result["checked"] == 2
+    assert result["problems"] == {}
+    # Ponowny import nie nadpisuje wpisów o tym samym znaczniku czasu
+    assert admin.import_archive(archive)["skipped"] == 2
+
+
+def test_verify_rejects_invalid_html(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    cache.set(WHOLE_PROMPT, "<article><p>Bez nagłówka</p></article>")
+    cache.set(PART_PROMPT, "<article><p>Niezamknięty akapit</article>")
+
+    admin = CacheAdmin(cache)
+    result = admin.verify(remove=True)
+    assert set(result["problems"]) == {cache.key_for(WHOLE_PROMPT), cache.key_for(PART_PROMPT)}
+    assert all(problem.startswith("niepoprawny HTML") for problem in result["problems"].values())
+    assert result["removed"] == 2
+    assert admin.verify()["checked"] == 0
+
+
+def test_warm_moves_processor_state_to_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEAR_DUPLICATE_THRESHOLD", "0.8")
+    monkeypatch.setattr(BatchPipeline, "warm", lambda self, paths: self.processor)
+    cache_dir = tmp_path / "warm"
+
+    processor = cache_admin.warm([], cache_dir=str(cache_dir))
+    assert processor.cache.cache_dir == cache_dir
+    assert processor.chunk_tuner.path.parent == cache_dir
+    assert processor.near_duplicates.cache is processor.cache
+    assert processor.near_duplicates.index_path.startswith(str(cache_dir))
+    assert processor.near_duplicates.threshold == 0.8
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.article_processor import ArticleProcessor
+from src.concurrency import AdaptiveConcurrencyLimiter
+from src.chunk_tuner import (
+    CHUNK_TOKENS_STEP, MIN_CHUNK_TOKENS, MIN_SAMPLES, fit_latency, optimal_chunk_tokens
+)
+
+
+def stats_for(points):
+    return {
+        "n": len(points),
+        "sum_x": sum(x for x, _ in points),
+        "sum_y": sum(y for _, y in points),
+        "sum_xx": sum(x * x for x, _ in points),
+        "sum_xy": sum(x * y for x, y in points),
+    }
+
+
+def test_fit_latency_recovers_line():
+    points = [(x, 2.0 + 0.01 * x) for x in range(100, 600, 100)]
+    base_latency, seconds_per_token = fit_latency(stats_for(points))
+    assert base_latency == pytest.approx(2.0)
+    assert seconds_per_token == pytest.approx(0.01)
+
+
+def test_fit_latency_needs_enough_samples():
+    points = [(x, 2.0 + 0.01 * x) for x in range(100, 100 * MIN_SAMPLES, 100)]
+    assert fit_latency(stats_for(points)) is None
+    assert fit_latency({}) is None
+
+
+def test_fit_latency_rejects_meaningless_fit():
+    # Dłuższe odpowiedzi szybsze niż krótkie
+    assert fit_latency(stats_for([(x, 10.0 - 0.01 * x) for x in range(100, 600, 100)])) is None
+    # Wszystkie odpowiedzi tej samej długości - nachylenia nie da się wyznaczyć
+    assert fit_latency(stats_for([(300, 1.0 + i) for i in range(MIN_SAMPLES)])) is None
+
+
+def test_fit_latency_clamps_negative_overhead():
+    points = [(x, 0.01 * x - 0.5) for x in range(100, 600, 100)]
+    assert fit_latency(stats_for(points)) == (0.0, pytest.approx(0.01))
+
+
+def test_short_article_is_not_split():
+    assert optimal_chunk_tokens(MIN_CHUNK_TOKENS, 1.0, 0.01, 1.0, 8, 8000) == 8000
+
+
+def test_parallel_requests_favour_smaller_chunks():
+    chunk_tokens = optimal_chunk_tokens(20000, 1.0, 0.01, 1.0, 8, 8000)
+    assert chunk_tokens == 2500
+    assert chunk_tokens % CHUNK_TOKENS_STEP == 0
+
+
+def test_no_extra_split_without_parallelism():
+    assert optimal_chunk_tokens(20000, 1.0, 0.01, 1.0, 1, 8000) == 8000
+
+
+def test_request_limit_prevents_extra_split():
+    assert optimal_chunk_tokens(20000, 1.0, 0.01, 1.0, 8, 8000, requests_per_minute=1) == 8000
+
+
+def test_chunk_size_stays_within_bounds():
+    for total_tokens in (1600, 5000, 50000, 200000):
+        chunk_tokens = optimal_chunk_tokens(total_tokens, 0.0, 0.01, 1.0, 64, 8000)
+        assert MIN_CHUNK_TOKENS <= chunk_tokens <= 8000
+
+
+def test_chunk_policy_uses_stable_concurrency_limit(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    processor = ArticleProcessor(llm=SimpleNamespace())
+    processor.autotune_chunks = True
+    # Bieżący limit zmienia się w trakcie wsadu - rozmiar części zależy tylko od górnego
+    processor.limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=6)
+    assert processor.chunk_policy()["concurrency"] == 6
@@ -0,0 +1,109 @@
+import pytest
+
+from src import concurrency
+from src.concurrency import AdaptiveConcurrencyLimiter
+from src.metrics import Metrics
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(concurrency.time, "monotonic", clock)
+    return clock
+
+
+def make_limiter(**kwargs):
+    return AdaptiveConcurrencyLimiter(metrics=Metrics(), **kwargs)
+
+
+def test_additive_increase_after_full_round_of_successes(clock):
+    limiter = make_limiter(initial_limit=2, max_limit=4)
+    limiter.record_success(1.0)
+    assert limiter.limit == 2
+    limiter.record_success(1.0)
+    assert limiter.limit == 3
+    # Kolejne zwiększenie dopiero po rundzie równej nowemu limitowi
+    limiter.record_success(1.0)
+    limiter.record_success(1.0)
+    assert limiter.limit == 3
+    limiter.record_success(1.0)
+    assert limiter.limit == 4
+
+
+def test_slow_responses_do_not_increase_limit(clock):
+    limiter = make_limiter(initial_limit=1, max_limit=4)
+    limiter.record_success(1.0)
+    assert limiter.limit == 2
+    for _ in range(4):
+        limiter.record_success(5.0)
+    assert limiter.limit == 2
+
+
+@pytest.mark.parametrize("error_type", ["rate_limit", "timeout", "server_error"])
+def test_multiplicative_decrease_on_congestion(clock, error_type):
+    limiter = make_limiter(initial_limit=8)
+    limiter.record_failure(error_type, latency=1.0)
+    assert limiter.limit == 4
+    # Błędy tej samej fali zapytań zmniejszają limit tylko raz
+    limiter.record_failure(error_type, latency=1.0)
+    assert limiter.limit == 4
+    clock.now += 1.0
+    limiter.record_failure(error_type, latency=1.0)
+    assert limiter.limit == 2
+
+
+def test_other_errors_do_not_decrease_limit(clock):
+    limiter = make_limiter(initial_limit=8)
+    limiter.record_failure("auth_error")
+    limiter.record_failure("invalid_request")
+    assert limiter.limit == 8
+
+
+def test_limit_stays_within_bounds(clock):
+    assert make_limiter(initial_limit=50, max_limit=6).limit == 6
+    assert make_limiter(initial_limit=0, min_limit=2).limit == 2
+
+    limiter = make_limiter(initial_limit=3, min_limit=2, max_limit=4)
+    for _ in range(3):
+        clock.now += 10.0
+        limiter.record_failure("rate_limit", latency=1.0)
+    assert limiter.limit == 2
+    # Limit rośnie dopiero, gdy błędy wypadną z okna ostatnich zapytań
+    for _ in range(40):
+        limiter.record_success(1.0)
+    assert limiter.limit == 4
+
+    with pytest.raises(ValueError):
+        make_limiter(min_limit=5, max_limit=4)
+
+
+def test_gauges_track_limit_and_requests_in_flight(clock):
+    limiter = make_limiter(initial_limit=2)
+    metrics = limiter.metrics
+    assert metrics.gauge("concurrency_limit") == 2
+    assert metrics.gauge("requests_in_flight") == 0
+
+    assert limiter.acquire(timeout=0)
+    assert limiter.acquire(timeout=0)
+    assert not limiter.acquire(timeout=0)
+    assert metrics.gauge("requests_in_flight") == 2
+
+    limiter.record_failure("rate_limit", latency=1.0)
+    assert metrics.gauge("concurrency_limit") == 1
+    limiter.release()
+    # Limit 1 i jedno zapytanie w toku - brak miejsca
+    assert not limiter.acquire(timeout=0)
+    limiter.release()
+    assert metrics.gauge("requests_in_flight") == 0
+
+    with limiter.slot():
+        assert metrics.gauge("requests_in_flight") == 1
+    assert metrics.gauge("requests_in_flight") == 0
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.article_processor import (
+    CONTINUATION_TAIL_CHARS, ArticleProcessor, continuation_tail, stitch_continuation
+)
+
+
+def response(content, finish_reason="stop"):
+    return SimpleNamespace(content=content, response_metadata={"finish_reason": finish_reason})
+
+
+class ScriptedLLM:
+    """Model zwracający kolejne odpowiedzi i zapisujący otrzymane wiadomości."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def invoke(self, messages, **kwargs):
+        self.calls.append(messages)
+        return self.responses.pop(0)
+
+
+def test_stitch_removes_repeated_fragment():
+    partial = "<article><h1>Tytuł</h1><p>Pierwszy akapit"
+    continuation = "<p>Pierwszy akapit tekstu.</p></article>"
+    assert stitch_continuation(partial, continuation) == (
+        "<article><h1>Tytuł</h1><p>Pierwszy akapit tekstu.</p></article>"
+    )
+
+
+def test_stitch_ignores_leading_whitespace_of_continuation():
+    partial = "<article><p>Akapit numer jeden</p>\n"
+    continuation = "\n  <p>Akapit numer jeden</p><p>Dwa</p></article>"
+    assert stitch_continuation(partial, continuation) == (
+        "<article><p>Akapit numer jeden</p><p>Dwa</p></article>"
+    )
+
+
+def test_stitch_keeps_short_overlap():
+    # Powtórzenie krótsze niż MIN_STITCH_OVERLAP może być przypadkowe
+    assert stitch_continuation("<p>Ala", "<p>Ala</p>") == "<p>Ala<p>Ala</p>"
+
+
+def test_stitch_without_overlap_appends():
+    assert stitch_continuation("<article><p>Początek", " i koniec.</p></article>") == (
+        "<article><p>Początek i koniec.</p></article>"
+    )
+
+
+def test_stitch_restarted_article_replaces_partial():
+    restarted = "<article><h1>Nowy</h1></article>"
+    assert stitch_continuation("<article><h1>Stary", restarted) == restarted
+
+
+def test_is_truncated():
+    assert ArticleProcessor._is_truncated("<article><p>Tekst", None)
+    assert ArticleProcessor._is_truncated("Tekst", "length")
+    assert not ArticleProcessor._is_truncated("<article><p>Tekst</p></article>", "length")
+    assert not ArticleProcessor._is_truncated("Tekst bez artykułu", "stop")
+
+
+def test_continuation_tail_starts_at_tag():
+    partial = "<article>" + "<p>Akapit tekstu.</p>" * 500
+    tail = continuation_tail(partial)
+    assert len(tail) <= CONTINUATION_TAIL_CHARS
+    assert tail.startswith("<")
+    assert partial.endswith(tail)
+    assert continuation_tail("<article><p>Krótki") == "<article><p>Krótki"
+
+
+def test_continuation_request_is_bounded(tmp_path, isolated_cache):
+    partial = "<article>" + "<p>Akapit tekstu.</p>" * 1000
+    llm = ScriptedLLM(response("<p>Koniec.</p></article>"))
+    processor = ArticleProcessor(llm=llm)
+    processor.use_cache = False
+    assert str(processor.cache.cache_dir) == isolated_cache
+    messages = [HumanMessage(content="Prompt z tekstem części")]
+
+    content = processor._complete_truncated(messages, response(partial, "length"), llm=llm)
+
+    assert content == partial + "<p>Koniec.</p></article>"
+    sent = llm.calls[0]
+    assert sent[0] is messages[0]
+    assert isinstance(sent[1], AIMessage)
+    assert len(sent[1].content) <= CONTINUATION_TAIL_CHARS
+    assert sum(len(message.content) for message in sent) < len(partial)
@@ -0,0 +1,121 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import groq
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.article_processor import ArticleProcessor
+from src.cache import ResponseCache
+from src.deadline import Cancelled, Deadline, DeadlineExceeded
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+class AuthError(Exception):
+    def __init__(self):
+        super().__init__("Invalid API key")
+        self.status_code = 401
+
+
+class ChunkLLM:
+    """Model, który dla części "zła" zgłasza trwały błąd, a dla pozostałych przekroczenie czasu."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def invoke(self, messages, timeout=None, **kwargs):
+        self.calls.append(timeout)
+        time.sleep(self.delay)
+        if "zła" in messages[0].content:
+            raise AuthError()
+        raise groq.APITimeoutError(request=REQUEST)
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    processor = ArticleProcessor(llm=ChunkLLM())
+    processor.cache = ResponseCache(str(tmp_path / "cache"))
+    processor.use_cache = False
+    processor.request_timeout = 30.0
+    return processor
+
+
+def test_remaining_and_child_bounded_by_parent():
+    assert Deadline().remaining() is None
+    assert Deadline().timeout_for(5.0) == 5.0
+
+    parent = Deadline(10.0)
+    child = parent.child(60.0)
+    assert child.expires_at == parent.expires_at
+    assert child.remaining() <= 10.0
+    assert child.timeout_for(30.0) <= 10.0
+    assert parent.child(1.0).expires_at < parent.expires_at
+
+
+def test_expired_deadline_check_and_sleep():
+    deadline = Deadline(0.05)
+    with pytest.raises(DeadlineExceeded):
+        deadline.sleep(1.0)
+    time.sleep(0.06)
+    assert deadline.expired
+    assert deadline.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+
+def test_sleep_interrupted_by_cancellation():
+    deadline = Deadline()
+    threading.Timer(0.05, deadline.cancel, args=("błąd innej części",)).start()
+    start = time.monotonic()
+    with pytest.raises(Cancelled, match="błąd innej części"):
+        deadline.sleep(5.0)
+    assert time.monotonic() - start < 1.0
+
+
+def test_cancellation_reaches_existing_and_new_children():
+    parent = Deadline()
+    child = parent.child()
+    grandchild = child.child()
+    parent.cancel("koniec")
+    assert child.cancelled and grandchild.cancelled
+    assert grandchild.reason == "koniec"
+    assert parent.child().cancelled
+
+
+def test_failed_chunk_cancels_sibling_chunks(processor, monkeypatch):
+    monkeypatch.setattr(processor, "_split_large_content", lambda text: ["Część dobra.", "Część zła."])
+    start = time.monotonic()
+    with pytest.raises(ValueError, match="auth_error"):
+        processor.process_text("Część dobra. Część zła.")
+    # Ponowienie dobrej części (co najmniej 5 s) przerwane anulowaniem artykułu
+    assert time.monotonic() - start < 3.0
+    assert len(processor.llm.calls) == 2
+
+
+def test_timeout_shortened_by_deadline_is_not_a_provider_failure(processor):
+    processor.llm.delay = 0.05
+    limit = processor.limiter.limit
+    with pytest.raises(DeadlineExceeded):
+        processor._invoke_llm([HumanMessage(content="tekst")], Deadline(0.05))
+
+    assert processor.llm.calls[0] < processor.request_timeout
+    assert processor.metrics.counter("deadline_timeouts") == 1
+    assert processor.metrics.counter("api_errors_timeout") == 0
+    assert processor.limiter.limit == limit
+    assert processor.circuit_breaker._failures == 0
+
+
+def test_provider_timeout_is_recorded(processor):
+    limit = processor.limiter.limit
+    with pytest.raises(groq.APITimeoutError):
+        processor._invoke_llm([HumanMessage(content="tekst")], Deadline(60.0))
+
+    assert processor.llm.calls == [processor.request_timeout]
+    assert processor.metrics.counter("api_errors_timeout") == 1
+    assert processor.limiter.limit < limit
+    assert processor.circuit_breaker._failures == 1
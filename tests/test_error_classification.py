@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import groq
+import httpx
+import pytest
+
+from src.article_processor import APIErrorHandler, APIErrorType
+from src.resilience import CircuitOpenError
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+class HTTPError(Exception):
+    """Błąd klienta ze statusem HTTP i nagłówkami odpowiedzi."""
+
+    def __init__(self, message, status_code, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def classify(error):
+    return APIErrorHandler.classify_error(error)
+
+
+def test_client_exception_type_wins_over_message():
+    error = classify(groq.APITimeoutError(request=REQUEST))
+    assert error.type == APIErrorType.TIMEOUT
+    assert error.retryable
+
+    error = classify(groq.APIConnectionError(message="rate limit", request=REQUEST))
+    assert error.type == APIErrorType.CONNECTION_ERROR
+
+
+def test_status_wins_over_message():
+    assert classify(HTTPError("rate limit proxy error", 502)).type == APIErrorType.SERVER_ERROR
+    assert classify(HTTPError("timeout while authenticating", 401)).type == APIErrorType.AUTH_ERROR
+    assert classify(HTTPError("Too many requests", 400)).type == APIErrorType.INVALID_REQUEST
+
+
+def test_message_is_used_without_type_and_status():
+    assert classify(Exception("Rate limit reached")).type == APIErrorType.RATE_LIMIT
+    assert classify(Exception("maximum context length is 8192")).type == APIErrorType.CONTEXT_LENGTH
+    assert classify(Exception("coś zupełnie innego")).type == APIErrorType.UNKNOWN
+
+
+def test_circuit_open_is_not_retried():
+    error = classify(CircuitOpenError("API niedostępne"))
+    assert error.type == APIErrorType.CIRCUIT_OPEN
+    assert not error.retryable
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Request too large for model llama3-70b-8192 on tokens per minute (TPM): Limit 6000, "
+     "Requested 9000, please reduce your message size and try again.", APIErrorType.RATE_LIMIT),
+    ("rate_limit_exceeded", APIErrorType.RATE_LIMIT),
+    ("Request Entity Too Large", APIErrorType.CONTEXT_LENGTH),
+])
+def test_413_throughput_limit_is_retryable(message, expected):
+    error = classify(HTTPError(message, 413))
+    assert error.type == expected
+    assert error.retryable == (expected == APIErrorType.RATE_LIMIT)
+
+
+def test_zero_retry_after_is_kept():
+    assert classify(HTTPError("Too Many Requests", 429, {"retry-after": "0"})).retry_after == 0.0
+    assert classify(Exception("Rate limit reached. Please try again in 0s")).retry_after == 0.0
+
+
+def test_retry_after_sources_in_order():
+    headers = {"retry-after": "3", "x-ratelimit-reset-tokens": "7.5s"}
+    assert classify(HTTPError("try again in 20s", 429, headers)).retry_after == 3.0
+    headers = {"x-ratelimit-reset-requests": "1m2s", "x-ratelimit-reset-tokens": "450ms"}
+    assert classify(HTTPError("try again in 20s", 429, headers)).retry_after == 62.0
+    assert classify(HTTPError("Please try again in 450ms", 429)).retry_after == pytest.approx(0.45)
+    assert classify(HTTPError("Too Many Requests", 429)).retry_after == APIErrorHandler.DEFAULT_RATE_LIMIT_DELAY
@@ -0,0 +1,35 @@
+from src.html_validator import IMAGE_PROMPT_FIELDS, parse_image_prompt
+
+FULL_PROMPT = """[PROMPT DO AI:
+  Styl: fotografia reportażowa
+  Scena: programista przy biurku z dwoma monitorami
+  Kontekst: nowoczesne biuro typu open space
+  Nastrój: skupienie, spokój
+  Kolory: chłodne błękity i szarości
+  Kompozycja: plan średni, perspektywa zza ramienia
+  Szczegóły: kod na ekranie, kubek kawy
+  Format: 16:9]"""
+
+
+def test_parses_all_prompt_fields_separately():
+    fields = parse_image_prompt(FULL_PROMPT)
+
+    assert fields["styl"] == "fotografia reportażowa"
+    assert fields["scena"] == "programista przy biurku z dwoma monitorami"
+    assert fields["kontekst"] == "nowoczesne biuro typu open space"
+    assert fields["nastrój"] == "skupienie, spokój"
+    assert fields["kolory"] == "chłodne błękity i szarości"
+    assert fields["kompozycja"] == "plan średni, perspektywa zza ramienia"
+    assert fields["szczegóły"] == "kod na ekranie, kubek kawy"
+    assert fields["format"] == "16:9"
+    assert list(fields) == [name.lower() for name in IMAGE_PROMPT_FIELDS]
+
+
+def test_prompt_without_fields_is_kept_as_description():
+    assert parse_image_prompt("[PROMPT DO AI: zachód słońca nad morzem]") == {
+        "opis": "zachód słońca nad morzem"
+    }
+
+
+def test_alt_without_prompt():
+    assert parse_image_prompt("Zwykły opis grafiki") is None
@@ -0,0 +1,29 @@
+from src.output_optimizer import minify_html
+
+
+def test_collapses_text_whitespace_between_words():
+    html = "<p>Tekst\n   z    odstępami <b>pogrubiony</b>  dalej</p>"
+    assert minify_html(html) == "<p>Tekst z odstępami <b>pogrubiony</b> dalej</p>"
+
+
+def test_removes_whitespace_around_block_tags():
+    html = "<article>\n  <h1>Tytuł</h1>\n  <div class=\"a\">  x  </div>\n</article>\n"
+    assert minify_html(html) == '<article><h1>Tytuł</h1><div class="a">x</div></article>'
+
+
+def test_keeps_whitespace_in_attribute_values():
+    html = (
+        '<figure>\n  <img\n    src="image_placeholder.jpg"\n'
+        '    alt="[PROMPT DO AI: Styl:  zdjęcie.\nScena: biuro > okno]">\n'
+        "  <div title='a  >  b'>  x  </div>\n</figure>"
+    )
+    assert minify_html(html) == (
+        '<figure><img src="image_placeholder.jpg" '
+        'alt="[PROMPT DO AI: Styl:  zdjęcie.\nScena: biuro > okno]">'
+        "<div title='a  >  b'>x</div></figure>"
+    )
+
+
+def test_keeps_preformatted_blocks_and_conditional_comments():
+    html = "<div>\n<pre>  bez\n   zmian </pre><!-- komentarz --><!--[if IE]>  ie  <![endif]-->\n</div>"
+    assert minify_html(html) == "<div><pre>  bez\n   zmian </pre><!--[if IE]>  ie  <![endif]--></div>"
@@ -0,0 +1,66 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.article_processor import ArticleProcessor
+from src.cache import ResponseCache
+from src.pipeline import BatchPipeline
+
+# Trzy akapity po ok. 5000 tokenów - trzy części przy MAX_CHUNK_TOKENS = 6000
+LONG_TEXT = "\n\n".join(f"Akapit {i}. " + "Zdanie artykułu o rynku pracy. " * 650 for i in range(3))
+
+
+class BarrierLLM:
+    """Model odpowiadający dopiero, gdy wszystkie części artykułu czekają naraz."""
+
+    def __init__(self, parties, fail_on=None):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.fail_on = fail_on
+
+    def invoke(self, messages, **kwargs):
+        self.barrier.wait()
+        if self.fail_on and self.fail_on in messages[0].content:
+            error = Exception("Invalid API key")
+            error.status_code = 401
+            raise error
+        return SimpleNamespace(
+            content="<article><h1>Tytuł</h1><p>Treść.</p></article>",
+            response_metadata={"finish_reason": "stop"},
+        )
+
+
+@pytest.fixture
+def make_pipeline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def make_pipeline(llm):
+        processor = ArticleProcessor(llm=llm)
+        processor.cache = ResponseCache(str(tmp_path / "cache"))
+        processor.use_cache = True
+        return BatchPipeline(processor, cpu_workers=1)
+    return make_pipeline
+
+
+def write_article(tmp_path, text=LONG_TEXT):
+    path = tmp_path / "artykul.txt"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_missing_chunks_of_one_article_are_fetched_in_parallel(tmp_path, make_pipeline):
+    pipeline = make_pipeline(BarrierLLM(3))
+    result = pipeline.warm([write_article(tmp_path)])
+
+    assert result == {"chunks": 3, "cached": 0, "fetched": 3, "errors": {}}
+    # Drugie przejście - wszystko w cache, bez zapytań do API
+    assert pipeline.warm([write_article(tmp_path)])["cached"] == 3
+
+
+def test_failed_chunk_fails_the_article(tmp_path, make_pipeline):
+    path = write_article(tmp_path)
+    pipeline = make_pipeline(BarrierLLM(3, fail_on="Akapit 1."))
+    result = pipeline.run([path], output_dir=str(tmp_path / "wyniki"))
+
+    assert result["outputs"] == []
+    assert "auth_error" in result["errors"][path]
@@ -0,0 +1,55 @@
+import pytest
+
+from src.config import PLAN_BASE_LATENCY
+from src.planner import BatchPlanner
+from tests.fakes import FakeProcessor
+
+
+def write_files(tmp_path, texts):
+    paths = []
+    for i, text in enumerate(texts):
+        path = tmp_path / f"plik_{i}.txt"
+        path.write_text(text, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_files_share_concurrency_limit(tmp_path):
+    paths = write_files(tmp_path, ["Tekst krótkiego artykułu"] * 8)
+    planner = BatchPlanner(FakeProcessor(), concurrency=4)
+    plan = planner.plan(paths)
+
+    file_time = plan["files"][0]["wall_time"]
+    # Osiem jednoczęściowych plików przy czterech równoległych zapytaniach - dwie fale
+    assert plan["summary"]["projected_wall_time"] == pytest.approx(2 * file_time)
+    assert plan["summary"]["bottleneck"] == "latency"
+
+
+def test_batch_is_not_shorter_than_longest_article(tmp_path):
+    long_article = "|".join(["Akapit " * 400] * 3)
+    paths = write_files(tmp_path, [long_article, "Krótki tekst", "Krótki tekst"])
+    plan = BatchPlanner(FakeProcessor(), concurrency=16).plan(paths)
+
+    longest = max(file_plan["wall_time"] for file_plan in plan["files"])
+    assert plan["summary"]["projected_wall_time"] == pytest.approx(longest)
+    assert longest > PLAN_BASE_LATENCY
+
+
+def test_invalid_files_are_reported(tmp_path):
+    paths = write_files(tmp_path, ["Tekst"]) + [str(tmp_path / "brak.txt")]
+    plan = BatchPlanner(FakeProcessor(), concurrency=2).plan(paths)
+
+    assert plan["summary"]["invalid_files"] == 1
+    assert plan["files"][1]["error"]
+
+
+@pytest.mark.parametrize("use_cache, cached_chunks", [(True, 2), (False, 0)])
+def test_cached_chunks_are_free_only_with_cache_enabled(tmp_path, use_cache, cached_chunks):
+    paths = write_files(tmp_path, ["Pierwsza|Druga|Trzecia"])
+    planner = BatchPlanner(FakeProcessor(cached={"Pierwsza", "Trzecia"}, use_cache=use_cache), concurrency=4)
+
+    file_plan = planner.plan_file(paths[0])
+    assert file_plan.chunks == 3
+    assert file_plan.cached_chunks == cached_chunks
+    assert len(file_plan.chunk_latencies) == 3 - cached_chunks
+    assert planner.plan(paths)["summary"]["cached_chunks"] == cached_chunks
@@ -0,0 +1,29 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.preview_server import PreviewServer
+
+
+@pytest.fixture
+def server():
+    server = PreviewServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_page_contains_live_reload_script(server):
+    server.update("<html><body><p>Treść</p></body></html>")
+    with urllib.request.urlopen(server.url, timeout=5) as response:
+        page = response.read().decode("utf-8")
+    assert page.startswith("<html><body><p>Treść</p><script>")
+    assert '/events?v=1"' in page
+
+
+@pytest.mark.parametrize("version", ["abc", "1.5"])
+def test_events_reject_invalid_version(server, version):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f"{server.url}events?v={version}", timeout=5)
+    assert error.value.code == 400
@@ -0,0 +1,61 @@
+import tracemalloc
+
+import pytest
+
+from src import profiler as profiler_module
+from src.profiler import StageProfiler
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def memory_profiler():
+    was_tracing = tracemalloc.is_tracing()
+    stage_profiler = StageProfiler()
+    stage_profiler.enable(trace_memory=True)
+    yield stage_profiler
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def allocate(size):
+    data = bytearray(size)
+    del data
+
+
+def test_small_stage_after_big_stage_has_own_peak(memory_profiler):
+    with memory_profiler.stage("duzy"):
+        allocate(20 * MB)
+    with memory_profiler.stage("maly"):
+        allocate(MB // 10)
+
+    stages = memory_profiler.report()["stages"]
+    assert stages["duzy"]["peak_memory"] >= 20 * MB
+    assert stages["maly"]["peak_memory"] < MB
+
+
+def test_parent_stage_keeps_peak_of_children(memory_profiler):
+    with memory_profiler.stage("zewnetrzny"):
+        with memory_profiler.stage("duzy"):
+            allocate(20 * MB)
+        with memory_profiler.stage("maly"):
+            allocate(MB // 10)
+
+    stages = memory_profiler.report()["stages"]
+    assert stages["zewnetrzny"]["peak_memory"] >= 20 * MB
+    assert stages["maly"]["peak_memory"] < MB
+
+
+def test_stage_is_recorded_when_cprofile_is_unavailable(monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiler_module.cProfile, "Profile", BusyProfile)
+    stage_profiler = StageProfiler()
+    stage_profiler.enable(use_cprofile=True)
+    with stage_profiler.stage("etap"):
+        pass
+
+    assert stage_profiler.report()["stages"]["etap"]["calls"] == 1
+    assert stage_profiler._cprofile_stats is None
@@ -0,0 +1,102 @@
+import pytest
+
+from src import resilience
+from src.metrics import Metrics
+from src.resilience import CircuitBreaker, CircuitOpenError, RetryBudget
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def test_retry_budget_exhaustion_and_refill(clock):
+    metrics = Metrics()
+    budget = RetryBudget(ratio=0.5, min_retries=2, window=60.0, metrics=metrics)
+
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    # Udane zapytania powiększają budżet o `ratio` ponowienia każde
+    budget.record_success()
+    budget.record_success()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    # Po upływie okna stare ponowienia i sukcesy wygasają
+    clock.now += 61
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    assert metrics.counter("retries") == 5
+    assert metrics.counter("retry_budget_exhausted") == 3
+
+
+def test_circuit_opens_after_consecutive_outage_errors(clock):
+    metrics = Metrics()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0, metrics=metrics)
+
+    breaker.record_failure("timeout")
+    breaker.record_failure("server_error")
+    # Błąd zapytania oznacza, że dostawca odpowiada - seria się zeruje
+    breaker.record_failure("invalid_request")
+    breaker.record_failure("connection_error")
+    breaker.record_failure("timeout")
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+    breaker.record_failure("timeout")
+    assert breaker.state == CircuitBreaker.OPEN
+    assert metrics.gauge("circuit_open") == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert metrics.counter("circuit_rejections") == 1
+
+
+def test_circuit_half_open_probe_reopens_or_closes(clock):
+    metrics = Metrics()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0, metrics=metrics)
+    breaker.record_failure("timeout")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 30
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Tylko jedno zapytanie próbne naraz
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    # Nieudana próba - obwód znowu otwarty na pełny czas
+    breaker.record_failure("server_error")
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    clock.now += 1
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert metrics.gauge("circuit_open") == 0
+    assert metrics.counter("circuit_opened") == 2
+    breaker.before_request()
+
+
+def test_disabled_circuit_never_opens(clock):
+    breaker = CircuitBreaker(failure_threshold=0)
+    for _ in range(10):
+        breaker.record_failure("timeout")
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from src.deadline import Cancelled, Deadline
+from src.scheduler import ChunkScheduler, Job, parse_priorities, priority_for
+from tests.fakes import FakeProcessor
+
+
+def run_jobs(policy, jobs, **kwargs):
+    processor = FakeProcessor(**kwargs)
+    results = list(ChunkScheduler(processor, policy=policy).run(jobs))
+    return processor, results
+
+
+def test_lpt_starts_largest_article_first():
+    jobs = [("a", "x" * 10), ("b", "y" * 30 + "|" + "y" * 5), ("c", "z" * 20)]
+    processor, results = run_jobs("lpt", jobs)
+    assert processor.started == ["y" * 30, "y" * 5, "z" * 20, "x" * 10]
+    assert {job_id for job_id, _, _ in results} == {"a", "b", "c"}
+
+
+def test_sjf_starts_shortest_article_first():
+    jobs = [("a", "x" * 10), ("b", "y" * 30 + "|" + "y" * 5), ("c", "z" * 20)]
+    processor, results = run_jobs("sjf", jobs)
+    assert processor.started == ["x" * 10, "z" * 20, "y" * 30, "y" * 5]
+    assert [job_id for job_id, _, _ in results] == ["a", "c", "b"]
+
+
+def test_fifo_keeps_submission_order():
+    jobs = [("a", "x" * 10), ("b", "y" * 30 + "|" + "y" * 5), ("c", "z" * 20)]
+    processor, results = run_jobs("fifo", jobs)
+    assert processor.started == ["x" * 10, "y" * 30, "y" * 5, "z" * 20]
+    assert results[1] == ("b", f"<p>{'y' * 30}</p>\n<p>{'y' * 5}</p>", None)
+
+
+@pytest.mark.parametrize("policy", ["lpt", "sjf", "fifo"])
+def test_priority_overrides_policy(policy):
+    jobs = [Job("a", "x" * 10), Job("b", "y" * 30), Job("c", "z" * 20, priority=5)]
+    processor, _ = run_jobs(policy, jobs)
+    assert processor.started[0] == "z" * 20
+
+
+def test_plan_error_is_reported_without_stopping_batch():
+    processor, results = run_jobs("fifo", [("a", ""), ("b", "tekst")])
+    assert isinstance(results[0][1], ValueError)
+    assert results[1] == ("b", "<p>tekst</p>", None)
+
+
+def test_cancelled_batch_reports_unfinished_articles():
+    block = threading.Event()
+    processor = FakeProcessor(block=block)
+    deadline = Deadline()
+    jobs = [("a", "x" * 10), ("b", "y" * 20), ("c", "z" * 30)]
+    results = []
+
+    def consume():
+        results.extend(ChunkScheduler(processor, policy="fifo").run(jobs, deadline))
+
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    assert block.wait(timeout=5)
+    deadline.cancel("Test")
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert sorted(job_id for job_id, _, _ in results) == ["a", "b", "c"]
+    assert all(isinstance(result, Cancelled) for _, result, _ in results)
+    assert processor.started == ["x" * 10]
+
+
+def test_parse_priorities():
+    priorities = parse_priorities(["pilne*.txt=10", "a=b=-1"])
+    assert priorities == [("pilne*.txt", 10), ("a=b", -1)]
+    assert priority_for("dane/pilne_1.txt", priorities) == 10
+    assert priority_for("inne.txt", priorities) == 0
+    with pytest.raises(ValueError):
+        parse_priorities(["bez_priorytetu"])
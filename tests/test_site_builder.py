@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+from src.output_optimizer import OutputOptimizer
+from src.site_builder import SiteBuilder
+from src.template import PLACEHOLDER
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def make_site(tmp_path):
+    template = tmp_path / "szablon.html"
+    template.write_text(f"<html><body>{PLACEHOLDER}</body></html>", encoding="utf-8")
+    articles = tmp_path / "wyniki"
+    articles.mkdir()
+    return SiteBuilder(str(template), str(tmp_path / "strona"), max_workers=2), articles
+
+
+def test_failed_page_does_not_stop_build(tmp_path):
+    builder, articles = make_site(tmp_path)
+    write(articles / "artykul.html", "<article><h1>Dobry</h1></article>".encode("utf-8"))
+    # Nieprawidłowe UTF-8 - odczyt strony kończy się błędem
+    write(articles / "artykul_1.html", b"<article><h1>\xff\xfe</h1></article>")
+
+    stats = builder.build(str(articles))
+
+    assert stats["rendered"] == 1
+    assert stats["failed"] == 1
+    output_dir = tmp_path / "strona"
+    assert (output_dir / "artykul.html").exists()
+    assert not (output_dir / "artykul_1.html").exists()
+    index = (output_dir / SiteBuilder.INDEX_NAME).read_text(encoding="utf-8")
+    assert "artykul.html" in index and "artykul_1.html" not in index
+    manifest = json.loads((output_dir / SiteBuilder.MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert sorted(manifest) == ["artykul.html", SiteBuilder.INDEX_NAME]
+
+
+def test_unchanged_pages_are_skipped(tmp_path):
+    builder, articles = make_site(tmp_path)
+    write(articles / "artykul.html", "<article><h1>Tytuł</h1></article>".encode("utf-8"))
+    assert builder.build(str(articles))["rendered"] == 1
+
+    stats = SiteBuilder(builder.template.template_file, builder.output_dir).build(str(articles))
+    assert stats == {"rendered": 0, "skipped": 1, "failed": 0, "removed": 0, "index": 0}
+
+
+def test_optimized_index_is_not_rewritten(tmp_path):
+    builder, articles = make_site(tmp_path)
+    write(articles / "artykul.html", "<article>\n  <h1>Tytuł</h1>\n</article>".encode("utf-8"))
+    assert builder.build(str(articles))["index"] == 1
+    index_path = os.path.join(builder.output_dir, SiteBuilder.INDEX_NAME)
+    OutputOptimizer(use_brotli=False).optimize([index_path])
+    with open(index_path, encoding="utf-8") as f:
+        minified = f.read()
+
+    stats = SiteBuilder(builder.template.template_file, builder.output_dir).build(str(articles))
+    assert stats["index"] == 0
+    with open(index_path, encoding="utf-8") as f:
+        assert f.read() == minified
+
+
+def test_manifest_is_saved_when_build_fails(tmp_path, monkeypatch):
+    builder, articles = make_site(tmp_path)
+    write(articles / "artykul.html", "<article><h1>Tytuł</h1></article>".encode("utf-8"))
+
+    def broken_index(names):
+        raise OSError("Brak miejsca na dysku")
+
+    monkeypatch.setattr(builder, "_build_index", broken_index)
+    with pytest.raises(OSError):
+        builder.build(str(articles))
+    assert os.path.exists(builder.manifest.path)
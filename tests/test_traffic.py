@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.article_processor import ArticleProcessor
+from src.cache import ResponseCache
+from src.deadline import Deadline
+from src.traffic import ReplayLLM, TrafficRecorder
+
+SHORT_TEXT = "Krótki tekst artykułu."
+LONG_TEXT = "Dłuższy tekst artykułu, który trafia do dużego modelu. " * 12
+
+
+class RateLimitError(Exception):
+    """Błąd 429 klienta HTTP z nagłówkami odpowiedzi."""
+
+    def __init__(self):
+        super().__init__("Rate limit reached")
+        self.status_code = 429
+        self.response = SimpleNamespace(
+            status_code=429, headers=httpx.Headers({"Retry-After": "8", "Content-Type": "application/json"})
+        )
+
+
+class ScriptedLLM:
+    """Model o danej nazwie zwracający kolejne odpowiedzi lub zgłaszający błędy."""
+
+    def __init__(self, model_name, *results):
+        self.model_name = model_name
+        self.results = list(results)
+
+    def invoke(self, messages, **kwargs):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return SimpleNamespace(content=result, response_metadata={"finish_reason": "stop"})
+
+
+def make_processor(tmp_path, llm, fast_llm):
+    processor = ArticleProcessor(llm=llm, fast_llm=fast_llm)
+    processor.cache = ResponseCache(str(tmp_path / "cache"))
+    processor.use_cache = False
+    processor.router.large_model = "duzy"
+    processor.router.fast_model = "szybki"
+    processor.router.fast_max_tokens = 50
+    return processor
+
+
+@pytest.fixture
+def waits(monkeypatch):
+    waits = []
+    monkeypatch.setattr(Deadline, "sleep", lambda self, seconds: waits.append(seconds))
+    return waits
+
+
+def test_record_then_replay_keeps_routing_and_retry_after(tmp_path, monkeypatch, waits):
+    monkeypatch.chdir(tmp_path)
+    trace = str(tmp_path / "ruch.jsonl.gz")
+    large = ScriptedLLM("duzy", RateLimitError(), "<article><h1>Duży</h1><p>duży model</p></article>")
+    fast = ScriptedLLM("szybki", "<article><h1>Szybki</h1><p>szybki model</p></article>")
+
+    processor = make_processor(tmp_path, None, None)
+    recorder = TrafficRecorder(large, trace)
+    processor.llm = recorder
+    processor.fast_llm = recorder.for_model(fast)
+    recorded = [processor.process_text(SHORT_TEXT), processor.process_text(LONG_TEXT)]
+    recorder.close()
+    assert "szybki model" in recorded[0] and "duży model" in recorded[1]
+    assert waits == [8.0]
+
+    waits.clear()
+    replay = ReplayLLM(trace, speed=0, strict=True)
+    processor = make_processor(tmp_path, replay.for_model("duzy"), replay.for_model("szybki"))
+    processor.retry_delay_scale = 0.25
+    replayed = [processor.process_text(SHORT_TEXT), processor.process_text(LONG_TEXT)]
+
+    assert replayed == recorded
+    # Zapisany nagłówek Retry-After, przeskalowany jak przy --replay-speed 4
+    assert waits == [2.0]
+    assert processor.metrics.counter("api_errors_rate_limit") == 1
+
+
+def test_replayed_error_keeps_status_and_rate_limit_headers(tmp_path):
+    trace = str(tmp_path / "ruch.jsonl.gz")
+    recorder = TrafficRecorder(ScriptedLLM("duzy", RateLimitError()), trace)
+    with pytest.raises(RateLimitError):
+        recorder.invoke([])
+    recorder.close()
+
+    with pytest.raises(Exception) as replayed:
+        ReplayLLM(trace, speed=0).for_model("duzy").invoke([])
+    assert replayed.value.status_code == 429
+    assert replayed.value.response.headers == {"retry-after": "8"}